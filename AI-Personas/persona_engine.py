@@ -0,0 +1,311 @@
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# fundamentals_cache and indicators live at the repo root (the notebooks add '..' the same way)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from fundamentals_cache import FundamentalsCache, default_cache
+from indicators import ma_trend
+
+OUTPUT_COLUMNS = ['ticker', 'score', 'persona']
+
+# feature name -> yfinance .info key
+INFO_FEATURES = {
+    'trailing_pe': 'trailingPE',
+    'price_to_book': 'priceToBook',
+    'profit_margins': 'profitMargins',
+    'debt_to_equity': 'debtToEquity',
+    'beta': 'beta',
+    'revenue_growth': 'revenueGrowth',
+}
+# computed from the latest annual statements (charlie_munger.ipynb)
+STATEMENT_FEATURES = ('roe', 'liabilities_to_equity')
+# computed from one bulk price download
+PRICE_FEATURES = ('ma_trend', 'has_history')
+FEATURES = (*INFO_FEATURES, 'has_info', *STATEMENT_FEATURES, *PRICE_FEATURES)
+
+
+@dataclass(frozen=True)
+class Term:
+    """
+    One weighted input of a persona score.
+
+    The raw feature first drops values outside `valid` ('positive' or
+    'nonzero'; NaN is always missing) and fills missing ones with `fill`
+    (a number, or 'median' of the persona's tickers). It is then transformed:
+        minmax    (x - min) / (max - min) over the persona's tickers
+                  (1 - that with invert=True; 0.5 when all values are equal)
+        linear    offset + slope * x, clipped to `clip`
+        identity  x as is
+    """
+    feature: str
+    weight: float
+    transform: str = 'minmax'
+    invert: bool = False
+    offset: float = 0.0
+    slope: float = 1.0
+    clip: Tuple[Optional[float], Optional[float]] = (None, None)
+    valid: Optional[str] = None
+    fill: Union[None, float, str] = None
+
+
+@dataclass(frozen=True)
+class Persona:
+    """
+    Declarative persona: a universe and weighted terms.
+
+    missing='propagate' scores a ticker NaN if any term is missing;
+    'renormalize' takes the weighted mean of the terms that are present
+    (default if none is). Tickers lacking any `requires` feature get default.
+    """
+    name: str
+    tickers: Tuple[str, ...]
+    terms: Tuple[Term, ...]
+    missing: str = 'propagate'
+    requires: Tuple[str, ...] = ()
+    default: float = np.nan
+    decimals: Optional[int] = None
+    sort: bool = False
+
+    @property
+    def features(self) -> List[str]:
+        return list(dict.fromkeys([t.feature for t in self.terms] + list(self.requires)))
+
+
+# The three notebook personas, as specs
+MOHNISH_PABRAI = Persona(
+    name='Mohnish Pabrai',
+    tickers=('JNJ', 'MRNA', 'NKE', 'AAPL', 'SHW', 'BIDU', 'TCEHY', 'INTC', 'RL', 'AMZN', 'SYK', 'YUM',
+             'GOOGL', 'LVS', 'AMD', 'PFE', 'ABBV', 'COST', 'GE', 'CVX', 'T', 'SPG', 'RCL', 'PYPL'),
+    terms=(
+        Term('trailing_pe', 0.3, 'linear', offset=1, slope=-1 / 30, clip=(0, None), valid='positive'),
+        Term('price_to_book', 0.2, 'linear', offset=1, slope=-1 / 5, clip=(0, None), valid='positive'),
+        Term('profit_margins', 0.25, 'linear', slope=1 / 0.3, clip=(None, 1), valid='nonzero'),
+        Term('debt_to_equity', 0.15, 'linear', offset=1, slope=-1 / 2, clip=(0, None), valid='nonzero'),
+        Term('beta', 0.1, 'linear', offset=1.5, slope=-1, clip=(0, 1), valid='nonzero'),
+    ),
+    missing='renormalize', requires=('has_info', 'has_history'), default=0.5, decimals=4, sort=True,
+)
+
+CATHIE_WOOD = Persona(
+    name='Cathie Wood',
+    tickers=('CRSP', 'EDIT', 'NTLA', 'PACB', 'COIN', 'MQ', 'HOOD', 'NU', 'TSLA', 'RIVN', 'NIO', 'LCID',
+             'NVDA', 'AMD', 'PLTR', 'PATH', 'AI', 'SNOW', 'PYPL', 'SHOP', 'ROKU', 'TDOC', 'ZM', 'RBLX', 'U'),
+    terms=(
+        Term('revenue_growth', 1, 'minmax', fill='median'),
+        Term('debt_to_equity', 1, 'minmax', invert=True, fill='median'),
+        Term('ma_trend', 1, 'identity', fill=0),
+    ),
+    missing='renormalize',
+)
+
+CHARLIE_MUNGER = Persona(
+    name='Charlie Munger',
+    tickers=('DJCO', 'BAC', 'WFC', 'USB', 'BABA', 'AAPL', 'WMT', 'KO', 'PG', 'CL', 'UL', 'V', 'BRK-B',
+             'UNP', 'WM', 'CMI', 'ADBE', 'ADP', 'INTU', 'COST'),
+    terms=(
+        Term('roe', 0.4, 'minmax'),
+        Term('price_to_book', 0.3, 'minmax', invert=True),
+        Term('liabilities_to_equity', 0.3, 'minmax', invert=True),
+    ),
+)
+
+PERSONAS = (MOHNISH_PABRAI, CATHIE_WOOD, CHARLIE_MUNGER)
+
+
+def _number(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _statement_ratios(financials, balance_sheet) -> Tuple[float, float]:
+    """(ROE, liabilities / equity) from the latest statement column, as in charlie_munger.ipynb"""
+    try:
+        equity = balance_sheet.loc["Stockholders Equity"].iloc[0]
+        roe = financials.loc["Net Income"].iloc[0] / equity
+        doe = balance_sheet.loc["Total Liabilities Net Minority Interest"].iloc[0] / equity
+        return _number(roe), _number(doe)
+    except (AttributeError, KeyError, IndexError, TypeError):
+        return np.nan, np.nan
+
+
+def download_closes(tickers: Sequence[str], period: str = '1y') -> pd.DataFrame:
+    """Daily closes for every ticker in one yf.download call (dates x tickers)"""
+    import yfinance as yf
+    closes = yf.download(list(tickers), period=period, auto_adjust=True, progress=False)['Close']
+    return closes.to_frame(tickers[0]) if isinstance(closes, pd.Series) else closes
+
+
+def build_feature_matrix(tickers: Iterable[str],
+                         features: Union[None, Iterable[str], Dict[str, Iterable[str]]] = None,
+                         cache: Optional[FundamentalsCache] = None,
+                         closes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    (ticker x feature) matrix for a universe in one fetch per data source.
+
+    features is a list of names (computed for every ticker) or a mapping of
+    name -> the tickers that need it, so e.g. statements are only fetched for
+    the personas that use them. .info and the statements are read in bulk
+    through the fundamentals cache; price features come from one close matrix
+    (downloaded unless `closes` is given). Missing values are NaN.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if features is None or not isinstance(features, dict):
+        features = {f: tickers for f in (FEATURES if features is None else features)}
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {sorted(unknown)}")
+    cache = cache if cache is not None else default_cache()
+    out = pd.DataFrame(np.nan, index=pd.Index(tickers, name='ticker'), columns=list(features))
+
+    def needing(names) -> List[str]:
+        wanted = set().union(*(set(features[f]) for f in names if f in features))
+        return [t for t in tickers if t in wanted]
+
+    info_tickers = needing([*INFO_FEATURES, 'has_info'])
+    if info_tickers:
+        infos = cache.get_many(info_tickers, 'info')
+        for f in features:
+            if f in INFO_FEATURES:
+                key = INFO_FEATURES[f]
+                out.loc[info_tickers, f] = [_number(infos[t].get(key)) if t in infos else np.nan
+                                            for t in info_tickers]
+        if 'has_info' in features:
+            out.loc[info_tickers, 'has_info'] = [float(bool(infos.get(t))) for t in info_tickers]
+
+    statement_tickers = needing(STATEMENT_FEATURES)
+    if statement_tickers:
+        financials = cache.get_many(statement_tickers, 'financials')
+        balance_sheets = cache.get_many(statement_tickers, 'balance_sheet')
+        ratios = np.array([_statement_ratios(financials.get(t), balance_sheets.get(t))
+                           for t in statement_tickers], dtype=float).reshape(-1, 2)
+        for i, f in enumerate(STATEMENT_FEATURES):
+            if f in features:
+                out.loc[statement_tickers, f] = ratios[:, i]
+
+    price_tickers = needing(PRICE_FEATURES)
+    if price_tickers:
+        if closes is None:
+            closes = download_closes(price_tickers)
+        closes = closes.reindex(columns=price_tickers)
+        if 'ma_trend' in features:
+            out.loc[price_tickers, 'ma_trend'] = ma_trend(closes, fast=50, slow=200).to_numpy()
+        if 'has_history' in features:
+            out.loc[price_tickers, 'has_history'] = closes.notna().any().astype(float).to_numpy()
+
+    return out
+
+
+def _term_column(term: Term, raw: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Transformed values of one term for every ticker; statistics only use the persona's rows"""
+    x = raw.astype(float, copy=True)
+    if term.valid == 'positive':
+        x[~(x > 0)] = np.nan
+    elif term.valid == 'nonzero':
+        x[x == 0] = np.nan
+    if term.fill is not None:
+        if term.fill == 'median':
+            fill = np.nanmedian(x[rows]) if (~np.isnan(x[rows])).any() else np.nan
+        else:
+            fill = term.fill
+        x[np.isnan(x)] = fill
+
+    if term.transform == 'minmax':
+        lo, hi = np.nanmin(x[rows], initial=np.inf), np.nanmax(x[rows], initial=-np.inf)
+        x = np.where(np.isnan(x), np.nan, 0.5) if hi <= lo else (x - lo) / (hi - lo)
+        if term.invert:
+            x = 1 - x
+    elif term.transform == 'linear':
+        x = term.offset + term.slope * x
+        lo, hi = term.clip
+        if lo is not None:
+            x = np.where(np.isnan(x), x, np.maximum(x, lo))
+        if hi is not None:
+            x = np.where(np.isnan(x), x, np.minimum(x, hi))
+    elif term.transform != 'identity':
+        raise ValueError(f"Unknown transform: {term.transform}")
+    return x
+
+
+def score_personas(personas: Sequence[Persona] = PERSONAS, features: Optional[pd.DataFrame] = None,
+                   cache: Optional[FundamentalsCache] = None,
+                   closes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Score every persona's universe from one shared feature matrix.
+
+    The transformed terms of all personas form one (tickers x terms) matrix T
+    and their weights one block (terms x personas) matrix W, so all scores
+    come from T @ W (plus availability @ W for the renormalising personas).
+    Returns the persona_output.csv layout (ticker, score, persona), one block
+    per persona in its ticker order (sorted by score if the spec says so).
+    """
+    universe = list(dict.fromkeys(t for p in personas for t in p.tickers))
+    if features is None:
+        needed: Dict[str, List[str]] = {}
+        for p in personas:
+            for f in p.features:
+                needed.setdefault(f, []).extend(p.tickers)
+        features = build_feature_matrix(universe, needed, cache, closes)
+    features = features.reindex(index=universe)
+    pos = {t: i for i, t in enumerate(universe)}
+
+    columns, weights = [], []
+    for k, persona in enumerate(personas):
+        rows = np.array([pos[t] for t in dict.fromkeys(persona.tickers)], dtype=np.int64)
+        for term in persona.terms:
+            columns.append(_term_column(term, features[term.feature].to_numpy(dtype=float), rows))
+            w = np.zeros(len(personas))
+            w[k] = term.weight
+            weights.append(w)
+    T = np.column_stack(columns) if columns else np.empty((len(universe), 0))
+    W = np.vstack(weights) if weights else np.empty((0, len(personas)))
+
+    present = ~np.isnan(T)
+    weighted = np.where(present, T, 0.0) @ W
+    available = present @ W
+    absent = (~present).astype(float) @ (W != 0)
+
+    frames = []
+    for k, persona in enumerate(personas):
+        tickers = list(dict.fromkeys(persona.tickers))
+        rows = np.array([pos[t] for t in tickers], dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if persona.missing == 'renormalize':
+                score = np.where(available[rows, k] > 0, weighted[rows, k] / available[rows, k], persona.default)
+            else:
+                score = np.where(absent[rows, k] == 0, weighted[rows, k], np.nan)
+        for req in persona.requires:
+            ok = features[req].to_numpy(dtype=float)[rows]
+            score = np.where(np.nan_to_num(ok) != 0, score, persona.default)
+        if persona.decimals is not None:
+            score = np.round(score, persona.decimals)
+        frame = pd.DataFrame({'ticker': tickers, 'score': score, 'persona': persona.name})
+        if persona.sort:
+            frame = frame.sort_values('score', ascending=False, kind='stable')
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score the AI personas from one shared feature matrix.")
+    parser.add_argument("--persona", action="append", choices=[p.name for p in PERSONAS],
+                        help="Persona to score (repeatable); all by default.")
+    parser.add_argument("--output", type=Path, default=Path("persona_output.csv"),
+                        help="CSV to write (ticker, score, persona).")
+    args = parser.parse_args()
+
+    personas = [p for p in PERSONAS if not args.persona or p.name in args.persona]
+    output = score_personas(personas)
+    output.to_csv(args.output, index=False)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import json
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence
+
+
+class CostModel:
+    """
+    Base class for execution cost models used by trade_executor.execute_trades.
+
+    slippage() returns the cost of each trade as a fraction of its execution
+    price, computed for a whole rebalance at once from equal-length arrays.
+    """
+
+    def slippage(self, tickers: np.ndarray, shares: np.ndarray, volume: np.ndarray,
+                 price: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def cost(self, tickers, shares, volume, price) -> np.ndarray:
+        """Dollar cost of each trade: slippage * price * shares."""
+        shares = np.asarray(shares, dtype=float)
+        price = np.asarray(price, dtype=float)
+        return self.slippage(tickers, shares, volume, price) * price * shares
+
+
+def _participation(shares, volume) -> np.ndarray:
+    shares = np.abs(np.asarray(shares, dtype=float))
+    volume = np.asarray(volume, dtype=float)
+    return np.divide(shares, volume, out=np.zeros_like(shares), where=volume > 0)
+
+
+class LinearSlippage(CostModel):
+    """The original execute_trades rule: (shares / volume) * rate, floored at 1bp."""
+
+    def __init__(self, rate: float = 0.0005, floor: float = 0.0001):
+        self.rate = rate
+        self.floor = floor
+
+    def slippage(self, tickers, shares, volume, price):
+        return np.maximum(_participation(shares, volume) * self.rate, self.floor)
+
+
+class SquareRootImpact(CostModel):
+    """
+    Square-root market impact: coef * sigma * sqrt(shares / volume).
+
+    sigma is the daily volatility; pass a scalar, or an array aligned with the
+    trades. With the default sigma=1 coef is the impact of trading a full
+    day's volume.
+    """
+
+    def __init__(self, coef: float = 0.1, sigma=1.0):
+        self.coef = coef
+        self.sigma = sigma
+
+    def slippage(self, tickers, shares, volume, price):
+        return self.coef * np.asarray(self.sigma, dtype=float) * np.sqrt(_participation(shares, volume))
+
+
+class SpreadPlusImpact(CostModel):
+    """Half the quoted spread plus power-law impact: half_spread + coef * (shares / volume) ** exponent."""
+
+    def __init__(self, half_spread: float = 0.0001, coef: float = 0.1, exponent: float = 0.5):
+        self.half_spread = half_spread
+        self.coef = coef
+        self.exponent = exponent
+
+    def slippage(self, tickers, shares, volume, price):
+        return self.half_spread + self.coef * _participation(shares, volume) ** self.exponent
+
+
+class PerTickerImpact(CostModel):
+    """
+    SpreadPlusImpact with parameters calibrated per ticker.
+
+    params is a DataFrame indexed by ticker with columns half_spread, coef and
+    exponent (as returned by fit_impact). Tickers without parameters fall back
+    to `default`.
+    """
+
+    def __init__(self, params: pd.DataFrame, default: Optional[CostModel] = None):
+        self.params = params[['half_spread', 'coef', 'exponent']].astype(float)
+        self.default = default if default is not None else SpreadPlusImpact()
+
+    def slippage(self, tickers, shares, volume, price):
+        p = self.params.reindex(np.asarray(tickers))
+        known = p['coef'].notna().to_numpy()
+        part = _participation(shares, volume)
+        out = (p['half_spread'].to_numpy() + p['coef'].to_numpy() * part ** p['exponent'].to_numpy())
+        if not known.all():
+            fallback = self.default.slippage(tickers, shares, volume, price)
+            out = np.where(known, out, fallback)
+        return out
+
+
+FILL_COLUMNS = ('ticker', 'side', 'qty', 'price', 'arrival_price', 'volume')
+
+
+def _timestamps(ts: pd.Series) -> pd.Series:
+    """Fill times as naive timestamps; numeric ts are epoch seconds (time.time())."""
+    if pd.api.types.is_numeric_dtype(ts):
+        return pd.to_datetime(ts, unit='s')
+    return pd.to_datetime(ts)
+
+
+def _asof(mids: pd.DataFrame, tickers: np.ndarray, times: pd.Series) -> np.ndarray:
+    """Last mid at or before each time, per ticker; NaN before the first quote or for unknown tickers."""
+    out = np.full(len(tickers), np.nan)
+    for ticker in np.unique(tickers):
+        if ticker not in mids.columns:
+            continue
+        quotes = mids[ticker].dropna().sort_index()
+        rows = np.flatnonzero(tickers == ticker)
+        pos = quotes.index.searchsorted(times.iloc[rows], side='right') - 1
+        ok = pos >= 0
+        out[rows[ok]] = quotes.to_numpy(dtype=float)[pos[ok]]
+    return out
+
+
+def load_fills(path: str, mids: Optional[pd.DataFrame] = None, volume=None) -> pd.DataFrame:
+    """
+    Read an executed_trades log (JSON list or JSON lines) into the frame
+    fit_impact needs, renaming 'symbol' to 'ticker'.
+
+    Logs carry symbol, side, qty, price and ts. order_book_sim also records
+    each fill's arrival_price (the mid before its order traded); older logs
+    do not, and none carry market volume. Missing values are derived:
+      arrival_price  from `mids`, a frame of mid quotes indexed by timestamp
+                     with one column per ticker: the last mid at or before ts
+      volume         a scalar, a Series by ticker (e.g. average daily volume),
+                     or a date x ticker frame of daily volume, taken on the
+                     fill's date
+    ts is epoch seconds or a timestamp string. Values that cannot be derived
+    stay NaN, and fit_impact skips those fills.
+    """
+    with open(path, 'r') as f:
+        text = f.read().strip()
+    if text.startswith('['):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    fills = pd.DataFrame(records).rename(columns={'symbol': 'ticker'})
+    if fills.empty:
+        return fills.reindex(columns=[*FILL_COLUMNS, 'ts'])
+    times = _timestamps(fills['ts'])
+    tickers = fills['ticker'].to_numpy()
+
+    for column in ('arrival_price', 'volume'):
+        if column not in fills.columns:
+            fills[column] = np.nan
+        fills[column] = fills[column].astype(float)
+
+    missing = fills['arrival_price'].isna().to_numpy()
+    if mids is not None and missing.any():
+        fills.loc[missing, 'arrival_price'] = _asof(mids, tickers[missing], times[missing])
+
+    missing = fills['volume'].isna().to_numpy()
+    if volume is not None and missing.any():
+        if isinstance(volume, pd.DataFrame):
+            daily = volume.copy()
+            daily.index = pd.to_datetime(daily.index).normalize()
+            long = daily.stack()
+            keys = pd.MultiIndex.from_arrays([times[missing].dt.normalize(), tickers[missing]])
+            values = long.reindex(keys).to_numpy(dtype=float)
+        elif isinstance(volume, pd.Series):
+            values = volume.reindex(tickers[missing]).to_numpy(dtype=float)
+        else:
+            values = float(volume)
+        fills.loc[missing, 'volume'] = values
+    return fills
+
+
+def observed_slippage(fills: pd.DataFrame) -> np.ndarray:
+    """
+    Signed cost of each fill as a fraction of arrival price: positive when a
+    BUY paid above, or a SELL received below, the arrival price.
+    """
+    side = np.where(fills['side'].str.upper().isin(['BUY', 'COVER']), 1.0, -1.0)
+    arrival = fills['arrival_price'].to_numpy(dtype=float)
+    return side * (fills['price'].to_numpy(dtype=float) - arrival) / arrival
+
+
+def fit_impact(fills: pd.DataFrame, exponents: Sequence[float] = (0.5,),
+               by_ticker: bool = True, min_fills: int = 3) -> pd.DataFrame:
+    """
+    Fit slippage = half_spread + coef * (qty / volume) ** exponent by least squares.
+
+    fills needs columns ticker, side, qty, price, arrival_price and volume
+    (see load_fills for deriving the last two from an executed_trades log).
+    Fills with no arrival_price or a non-positive volume are skipped. For every candidate exponent the intercept and slope are solved in closed
+    form for all tickers at once from grouped sums; the exponent with the
+    lowest squared error is kept per ticker. Tickers with fewer than
+    min_fills fills are dropped. Returns a DataFrame indexed by ticker (or a
+    single 'ALL' row when by_ticker=False) with half_spread, coef, exponent,
+    r2 and n_fills.
+    """
+    missing = [c for c in FILL_COLUMNS if c not in fills.columns or fills[c].isna().all()]
+    if missing:
+        raise ValueError(f"fills lack {missing}; load_fills(path, mids=..., volume=...) derives "
+                         "arrival_price and volume for executed_trades logs")
+    usable = fills['arrival_price'].notna() & (fills['volume'] > 0)
+    fills = fills[usable]
+    y = observed_slippage(fills)
+    part = _participation(fills['qty'].to_numpy(), fills['volume'].to_numpy())
+    keys = fills['ticker'].to_numpy() if by_ticker else np.full(len(fills), 'ALL', dtype=object)
+    groups, inv = np.unique(keys, return_inverse=True)
+    n = np.bincount(inv, minlength=len(groups)).astype(float)
+    sy = np.bincount(inv, weights=y, minlength=len(groups))
+    syy = np.bincount(inv, weights=y * y, minlength=len(groups))
+
+    best = None
+    for exponent in exponents:
+        x = part ** exponent
+        sx = np.bincount(inv, weights=x, minlength=len(groups))
+        sxx = np.bincount(inv, weights=x * x, minlength=len(groups))
+        sxy = np.bincount(inv, weights=x * y, minlength=len(groups))
+        denom = n * sxx - sx * sx
+        coef = np.divide(n * sxy - sx * sy, denom, out=np.zeros_like(denom), where=denom > 0)
+        intercept = (sy - coef * sx) / n
+        sse = syy - intercept * sy - coef * sxy
+        cand = pd.DataFrame({'half_spread': intercept, 'coef': coef, 'exponent': exponent,
+                             'sse': sse}, index=pd.Index(groups, name='ticker'))
+        if best is None:
+            best = cand
+        else:
+            keep = (best['sse'] <= cand['sse']).to_numpy()
+            best = best.where(np.broadcast_to(keep[:, None], best.shape), cand)
+
+    sst = syy - sy * sy / n
+    best['r2'] = np.where(sst > 0, 1 - best['sse'] / np.where(sst > 0, sst, 1.0), np.nan)
+    best['n_fills'] = n.astype(int)
+    return best[best['n_fills'] >= min_fills].drop(columns='sse')
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+
+def rebalance_mask(dates: pd.DatetimeIndex, rebalance_freq: str) -> np.ndarray:
+    """
+    Boolean mask of the dates on which PortfolioManager would rebalance.
+
+    'monthly'/'m' rebalances every period, 'quarterly'/'q' only on quarter-end
+    months (Mar, Jun, Sep, Dec). Anything else never rebalances.
+    """
+    freq = rebalance_freq.lower()
+    if freq in ('monthly', 'm'):
+        return np.ones(len(dates), dtype=bool)
+    if freq in ('quarterly', 'q'):
+        return np.isin(dates.month, [3, 6, 9, 12])
+    return np.zeros(len(dates), dtype=bool)
+
+
+def generate_mock_return_paths(assets: list, periods: int, n_paths: int,
+                               avg_return: float = 0.005, std_dev: float = 0.02,
+                               seed: Optional[int] = 42):
+    """
+    Monte Carlo version of generate_mock_returns.
+
+    Returns (paths, dates) where paths has shape (n_paths, periods, len(assets)).
+    The same linear trend is added to the first asset on every path.
+    """
+    rng = np.random.default_rng(seed)
+    paths = rng.normal(avg_return, std_dev, size=(n_paths, periods, len(assets)))
+    paths[:, :, 0] += np.linspace(0.01, 0.001, periods)
+    dates = pd.date_range(start='2020-01-01', periods=periods, freq='ME')
+    return paths, dates
+
+
+@dataclass
+class SimulationResult:
+    """
+    Output of simulate_many.
+
+    values has shape (schemes, freqs, paths, dates); shares has shape
+    (schemes, freqs, paths, assets) and cash (schemes, freqs, paths), both
+    taken after the last period.
+    """
+    schemes: List[str]
+    freqs: List[str]
+    assets: List[str]
+    dates: pd.DatetimeIndex
+    values: np.ndarray
+    shares: np.ndarray
+    cash: np.ndarray
+
+    def history(self, scheme: str, freq: str, path: int = 0) -> pd.DataFrame:
+        """Same frame PortfolioManager.simulate_returns returns, for one path."""
+        s = self.schemes.index(scheme)
+        f = self.freqs.index(freq)
+        return pd.DataFrame({'date': self.dates, 'value': self.values[s, f, path]})
+
+    def histories(self, scheme: str, freq: str) -> List[pd.DataFrame]:
+        """One history frame per Monte Carlo path."""
+        return [self.history(scheme, freq, p) for p in range(self.values.shape[2])]
+
+    def final_values(self) -> pd.DataFrame:
+        """Final portfolio value per (scheme, freq, path) in long format."""
+        s, f, p = np.meshgrid(np.arange(len(self.schemes)), np.arange(len(self.freqs)),
+                              np.arange(self.values.shape[2]), indexing='ij')
+        return pd.DataFrame({
+            'scheme': np.asarray(self.schemes, dtype=object)[s.ravel()],
+            'freq': np.asarray(self.freqs, dtype=object)[f.ravel()],
+            'path': p.ravel(),
+            'value': self.values[:, :, :, -1].ravel(),
+        })
+
+
+def _as_paths(returns: Union[pd.DataFrame, np.ndarray], assets: List[str],
+              dates: Optional[pd.DatetimeIndex]):
+    """Normalise returns input into a (paths, dates, assets) array."""
+    if isinstance(returns, pd.DataFrame):
+        # Same as returns.get(ticker, 0) in the loop: absent tickers earn 0
+        arr = returns.reindex(columns=assets, fill_value=0).to_numpy(dtype=float)
+        return arr[np.newaxis], pd.DatetimeIndex(returns.index)
+
+    arr = np.asarray(returns, dtype=float)
+    if arr.ndim == 2:
+        arr = arr[np.newaxis]
+    if arr.ndim != 3 or arr.shape[2] != len(assets):
+        raise ValueError(f"returns must have shape (paths, dates, {len(assets)}), got {arr.shape}")
+    if dates is None or len(dates) != arr.shape[1]:
+        raise ValueError("dates must be given and match the returns' date axis for array input")
+    return arr, pd.DatetimeIndex(dates)
+
+
+def simulate_many(initial_capital: float,
+                  returns: Union[pd.DataFrame, np.ndarray],
+                  initial_prices: Dict[str, float],
+                  weight_schemes: Dict[str, Dict[str, float]],
+                  rebalance_freqs: Sequence[str] = ('monthly', 'quarterly'),
+                  assets: Optional[List[str]] = None,
+                  dates: Optional[pd.DatetimeIndex] = None) -> SimulationResult:
+    """
+    Run PortfolioManager.simulate_returns for every weight scheme, rebalance
+    frequency and return path at once.
+
+    Parameters:
+    - initial_capital: starting cash balance for every portfolio
+    - returns: DataFrame of periodic returns (single path), or an array of
+      shape (paths, dates, assets) ordered like `assets`
+    - initial_prices: starting price for each ticker
+    - weight_schemes: {scheme_name: {ticker: weight}}
+    - rebalance_freqs: frequencies understood by PortfolioManager
+    - assets: asset order for array input (defaults to initial_prices order)
+    - dates: date index for array input
+
+    The rebalance keeps PortfolioManager's rules: sell over-allocated assets
+    first, then buy under-allocated assets in target_weights order, each buy
+    limited by the cash left after the previous ones. Trades of 1e-6 shares
+    or less are skipped.
+    """
+    if assets is None:
+        assets = list(initial_prices.keys())
+    paths, dates = _as_paths(returns, assets, dates)
+    n_paths, n_dates, n_assets = paths.shape
+
+    schemes = list(weight_schemes.keys())
+    freqs = [f.lower() for f in rebalance_freqs]
+    n_schemes, n_freqs = len(schemes), len(freqs)
+
+    prices0 = np.array([initial_prices.get(a, np.nan) for a in assets], dtype=float)
+    weights = np.zeros((n_schemes, n_assets))
+    # Buy-phase order follows each scheme's target_weights insertion order
+    buy_order = np.tile(np.arange(n_assets), (n_schemes, 1))
+    for s, name in enumerate(schemes):
+        scheme = weight_schemes[name]
+        order = [assets.index(t) for t in scheme if t in assets]
+        rest = [i for i in range(n_assets) if i not in order]
+        buy_order[s] = order + rest
+        for t, w in scheme.items():
+            if t in assets:
+                weights[s, assets.index(t)] = w
+    # Only tickers with both a price and a target weight are ever held
+    held = (weights != 0) & ~np.isnan(prices0)
+    weights = np.where(held, weights, 0.0)
+
+    # Broadcast shapes: (schemes, freqs, paths, assets)
+    w = weights[:, None, None, :]
+    init_value = initial_capital * w
+    shares = np.where(held[:, None, None, :],
+                      init_value / np.where(np.isnan(prices0), 1.0, prices0), 0.0)
+    shares = np.broadcast_to(shares, (n_schemes, n_freqs, n_paths, n_assets)).copy()
+    cash = np.full((n_schemes, n_freqs, n_paths), float(initial_capital)) - init_value.sum(axis=-1)
+
+    # Prices compound from the initial price, exactly as entry_price * (1 + ret) each period
+    prices = np.nan_to_num(prices0) * np.cumprod(1.0 + paths, axis=1)
+    masks = np.stack([rebalance_mask(dates, f) for f in freqs])  # (freqs, dates)
+
+    inv_order = np.argsort(buy_order, axis=1)
+    take = buy_order[:, None, None, :]
+    untake = inv_order[:, None, None, :]
+
+    values = np.empty((n_schemes, n_freqs, n_paths, n_dates))
+    for t in range(n_dates):
+        px = prices[:, t, :][None, None, :, :]
+        px_div = np.where(px > 0, px, 1.0)
+        if masks[:, t].any():
+            do = masks[:, t][None, :, None]
+            value = shares * px
+            total = cash + value.sum(axis=-1)
+            target = total[..., None] * w
+
+            # Sell phase
+            sell_shares = np.where(value > target, np.minimum((value - target) / px_div, shares), 0.0)
+            sell_shares = np.where(sell_shares > 1e-6, sell_shares, 0.0)
+            new_shares = shares - sell_shares
+            new_cash = cash + (sell_shares * px).sum(axis=-1)
+
+            # Buy phase: greedy in target_weights order == clip(cash - prior deficits)
+            deficit = np.where(held[:, None, None, :], target - new_shares * px, 0.0)
+            deficit = np.where(deficit / px_div > 1e-6, deficit, 0.0)
+            ordered = np.take_along_axis(deficit, take, axis=-1)
+            prior = np.cumsum(ordered, axis=-1) - ordered
+            spend = np.clip(new_cash[..., None] - prior, 0.0, ordered)
+            spend = np.take_along_axis(spend, untake, axis=-1)
+            buy_shares = spend / px_div
+            buy_shares = np.where(buy_shares > 1e-6, buy_shares, 0.0)
+            new_shares = new_shares + buy_shares
+            new_cash = new_cash - (buy_shares * px).sum(axis=-1)
+
+            shares = np.where(do[..., None], new_shares, shares)
+            cash = np.where(do, new_cash, cash)
+
+        values[..., t] = cash + (shares * px).sum(axis=-1)
+
+    return SimulationResult(schemes=schemes, freqs=freqs, assets=list(assets), dates=dates,
+                            values=values, shares=shares, cash=cash)
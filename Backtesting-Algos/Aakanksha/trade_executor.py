@@ -0,0 +1,145 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+from cost_models import CostModel, LinearSlippage
+
+ACTIONS = np.array(['HOLD', 'BUY', 'SELL', 'SHORT', 'COVER'], dtype=object)
+
+
+def _to_csv(df: pd.DataFrame, output_path: Optional[str]):
+    """Optional CSV sink; the pipeline itself never reads these files back."""
+    if output_path is None:
+        return
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    df.to_csv(output_path, index=False)
+
+
+def get_trade_actions(prev_weights: pd.DataFrame, new_weights: pd.DataFrame,
+                      tolerance: float = 0.01, output_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Classify each ticker's weight change as BUY/SELL/SHORT/COVER/HOLD.
+
+    prev_weights has columns ['ticker', 'weight_prev'] and new_weights
+    ['ticker', 'weight_new']. Rows are matched by ticker, not position; a
+    ticker present on only one side is treated as weight 0 on the other.
+    """
+    prev_s = prev_weights.set_index('ticker')['weight_prev']
+    new_s = new_weights.set_index('ticker')['weight_new']
+    # Keep prev_weights order, then any tickers that only appear in new_weights
+    tickers = prev_s.index.append(new_s.index.difference(prev_s.index, sort=False))
+    prev = prev_s.reindex(tickers).fillna(0.0).to_numpy(dtype=float)
+    new = new_s.reindex(tickers).fillna(0.0).to_numpy(dtype=float)
+
+    hold = np.abs(new - prev) < tolerance
+    # Codes index into ACTIONS; order of conditions mirrors the original if/else chain
+    codes = np.select(
+        [hold, new >= 0, prev >= 0, new < prev],
+        [0, np.where(new > prev, 1, 2), 3, 3],
+        default=4,
+    )
+
+    out = pd.DataFrame({
+        'ticker': tickers.to_numpy(),
+        'prev_weight': prev,
+        'new_weight': new,
+        'action': ACTIONS[codes],
+    })
+    _to_csv(out, output_path)
+    return out
+
+
+def prepare_execution_input(trades: pd.DataFrame, market: pd.DataFrame,
+                            portfolio_value: float = 1_000_000,
+                            output_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Join trade decisions with market data (ticker, prev_price, exec_price,
+    volume) and size each trade in whole shares.
+    """
+    merged = trades.merge(market, on='ticker', how='left')
+
+    missing = merged[['exec_price', 'prev_price', 'volume']].isnull().any(axis=1)
+    if missing.any():
+        print(merged[missing])
+        merged = merged[~missing]
+
+    delta = (merged['new_weight'] - merged['prev_weight']).to_numpy(dtype=float)
+    shares = np.round(np.abs(delta * portfolio_value / merged['exec_price'].to_numpy(dtype=float)))
+
+    exec_input = pd.DataFrame({
+        'ticker': merged['ticker'].to_numpy(),
+        'action': merged['action'].to_numpy(),
+        'prev_price': merged['prev_price'].to_numpy(dtype=float),
+        'exec_price': merged['exec_price'].to_numpy(dtype=float),
+        'shares': np.nan_to_num(shares).astype(int),
+        'volume': merged['volume'].to_numpy(),
+    })
+    _to_csv(exec_input, output_path)
+    return exec_input
+
+
+def execute_trades(exec_input: pd.DataFrame, slippage_rate: float = 0.0005,
+                   output_path: Optional[str] = None,
+                   cost_model: Optional[CostModel] = None) -> pd.DataFrame:
+    """
+    Compute slippage, cost and realized P&L for every trade in one pass.
+
+    Slippage comes from cost_model (see cost_models.py); the default is the
+    original (shares / volume) * slippage_rate with a 1bp floor. BUY and
+    SHORT earn (prev_price - exec_price) per share, SELL and COVER earn
+    (exec_price - prev_price); HOLD rows have zero P&L.
+    """
+    action = exec_input['action'].to_numpy()
+    prev_price = exec_input['prev_price'].to_numpy(dtype=float)
+    exec_price = exec_input['exec_price'].to_numpy(dtype=float)
+    shares = exec_input['shares'].to_numpy()
+    volume = exec_input['volume'].to_numpy(dtype=float)
+
+    if cost_model is None:
+        cost_model = LinearSlippage(slippage_rate)
+    slippage = cost_model.slippage(exec_input['ticker'].to_numpy(), shares, volume, exec_price)
+    cost = slippage * exec_price * shares
+
+    direction = np.select([np.isin(action, ['BUY', 'SHORT']), np.isin(action, ['SELL', 'COVER'])],
+                          [-1.0, 1.0], default=0.0)
+    realized_pnl = np.where(direction != 0, direction * (exec_price - prev_price) * shares - cost, 0.0)
+
+    out = pd.DataFrame({
+        'ticker': exec_input['ticker'].to_numpy(),
+        'action': action,
+        'exec_price': exec_price,
+        'shares': shares,
+        'slippage': np.round(slippage, 6),
+        'cost': np.round(cost, 2),
+        'realized_PnL': np.round(realized_pnl, 2),
+    })
+    _to_csv(out, output_path)
+    return out
+
+
+def run_pipeline(prev_weights: pd.DataFrame, new_weights: pd.DataFrame, market: pd.DataFrame,
+                 portfolio_value: float = 1_000_000, tolerance: float = 0.01,
+                 slippage_rate: float = 0.0005,
+                 output_dir: Optional[str] = None,
+                 cost_model: Optional[CostModel] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Run decisions -> execution input -> execution in memory.
+
+    If output_dir is given, each stage is also written to the same files the
+    notebook used (input/TradeDecisions.csv, input/input.csv, output/outputs.csv).
+    """
+    paths = (None, None, None)
+    if output_dir is not None:
+        paths = (os.path.join(output_dir, 'input', 'TradeDecisions.csv'),
+                 os.path.join(output_dir, 'input', 'input.csv'),
+                 os.path.join(output_dir, 'output', 'outputs.csv'))
+
+    trades = get_trade_actions(prev_weights, new_weights, tolerance=tolerance, output_path=paths[0])
+    exec_input = prepare_execution_input(trades, market, portfolio_value=portfolio_value,
+                                         output_path=paths[1])
+    exec_output = execute_trades(exec_input, slippage_rate=slippage_rate, output_path=paths[2],
+                                 cost_model=cost_model)
+    return trades, exec_input, exec_output
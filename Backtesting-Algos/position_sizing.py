@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+PanelInput = Union[pd.DataFrame, np.ndarray]
+
+
+@dataclass
+class SizingPanel:
+    """
+    Position sizes and stop-losses for every (date, ticker) and capital level.
+
+    Arrays are unrounded; rounding (weight 4dp, capital and stop price 2dp,
+    stop-loss % 2dp) is only applied by to_frame() and snapshot().
+    weight, stop_loss_pct (a fraction) and stop_loss_price are (dates, tickers);
+    capital_allocated is (capitals, dates, tickers). Rows failing min_score or
+    missing data have eligible == False and NaN weight.
+    """
+    dates: pd.Index
+    tickers: pd.Index
+    capital_levels: np.ndarray
+    score: np.ndarray
+    risk_score: np.ndarray
+    price: np.ndarray
+    eligible: np.ndarray
+    combined_score: np.ndarray
+    weight: np.ndarray
+    stop_loss_pct: np.ndarray
+    stop_loss_price: np.ndarray
+
+    @property
+    def capital_allocated(self) -> np.ndarray:
+        return self.capital_levels[:, None, None] * self.weight[None, :, :]
+
+    def to_frame(self, round_output: bool = True) -> pd.DataFrame:
+        """
+        Long frame of eligible positions: date, capital, ticker, score,
+        risk_score, price, combined_score, weight, capital_allocated,
+        stop_loss_pct (in %) and stop_loss_price, one row per capital level.
+        """
+        d, t = np.nonzero(self.eligible)
+        k = len(self.capital_levels)
+        n = len(d)
+        weight = self.weight[d, t]
+        capital = self.capital_allocated[:, d, t].ravel()
+        pct = self.stop_loss_pct[d, t] * 100
+        stop = self.stop_loss_price[d, t]
+        if round_output:
+            weight, capital = np.round(weight, 4), np.round(capital, 2)
+            pct, stop = np.round(pct, 2), np.round(stop, 2)
+        return pd.DataFrame({
+            'date': np.tile(self.dates.to_numpy()[d], k),
+            'capital': np.repeat(self.capital_levels, n),
+            'ticker': np.tile(self.tickers.to_numpy()[t], k),
+            'score': np.tile(self.score[d, t], k),
+            'risk_score': np.tile(self.risk_score[d, t], k),
+            'price': np.tile(self.price[d, t], k),
+            'combined_score': np.tile(self.combined_score[d, t], k),
+            'weight': np.tile(weight, k),
+            'capital_allocated': capital,
+            'stop_loss_pct': np.tile(pct, k),
+            'stop_loss_price': np.tile(stop, k),
+        })
+
+    def snapshot(self, date, capital: Optional[float] = None) -> pd.DataFrame:
+        """
+        One date and capital level in the layout calculate_position_sizes +
+        calculate_stop_loss produce in the notebook (rounded the same way).
+        """
+        i = self.dates.get_loc(date)
+        cap = self.capital_levels[0] if capital is None else capital
+        k = int(np.flatnonzero(self.capital_levels == cap)[0])
+        cols = np.flatnonzero(self.eligible[i])
+        return pd.DataFrame({
+            'ticker': self.tickers.to_numpy()[cols],
+            'score': self.score[i, cols],
+            'risk_score': self.risk_score[i, cols],
+            'price': self.price[i, cols],
+            'combined_score': self.combined_score[i, cols],
+            'weight': np.round(self.weight[i, cols], 4),
+            'capital_allocated': np.round(self.capital_levels[k] * self.weight[i, cols], 2),
+            'stop_loss_pct': np.round(self.stop_loss_pct[i, cols] * 100, 2),
+            'stop_loss_price': np.round(self.stop_loss_price[i, cols], 2),
+        })
+
+
+def _wide(values: PanelInput, dates: Optional[pd.Index], tickers: Optional[pd.Index]):
+    if isinstance(values, pd.DataFrame):
+        if dates is not None or tickers is not None:
+            values = values.reindex(index=dates, columns=tickers)
+        return values.to_numpy(dtype=float), values.index, values.columns
+    arr = np.asarray(values, dtype=float)
+    return (arr, pd.Index(dates if dates is not None else np.arange(arr.shape[0])),
+            pd.Index(tickers if tickers is not None else np.arange(arr.shape[1])))
+
+
+def size_panel(scores: PanelInput, risk_scores: PanelInput, prices: PanelInput,
+               capital_levels: Union[float, Sequence[float]] = 10000, min_score: float = 0.0,
+               base_stop_pct: float = 0.05, risk_multiplier: float = 50) -> SizingPanel:
+    """
+    Risk-adjusted sizing and stop-losses for a (date x ticker) panel.
+
+    scores, risk_scores and prices are wide DataFrames (dates as index,
+    tickers as columns; risk_scores and prices are aligned to scores) or
+    same-shape arrays. Per date, combined_score = score / (1 + risk_score) is
+    normalised over the tickers with score >= min_score, exactly as
+    calculate_position_sizes does for one snapshot; the stop-loss is
+    base_stop_pct + risk_score * risk_multiplier / 100 below price, as in
+    calculate_stop_loss. All dates and capital levels are computed at once.
+    """
+    score, dates, tickers = _wide(scores, None, None)
+    risk, _, _ = _wide(risk_scores, dates if isinstance(scores, pd.DataFrame) else None,
+                       tickers if isinstance(scores, pd.DataFrame) else None)
+    price, _, _ = _wide(prices, dates if isinstance(scores, pd.DataFrame) else None,
+                        tickers if isinstance(scores, pd.DataFrame) else None)
+    if not (score.shape == risk.shape == price.shape):
+        raise ValueError("scores, risk_scores and prices must have the same shape")
+
+    eligible = (score >= min_score) & ~np.isnan(risk)
+    combined = score / (1 + risk)
+    masked = np.where(eligible, combined, 0.0)
+    total = masked.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(eligible, masked / total, np.nan)
+
+    stop_pct = base_stop_pct + risk * risk_multiplier / 100
+    stop_price = price * (1 - stop_pct)
+
+    return SizingPanel(
+        dates=dates, tickers=tickers,
+        capital_levels=np.atleast_1d(np.asarray(capital_levels, dtype=float)),
+        score=score, risk_score=risk, price=price, eligible=eligible,
+        combined_score=combined, weight=weight,
+        stop_loss_pct=stop_pct, stop_loss_price=stop_price,
+    )
+
+
+def size_signals(signals: pd.DataFrame, capital_levels: Union[float, Sequence[float]] = 10000,
+                 date_col: str = 'date', **kwargs) -> SizingPanel:
+    """
+    size_panel for a long signals table (date, ticker, score, risk_score,
+    price - signals_data.csv with a date column). A table without date_col is
+    treated as a single snapshot.
+    """
+    if date_col not in signals.columns:
+        signals = signals.assign(**{date_col: 0})
+    wide = signals.pivot_table(index=date_col, columns='ticker',
+                               values=['score', 'risk_score', 'price'], aggfunc='last', sort=True)
+    # Keep first-seen ticker order so snapshots list tickers like the input file
+    tickers = pd.Index(signals['ticker'].drop_duplicates())
+    return size_panel(wide['score'].reindex(columns=tickers), wide['risk_score'].reindex(columns=tickers),
+                      wide['price'].reindex(columns=tickers), capital_levels, **kwargs)
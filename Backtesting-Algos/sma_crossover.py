@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from transaction_ledger import TransactionLedger, EXECUTION_LOG_SCHEMA
+
+PriceInput = Union[pd.Series, pd.DataFrame]
+
+
+def _price_series(prices: PriceInput, price_col: str = 'price') -> pd.Series:
+    if isinstance(prices, pd.DataFrame):
+        prices = prices[price_col]
+    return prices.astype(float).dropna()
+
+
+def sma_signals(prices: PriceInput, fast_window: int = 20, slow_window: int = 50,
+                price_col: str = 'price') -> pd.DataFrame:
+    """
+    The ExecutionLoop signal frame: price, sma_fast, sma_slow, signal and
+    position (yesterday's signal), trimmed to the rows where both SMAs exist.
+    Uses the same pandas rolling means as the notebook so signals match exactly.
+    """
+    price = _price_series(prices, price_col)
+    data = price.to_frame('price')
+    data['sma_fast'] = price.rolling(window=fast_window, min_periods=fast_window).mean()
+    data['sma_slow'] = price.rolling(window=slow_window, min_periods=slow_window).mean()
+    data['signal'] = (data['sma_fast'] > data['sma_slow']).astype(int)
+    data['position'] = data['signal'].shift(1).fillna(0).astype(int)
+    return data.dropna()
+
+
+def execute_positions(data: pd.DataFrame, starting_capital: float = 1000.0
+                      ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    All-in / all-out whole-share execution of a 0/1 position column.
+
+    Same accounting as the ExecutionLoop iterrows loop: on a 0 -> 1 change buy
+    int(cash // price) shares (if at least one), on 1 -> 0 sell everything.
+    Only the rows where the position changes are visited in Python; shares,
+    cash and portfolio value for every other day are forward-filled with
+    array operations. Returns (data with portfolio_value, trade log frame).
+    """
+    price = data['price'].to_numpy(dtype=float)
+    position = data['position'].to_numpy().astype(np.int64)
+    n = len(price)
+
+    prev = np.concatenate(([0], position[:-1]))
+    changes = np.flatnonzero(position != prev)
+
+    # Cash and shares after each change; the chain is sequential but short
+    funds = float(starting_capital)
+    shares = 0
+    at, cash_after, shares_after = [0], [funds], [0]
+    log: Dict[str, list] = {k: [] for k in EXECUTION_LOG_SCHEMA}
+    for i in changes.tolist():
+        p = price[i]
+        if position[i] == 1 and prev[i] == 0:
+            qty = int(funds // p)
+            if qty > 0:
+                funds -= qty * p
+                shares += qty
+                log['Action'].append('BUY'); log['Shares'].append(qty)
+            else:
+                continue
+        elif position[i] == 0 and prev[i] == 1:
+            if shares <= 0:
+                continue
+            funds += shares * p
+            log['Action'].append('SELL'); log['Shares'].append(shares)
+            shares = 0
+        else:
+            continue
+        log['Date'].append(data.index[i]); log['Price'].append(p)
+        log['Position'].append(int(position[i])); log['Cash'].append(funds)
+        log['PortfolioValue'].append(funds + shares * p)
+        at.append(i); cash_after.append(funds); shares_after.append(shares)
+
+    # Index of the last trade at or before each row
+    last = np.zeros(n, dtype=np.int64)
+    last[np.asarray(at[1:], dtype=np.int64)] = np.arange(1, len(at))
+    last = np.maximum.accumulate(last) if n else last
+    cash = np.asarray(cash_after)[last]
+    held = np.asarray(shares_after, dtype=np.int64)[last]
+
+    out = data.copy()
+    out['shares'] = held
+    out['cash'] = cash
+    out['portfolio_value'] = cash + held * price
+
+    ledger = TransactionLedger(EXECUTION_LOG_SCHEMA, capacity=max(len(log['Date']), 1))
+    if log['Date']:
+        ledger.extend(**log)
+    trade_log = ledger.to_frame(copy=True)
+    if not trade_log.empty:
+        trade_log.index = range(1, len(trade_log) + 1)
+        trade_log.index.name = 'Trade #'
+    return out, trade_log
+
+
+def run_sma_crossover(prices: PriceInput, fast_window: int = 20, slow_window: int = 50,
+                      starting_capital: float = 1000.0, price_col: str = 'price'
+                      ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Signal + execution for one window pair; returns (data, trade_log) like ExecutionLoop."""
+    data = sma_signals(prices, fast_window, slow_window, price_col)
+    return execute_positions(data, starting_capital)
+
+
+def rolling_means(price: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """
+    (len(windows), T) matrix of simple moving averages; NaN until full.
+
+    Each row is the pandas rolling mean sma_signals uses, bit for bit. A
+    cumulative-sum shortcut differs from it by float noise, which is enough
+    to flip fast > slow wherever the two SMAs are equal (flat prices).
+    """
+    series = pd.Series(np.asarray(price, dtype=float))
+    out = np.empty((len(windows), len(series)))
+    for k, w in enumerate(np.asarray(windows, dtype=np.int64).tolist()):
+        out[k] = series.rolling(window=w, min_periods=w).mean().to_numpy()
+    return out
+
+
+def sweep_windows(prices: PriceInput, fast_windows: Sequence[int], slow_windows: Sequence[int],
+                  starting_capital: float = 1000.0, price_col: str = 'price',
+                  fast_below_slow: bool = True) -> pd.DataFrame:
+    """
+    Backtest every (fast_window, slow_window) pair of a grid in one pass.
+
+    Moving averages are computed once per distinct window, with the same
+    rolling kernel as sma_signals, so every pair's signals match
+    run_sma_crossover exactly. The execution then steps through time once, updating cash, shares
+    and drawdown for all pairs at once with the same whole-share rules (and
+    float operations) as execute_positions. With fast_below_slow only pairs
+    with fast < slow are run. Each pair starts trading on its first day with
+    both SMAs, as in the notebook.
+
+    Returns one row per pair: fast_window, slow_window, final_value,
+    total_return, n_trades, max_drawdown.
+    """
+    price = _price_series(prices, price_col).to_numpy()
+    fast_windows = np.asarray(fast_windows, dtype=np.int64)
+    slow_windows = np.asarray(slow_windows, dtype=np.int64)
+    ff, ss = np.meshgrid(fast_windows, slow_windows, indexing='ij')
+    ff, ss = ff.ravel(), ss.ravel()
+    if fast_below_slow:
+        keep = ff < ss
+        ff, ss = ff[keep], ss[keep]
+
+    windows, inv = np.unique(np.concatenate((ff, ss)), return_inverse=True)
+    fi, si = inv[:len(ff)], inv[len(ff):]
+    sma = rolling_means(price, windows)
+    # signal[t] for every pair, computed a row of windows at a time below
+    sma_t = np.ascontiguousarray(sma.T)
+
+    n_pairs = len(ff)
+    funds = np.full(n_pairs, float(starting_capital))
+    shares = np.zeros(n_pairs, dtype=np.int64)
+    prev = np.zeros(n_pairs, dtype=bool)
+    n_trades = np.zeros(n_pairs, dtype=np.int64)
+    peak = funds.copy()
+    max_dd = np.zeros(n_pairs)
+
+    for t in range(1, len(price)):
+        row = sma_t[t - 1]
+        pos = row[fi] > row[si]           # NaN compares False, i.e. flat
+        p = price[t]
+        buy = pos & ~prev
+        sell = prev & ~pos
+        if buy.any():
+            qty = np.floor_divide(funds[buy], p).astype(np.int64)
+            ok = qty > 0
+            idx = np.flatnonzero(buy)[ok]
+            funds[idx] -= qty[ok] * p
+            shares[idx] += qty[ok]
+            n_trades[idx] += 1
+        if sell.any():
+            idx = np.flatnonzero(sell & (shares > 0))
+            funds[idx] += shares[idx] * p
+            shares[idx] = 0
+            n_trades[idx] += 1
+        prev = pos
+        value = funds + shares * p
+        np.maximum(peak, value, out=peak)
+        np.maximum(max_dd, 1.0 - value / peak, out=max_dd)
+
+    final = funds + shares * (price[-1] if len(price) else 0.0)
+    return pd.DataFrame({
+        'fast_window': ff,
+        'slow_window': ss,
+        'final_value': final,
+        'total_return': final / starting_capital - 1.0,
+        'n_trades': n_trades,
+        'max_drawdown': max_dd,
+    })
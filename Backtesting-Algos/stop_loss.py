@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional
+
+SIGNAL_COLUMNS = ['ticker', 'signal', 'entry_price', 'stop_price', 'current_price',
+                  'price_change_percentage', 'stop_triggered', 'risk_score',
+                  'capital_at_risk', 'estimated_loss']
+
+
+def generate_stop_loss_signals(positions_data_frame: pd.DataFrame,
+                               current_prices_data_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    SELL/HOLD stop-loss signal for every position with a current price.
+
+    Same records as the PositionSizing_And_StopLoss notebook version, but
+    positions and prices are joined once by ticker instead of filtering the
+    price table per position. As there, the first price row for a ticker
+    wins and positions without a price are skipped.
+    """
+    prices = current_prices_data_frame.drop_duplicates('ticker', keep='first').set_index('ticker')['price']
+    positions = positions_data_frame[positions_data_frame['ticker'].isin(prices.index)]
+
+    current_price = positions['ticker'].map(prices).to_numpy(dtype=float)
+    entry_price = positions['price'].to_numpy(dtype=float)
+    stop_price = positions['stop_loss_price'].to_numpy(dtype=float)
+    capital = positions['capital_allocated'].to_numpy(dtype=float)
+
+    price_change_percentage = (current_price - entry_price) / entry_price * 100
+    stop_triggered = current_price <= stop_price
+
+    return pd.DataFrame({
+        'ticker': positions['ticker'].to_numpy(),
+        'signal': np.where(stop_triggered, 'SELL', 'HOLD'),
+        'entry_price': entry_price,
+        'stop_price': stop_price,
+        'current_price': current_price,
+        'price_change_percentage': np.round(price_change_percentage, 2),
+        'stop_triggered': stop_triggered,
+        'risk_score': positions['risk_score'].to_numpy(),
+        'capital_at_risk': np.where(stop_triggered, capital, 0.0),
+        'estimated_loss': np.where(stop_triggered, capital * (price_change_percentage / 100), 0.0),
+    }, columns=SIGNAL_COLUMNS)
+
+
+class StopLossMonitor:
+    """
+    Live stop-loss monitor for a tick feed.
+
+    Stop prices are kept in an ascending sorted list per ticker, so a tick
+    at price p triggers exactly the tail of stops >= p: one bisect plus the
+    k triggered entries, O(log n + k). Triggered positions are removed and
+    returned as SELL signal records (same keys as generate_stop_loss_signals).
+    """
+
+    def __init__(self):
+        self.positions: Dict[Hashable, dict] = {}
+        self._stops: Dict[str, List[float]] = {}
+        self._ids: Dict[str, List[Hashable]] = {}
+        self.last_price: Dict[str, float] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, position_id: Hashable, ticker: str, entry_price: float, stop_price: float,
+            capital_allocated: float = 0.0, risk_score: float = float('nan')):
+        if position_id in self.positions:
+            self.remove(position_id)
+        self.positions[position_id] = {'ticker': ticker, 'entry_price': float(entry_price),
+                                       'stop_price': float(stop_price),
+                                       'capital_allocated': float(capital_allocated),
+                                       'risk_score': risk_score}
+        stops = self._stops.setdefault(ticker, [])
+        ids = self._ids.setdefault(ticker, [])
+        i = bisect_left(stops, stop_price)
+        stops.insert(i, float(stop_price))
+        ids.insert(i, position_id)
+
+    def load(self, positions_data_frame: pd.DataFrame, id_column: Optional[str] = None):
+        """
+        Bulk-load notebook-style positions (ticker, price, stop_loss_price,
+        capital_allocated, risk_score), sorting each ticker's stops once.
+        Position ids are the frame's index unless id_column is given.
+        """
+        df = positions_data_frame
+        ids = df[id_column].tolist() if id_column else df.index.tolist()
+        for pid, t, e, s, c, r in zip(ids, df['ticker'].tolist(), df['price'].tolist(),
+                                      df['stop_loss_price'].tolist(), df['capital_allocated'].tolist(),
+                                      df['risk_score'].tolist()):
+            if pid in self.positions:
+                self.remove(pid)
+            self.positions[pid] = {'ticker': t, 'entry_price': float(e), 'stop_price': float(s),
+                                   'capital_allocated': float(c), 'risk_score': r}
+        by_ticker: Dict[str, list] = {}
+        for pid, p in self.positions.items():
+            by_ticker.setdefault(p['ticker'], []).append((p['stop_price'], pid))
+        for ticker, entries in by_ticker.items():
+            entries.sort(key=lambda e: e[0])
+            self._stops[ticker] = [s for s, _ in entries]
+            self._ids[ticker] = [pid for _, pid in entries]
+
+    def remove(self, position_id: Hashable) -> bool:
+        p = self.positions.pop(position_id, None)
+        if p is None:
+            return False
+        stops, ids = self._stops[p['ticker']], self._ids[p['ticker']]
+        i = bisect_left(stops, p['stop_price'])
+        while ids[i] != position_id:
+            i += 1
+        del stops[i], ids[i]
+        return True
+
+    def update_stop(self, position_id: Hashable, stop_price: float):
+        """Move a stop (e.g. a trailing stop)."""
+        p = self.positions[position_id]
+        self.add(position_id, p['ticker'], p['entry_price'], stop_price,
+                 p['capital_allocated'], p['risk_score'])
+
+    def _signal(self, position_id: Hashable, p: dict, price: float) -> dict:
+        change = (price - p['entry_price']) / p['entry_price'] * 100
+        return {
+            'ticker': p['ticker'],
+            'signal': 'SELL',
+            'entry_price': p['entry_price'],
+            'stop_price': p['stop_price'],
+            'current_price': price,
+            'price_change_percentage': round(change, 2),
+            'stop_triggered': True,
+            'risk_score': p['risk_score'],
+            'capital_at_risk': p['capital_allocated'],
+            'estimated_loss': p['capital_allocated'] * (change / 100),
+            'position_id': position_id,
+        }
+
+    def on_tick(self, ticker: str, price: float) -> List[dict]:
+        """
+        Process one trade price; returns SELL records for every stop at or
+        above it. A NaN price triggers nothing (the notebook's price <= stop
+        HOLDs) and is not recorded as the last price.
+        """
+        if price != price:
+            return []
+        self.last_price[ticker] = price
+        stops = self._stops.get(ticker)
+        if not stops or stops[-1] < price:
+            return []
+        ids = self._ids[ticker]
+        i = bisect_left(stops, price)
+        hit = ids[i:]
+        del stops[i:], ids[i:]
+        positions = self.positions
+        return [self._signal(pid, positions.pop(pid), price) for pid in reversed(hit)]
+
+    def on_ticks(self, tickers: Iterable[str], prices: Iterable[float]) -> List[dict]:
+        out: List[dict] = []
+        for t, p in zip(tickers, prices):
+            if t in self._stops:
+                out.extend(self.on_tick(t, p))
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """Open positions in the notebook's column names (ticker, price, stop_loss_price, ...)."""
+        return pd.DataFrame([{'position_id': pid, 'ticker': p['ticker'], 'price': p['entry_price'],
+                              'stop_loss_price': p['stop_price'], 'capital_allocated': p['capital_allocated'],
+                              'risk_score': p['risk_score']} for pid, p in self.positions.items()],
+                            columns=['position_id', 'ticker', 'price', 'stop_loss_price',
+                                     'capital_allocated', 'risk_score'])
+
+    def signals(self) -> pd.DataFrame:
+        """SELL/HOLD records for all open positions against the last price seen per ticker."""
+        prices = pd.DataFrame({'ticker': list(self.last_price), 'price': list(self.last_price.values())})
+        return generate_stop_loss_signals(self.to_frame(), prices)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The backtesting modules are scripts in Backtesting-Algos/ (and Aakanksha/), imported by name
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / 'Aakanksha'))
+sys.path.insert(0, str(_ROOT))
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cost_models import fit_impact, load_fills
+
+
+def _write_log(path, n=200, seed=0):
+    """executed_trades-style fills (symbol/side/qty/price/ts) with known spread + sqrt impact."""
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n):
+        ticker = 'AAA' if i % 2 else 'BBB'
+        qty = int(rng.integers(100, 10_000))
+        side = 'BUY' if rng.random() < 0.5 else 'SELL'
+        slip = 0.0002 + 0.05 * np.sqrt(qty / 100_000)
+        price = 100.0 * (1 + slip if side == 'BUY' else 1 - slip)
+        records.append({'symbol': ticker, 'side': side, 'qty': qty, 'price': price, 'ts': 1.7e9 + 60 * i})
+    path.write_text(json.dumps(records))
+
+
+def test_fit_impact_on_plain_trade_log(tmp_path):
+    path = tmp_path / 'executed_trades.json'
+    _write_log(path)
+    mids = pd.DataFrame({'AAA': [100.0], 'BBB': [100.0]}, index=[pd.Timestamp('2020-01-01')])
+    daily = pd.DataFrame({'AAA': [100_000.0], 'BBB': [100_000.0]},
+                         index=pd.date_range('2023-11-14', periods=2))
+    fills = load_fills(path, mids=mids, volume=daily)
+    assert fills[['arrival_price', 'volume']].notna().all().all()
+    params = fit_impact(fills)
+    assert params['half_spread'].to_numpy() == pytest.approx([0.0002, 0.0002], abs=1e-9)
+    assert params['coef'].to_numpy() == pytest.approx([0.05, 0.05])
+
+
+def test_fit_impact_explains_missing_columns(tmp_path):
+    path = tmp_path / 'executed_trades.json'
+    _write_log(path, n=10)
+    with pytest.raises(ValueError, match='load_fills'):
+        fit_impact(load_fills(path))
+
+
+def test_recorded_arrival_price_is_kept(tmp_path):
+    path = tmp_path / 'executed_trades.jsonl'
+    path.write_text(json.dumps({'symbol': 'AAA', 'side': 'BUY', 'qty': 10, 'price': 101.0,
+                                'ts': 1.7e9, 'arrival_price': 100.5}) + '\n')
+    fills = load_fills(path, mids=pd.DataFrame({'AAA': [99.0]}, index=[pd.Timestamp(0)]), volume=1e6)
+    assert fills.loc[0, 'arrival_price'] == 100.5
+    assert fills.loc[0, 'volume'] == 1e6
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sma_crossover import run_sma_crossover, sweep_windows
+
+WINDOWS = range(1, 29)
+
+
+def _prices(values):
+    return pd.Series(values, index=pd.bdate_range('2024-01-01', periods=len(values)), name='price')
+
+
+def _assert_matches_loop(prices):
+    grid = sweep_windows(prices, WINDOWS, WINDOWS, starting_capital=1000.0)
+    assert len(grid) == 378
+    for row in grid.itertuples(index=False):
+        data, trades = run_sma_crossover(prices, row.fast_window, row.slow_window, starting_capital=1000.0)
+        assert row.n_trades == len(trades), (row.fast_window, row.slow_window)
+        assert row.final_value == pytest.approx(data['portfolio_value'].iloc[-1])
+
+
+def test_sweep_matches_loop_on_flat_prices():
+    _assert_matches_loop(_prices(np.full(120, 100.1)))
+
+
+def test_sweep_matches_loop_on_near_flat_prices():
+    rng = np.random.default_rng(7)
+    _assert_matches_loop(_prices(100.1 + np.round(rng.normal(0, 1e-9, 120), 12)))
+
+
+def test_sweep_matches_loop_on_random_walk():
+    rng = np.random.default_rng(3)
+    _assert_matches_loop(_prices(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200)))))
@@ -0,0 +1,14 @@
+from stop_loss import StopLossMonitor
+
+
+def test_nan_price_triggers_no_stops():
+    monitor = StopLossMonitor()
+    monitor.add('a', 'AAPL', 100.0, 95.0)
+    monitor.add('b', 'AAPL', 100.0, 90.0)
+    assert monitor.on_tick('AAPL', float('nan')) == []
+    assert monitor.on_ticks(['AAPL'], [float('nan')]) == []
+    assert len(monitor) == 2 and 'AAPL' not in monitor.last_price
+
+    signals = monitor.on_tick('AAPL', 94.0)
+    assert [s['position_id'] for s in signals] == ['a']
+    assert len(monitor) == 1
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from transaction_ledger import EXECUTION_LOG_SCHEMA, TransactionLedger
+
+
+def _rows(n):
+    return dict(Action=['BUY'] * n, Price=[1.0] * n, Shares=[1] * n, Position=[1] * n,
+                Cash=[1.0] * n, PortfolioValue=[1.0] * n)
+
+
+def test_tz_aware_dates_are_stored_as_naive_utc():
+    stamp = pd.Timestamp('2024-01-02 09:30', tz='America/New_York')
+    ledger = TransactionLedger()
+    ledger.append(date=stamp, type='BUY', asset='AAPL')
+    ledger.append(date='N/A', type='SELL', asset='AAPL')
+    assert ledger.to_frame()['date'].tolist()[0] == pd.Timestamp('2024-01-02 14:30')
+    assert ledger.to_frame()['date'].isna().tolist() == [False, True]
+
+    log = TransactionLedger(EXECUTION_LOG_SCHEMA)
+    log.extend(Date=pd.date_range(stamp, periods=2), **_rows(2))
+    log.extend(Date=['2024-02-01', None], **_rows(2))
+    assert log.to_frame()['Date'].tolist()[:3] == [pd.Timestamp('2024-01-02 14:30'),
+                                                   pd.Timestamp('2024-01-03 14:30'),
+                                                   pd.Timestamp('2024-02-01')]
+
+
+@pytest.mark.parametrize('value', [20240102, 1.7e18, True, np.int64(5)])
+def test_append_rejects_numeric_dates(value):
+    with pytest.raises(TypeError):
+        TransactionLedger().append(date=value)
+
+
+@pytest.mark.parametrize('dates', [[1, 2], np.arange(2), [pd.Timestamp('2024-01-02'), 3]])
+def test_extend_rejects_numeric_dates(dates):
+    with pytest.raises(TypeError):
+        TransactionLedger(EXECUTION_LOG_SCHEMA).extend(Date=dates, **_rows(2))
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Column kinds: 'datetime' (int64 ns, NaT for missing/'N/A'), 'category'
+# (dictionary-encoded strings), 'float' (NaN for missing), 'int'.
+# Datetime columns are stored tz-naive: tz-aware values are converted to UTC
+# with tz_convert(None), so they come back as naive UTC wall-clock times.
+PORTFOLIO_SCHEMA: Dict[str, str] = {
+    'date': 'datetime',
+    'type': 'category',
+    'asset': 'category',
+    'quantity': 'float',
+    'price': 'float',
+    'cost': 'float',
+    'proceeds': 'float',
+}
+
+# Matches the ExecutionLoop trade_log records
+EXECUTION_LOG_SCHEMA: Dict[str, str] = {
+    'Date': 'datetime',
+    'Action': 'category',
+    'Price': 'float',
+    'Shares': 'int',
+    'Position': 'int',
+    'Cash': 'float',
+    'PortfolioValue': 'float',
+}
+
+_NP_DTYPES = {'datetime': np.int64, 'category': np.int32, 'float': np.float64, 'int': np.int64}
+_MISSING = {'datetime': np.iinfo(np.int64).min, 'category': -1, 'float': np.nan, 'int': 0}
+_MISSING_DATES = ('N/A', '')  # PortfolioManager's default date
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (bool, int, float, np.number)) and not pd.isna(value)
+
+
+def _datetime_ns(values) -> np.ndarray:
+    """
+    int64 ns for an array of dates, None/NaT/'N/A' as NaT.
+
+    Numbers are rejected rather than read as ns since 1970, and tz-aware
+    dates are converted to naive UTC.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        raise TypeError(f"Datetime column got non-datetime values of dtype {values.dtype}")
+    if values.dtype == object:
+        numbers = values.map(_is_number)
+        if numbers.any():
+            raise TypeError(f"Datetime column got a non-datetime value: {values[numbers].iloc[0]!r}")
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = values.mask(values.isin(_MISSING_DATES))
+    stamps = pd.to_datetime(values)
+    if stamps.dt.tz is not None:
+        stamps = stamps.dt.tz_convert(None)
+    return pd.DatetimeIndex(stamps).as_unit('ns').asi8
+
+
+class TransactionLedger:
+    """
+    Append-only, fixed-schema trade ledger backed by preallocated column buffers.
+
+    Replaces the list-of-dicts audit trails (PortfolioManager.transactions,
+    ExecutionLoop trade_log). Buffers double in size when full, so append is
+    amortised O(1) and holds no per-row Python objects. If `parquet_path` is
+    given, it is treated as a directory and every `flush_rows` rows are written
+    to a new part file there, after which the buffers are reused, keeping
+    memory bounded for long simulations.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, str]] = None, capacity: int = 1024,
+                 parquet_path: Optional[Union[str, Path]] = None, flush_rows: int = 100_000):
+        self.schema = dict(schema or PORTFOLIO_SCHEMA)
+        for name, kind in self.schema.items():
+            if kind not in _NP_DTYPES:
+                raise ValueError(f"Unknown column kind '{kind}' for column '{name}'")
+        self._columns = {name: np.empty(max(capacity, 1), dtype=_NP_DTYPES[kind])
+                         for name, kind in self.schema.items()}
+        # Dictionary encoding for category columns: value -> code
+        self._vocab: Dict[str, Dict[str, int]] = {name: {} for name, kind in self.schema.items()
+                                                  if kind == 'category'}
+        self._n = 0
+        self._flushed = 0
+        self.parquet_path = Path(parquet_path) if parquet_path is not None else None
+        self.flush_rows = flush_rows
+        self._part_files = []
+
+    def __len__(self):
+        return self._flushed + self._n
+
+    def __repr__(self):
+        return f"<TransactionLedger | Rows: {len(self)} | Buffered: {self._n} | Flushed: {self._flushed}>"
+
+    def _grow(self, needed: int):
+        cap = len(next(iter(self._columns.values())))
+        if needed <= cap:
+            return
+        while cap < needed:
+            cap *= 2
+        for name, buf in self._columns.items():
+            new = np.empty(cap, dtype=buf.dtype)
+            new[:self._n] = buf[:self._n]
+            self._columns[name] = new
+
+    def _encode(self, name: str, kind: str, value):
+        if value is None:
+            return _MISSING[kind]
+        if kind == 'category':
+            vocab = self._vocab[name]
+            code = vocab.get(value)
+            if code is None:
+                code = vocab[value] = len(vocab)
+            return code
+        if kind == 'datetime':
+            if isinstance(value, str) and value in _MISSING_DATES:
+                return _MISSING[kind]
+            if _is_number(value):
+                raise TypeError(f"Column '{name}' expects a datetime, got {value!r}")
+            ts = pd.Timestamp(value)
+            if ts is pd.NaT:
+                return _MISSING[kind]
+            if ts.tz is not None:
+                ts = ts.tz_convert(None)
+            return ts.as_unit('ns').value
+        return value
+
+    def append(self, *values, **fields):
+        """
+        Append one row, given positionally in schema order or by column name.
+        Columns not supplied are stored as missing (NaN/NaT). Datetime columns
+        take datetime-like values only (TypeError for numbers); tz-aware ones
+        are stored as naive UTC.
+        """
+        if values:
+            fields.update(zip(self.schema, values))
+        if self._n >= len(next(iter(self._columns.values()))):
+            self._grow(self._n + 1)
+        i = self._n
+        for name, kind in self.schema.items():
+            self._columns[name][i] = self._encode(name, kind, fields.get(name))
+        self._n += 1
+        if self.parquet_path is not None and self._n >= self.flush_rows:
+            self.flush()
+
+    def extend(self, **columns):
+        """Append many rows at once from equal-length arrays keyed by column name."""
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("All columns passed to extend() must have the same length")
+        m = lengths.pop()
+        self._grow(self._n + m)
+        sl = slice(self._n, self._n + m)
+        for name, kind in self.schema.items():
+            if name not in columns:
+                self._columns[name][sl] = _MISSING[kind]
+            elif kind == 'category':
+                self._columns[name][sl] = [self._encode(name, kind, v) for v in columns[name]]
+            elif kind == 'datetime':
+                self._columns[name][sl] = _datetime_ns(columns[name])
+            else:
+                self._columns[name][sl] = columns[name]
+        self._n += m
+        if self.parquet_path is not None and self._n >= self.flush_rows:
+            self.flush()
+
+    def _categories(self, name: str) -> pd.Index:
+        return pd.Index(list(self._vocab[name]), dtype=object)
+
+    def to_frame(self, copy: bool = False) -> pd.DataFrame:
+        """
+        Buffered (not yet flushed) rows as a DataFrame.
+
+        With copy=False numeric and datetime columns are views of the ledger
+        buffers; they stay valid until the next flush() reuses the buffers.
+        """
+        data = {}
+        for name, kind in self.schema.items():
+            buf = self._columns[name][:self._n]
+            if copy:
+                buf = buf.copy()
+            if kind == 'category':
+                data[name] = pd.Categorical.from_codes(buf, categories=self._categories(name))
+            elif kind == 'datetime':
+                data[name] = pd.Series(buf.view('datetime64[ns]'), copy=False)
+            else:
+                data[name] = pd.Series(buf, copy=False)
+        return pd.DataFrame(data, copy=False)
+
+    def _to_arrow(self):
+        import pyarrow as pa
+        arrays = []
+        for name, kind in self.schema.items():
+            buf = self._columns[name][:self._n]
+            if kind == 'category':
+                codes = pa.array(buf, mask=buf < 0, type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(codes, pa.array(list(self._vocab[name]), pa.string())))
+            elif kind == 'datetime':
+                arrays.append(pa.array(buf.view('datetime64[ns]')))
+            else:
+                arrays.append(pa.array(buf))
+        return pa.Table.from_arrays(arrays, names=list(self.schema))
+
+    def flush(self):
+        """Write buffered rows to a new Parquet part file and reset the buffers."""
+        if self.parquet_path is None:
+            raise ValueError("flush() requires the ledger to be created with a parquet_path")
+        if self._n == 0:
+            return
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Parquet export (pip install pyarrow)") from e
+        self.parquet_path.mkdir(parents=True, exist_ok=True)
+        part = self.parquet_path / f"part-{len(self._part_files):05d}.parquet"
+        pq.write_table(self._to_arrow(), str(part))
+        self._part_files.append(part)
+        self._flushed += self._n
+        self._n = 0
+
+    def close(self):
+        """Flush any remaining buffered rows to Parquet."""
+        if self.parquet_path is not None:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read_all(self) -> pd.DataFrame:
+        """All rows (flushed and buffered) as a single DataFrame."""
+        frames = []
+        if self._flushed:
+            frames.extend(pd.read_parquet(part) for part in self._part_files)
+        frames.append(self.to_frame(copy=True))
+        if len(frames) == 1:
+            return frames[0]
+        out = pd.concat(frames, ignore_index=True)
+        for name, kind in self.schema.items():
+            if kind == 'category':
+                out[name] = out[name].astype('category')
+        return out
@@ -22,20 +22,27 @@ hide_streamlit_style = """
             """
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
-from pages import Home, Login, Chatbot, Learn, Assets
+import importlib
 
+from utils import data
+
+# Page modules are imported only when selected; Streamlit reruns this script
+# on every interaction, and sys.modules makes later imports free.
 PAGES = {
-    "Home": Home,
-    "Login": Login,
-    "Chatbot": Chatbot,
-    "Learn": Learn,
-    "Assets": Assets
+    "Home": "pages.Home",
+    "Login": "pages.Login",
+    "Chatbot": "pages.Chatbot",
+    "Learn": "pages.Learn",
+    "Assets": "pages.Assets"
 }
 
+# Start filling the shared data caches while the first page renders
+data.warm_up()
+
 st.sidebar.title("Navigation")
 selection = st.sidebar.selectbox("Go to", list(PAGES.keys()))
 
-PAGES[selection].app()
+importlib.import_module(PAGES[selection]).app()
 
 
 
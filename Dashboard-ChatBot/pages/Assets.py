@@ -1,5 +1,55 @@
+import pandas as pd
 import streamlit as st
 
+from utils import data
+
+
+def _holdings_editor():
+    """Holdings as ((ticker, shares), ...), edited in a form so typing doesn't rerun the page."""
+    if 'holdings' not in st.session_state:
+        st.session_state['holdings'] = data.DEFAULT_HOLDINGS
+    current = pd.DataFrame(st.session_state['holdings'], columns=['ticker', 'shares'])
+    with st.form("holdings_form"):
+        edited = st.data_editor(current, num_rows="dynamic", hide_index=True, use_container_width=True)
+        if st.form_submit_button("Update portfolio"):
+            edited = edited.dropna()
+            edited = edited[edited['shares'] > 0]
+            edited['ticker'] = edited['ticker'].astype(str).str.strip().str.upper()
+            st.session_state['holdings'] = tuple(edited.groupby('ticker', sort=False)['shares'].sum().items())
+    return st.session_state['holdings']
+
+
 def app():
     st.title("Investment Assets")
-    st.write("Asset tracking page coming soon")
+
+    holdings = _holdings_editor()
+    if not holdings:
+        st.info("Add a holding to see your portfolio.")
+        return
+    period = st.selectbox("Period", data.PERIODS, index=data.PERIODS.index("1y"))
+    tickers = tuple(t for t, _ in holdings)
+
+    try:
+        with st.spinner("Loading portfolio..."):
+            portfolio = data.portfolio_analytics(holdings, period)
+            assets = data.asset_analytics(tickers, period)
+    except Exception as e:
+        st.error(f"Could not load portfolio data: {e}")
+        return
+
+    summary = portfolio['summary']
+    cols = st.columns(5)
+    cols[0].metric("Value", f"${summary['value']:,.2f}")
+    cols[1].metric("Return", f"{summary['total_return']:+.2%}")
+    cols[2].metric("Volatility", f"{summary['volatility']:.2%}")
+    cols[3].metric("Max drawdown", f"{summary['max_drawdown']:.2%}")
+    cols[4].metric("Sharpe", f"{summary['sharpe']:.2f}")
+
+    st.subheader("Portfolio value")
+    st.line_chart(portfolio['value'])
+    st.subheader("Drawdown")
+    st.area_chart(portfolio['drawdown'])
+
+    st.subheader("Holdings")
+    st.dataframe(portfolio['positions'].join(assets[['close', 'period_return', 'volatility', 'rsi']]),
+                 use_container_width=True)
@@ -1,5 +1,45 @@
 import streamlit as st
 
+from utils import data
+
+
 def app():
     st.title("RoboInvestor Dashboard")
     st.write("Welcome to the main dashboard")
+
+    period = st.selectbox("Period", data.PERIODS, index=data.PERIODS.index("1y"))
+
+    st.subheader("Market snapshot")
+    try:
+        with st.spinner("Loading market data..."):
+            snapshot = data.asset_analytics(data.WATCHLIST, period)
+    except Exception as e:
+        st.error(f"Could not load market data: {e}")
+    else:
+        cols = st.columns(len(snapshot))
+        for col, (ticker, row) in zip(cols, snapshot.iterrows()):
+            col.metric(ticker, f"${row['close']:,.2f}", f"{row['day_change']:+.2%}")
+        st.dataframe(snapshot[['close', 'period_return', 'volatility', 'max_drawdown', 'sharpe',
+                               'rsi', 'sma_20', 'sma_50']],
+                     use_container_width=True)
+        # Warm the other periods in the background so switching is instant
+        for other in data.PERIODS:
+            data.prefetch(data.asset_analytics, data.WATCHLIST, other)
+
+    st.subheader("Persona picks")
+    # Persona scores need every persona's fundamentals; they are computed in
+    # the background and shown once ready instead of blocking the page.
+    try:
+        scores = data.peek(data.persona_scores, None, every=data.PERSONA_TTL)
+    except Exception as e:
+        st.error(f"Could not score the personas: {e}")
+        st.button("Retry")
+        return
+    if scores is None:
+        st.info("Persona scores are being computed in the background.")
+        st.button("Refresh")
+        return
+    tabs = st.tabs(list(scores['persona'].unique()))
+    for tab, (persona, group) in zip(tabs, scores.groupby('persona', sort=False)):
+        tab.dataframe(group.nlargest(10, 'score')[['ticker', 'score']], hide_index=True,
+                      use_container_width=True)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The pages import utils.* relative to Dashboard-ChatBot/, as streamlit runs them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
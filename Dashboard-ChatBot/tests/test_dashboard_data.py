@@ -0,0 +1,35 @@
+import pytest
+
+from utils import data
+
+
+def _flaky(calls):
+    def flaky_scores(key):
+        calls.append(key)
+        if len(calls) == 1:
+            raise ConnectionError('transient')
+        return 'scores'
+    return flaky_scores
+
+
+def test_failed_prefetch_is_retried():
+    calls = []
+    fn = _flaky(calls)
+    first = data.prefetch(fn, 'a', every=3600)
+    assert isinstance(first.exception(timeout=5), ConnectionError)
+    # A failed prefetch does not count as fresh: the next ask resubmits
+    second = data.prefetch(fn, 'a', every=3600)
+    assert second is not first
+    assert second.result(timeout=5) == 'scores'
+    assert data.prefetch(fn, 'a', every=3600) is second
+    assert calls == ['a', 'a']
+
+
+def test_peek_raises_a_failure_once_then_retries():
+    calls = []
+    fn = _flaky(calls)
+    data.prefetch(fn, 'b', every=3600).exception(timeout=5)
+    with pytest.raises(ConnectionError):
+        data.peek(fn, 'b', every=3600)
+    data.prefetch(fn, 'b', every=3600).result(timeout=5)
+    assert data.peek(fn, 'b', every=3600) == 'scores'
@@ -0,0 +1,154 @@
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# indicators.py lives at the repo root and persona_engine.py in AI-Personas/
+# (the notebooks add '..' the same way)
+_ROOT = Path(__file__).resolve().parents[2]
+for _path in (_ROOT, _ROOT / "AI-Personas"):
+    if str(_path) not in sys.path:
+        sys.path.append(str(_path))
+
+MARKET_TTL = 15 * 60            # prices: refreshed every 15 minutes
+ANALYTICS_TTL = 15 * 60
+PERSONA_TTL = 6 * 60 * 60       # persona scores read fundamentals, which change slowly
+TRADING_DAYS = 252
+
+WATCHLIST = ("AAPL", "MSFT", "GOOGL", "AMZN", "META")
+DEFAULT_HOLDINGS = (("AAPL", 10.0), ("MSFT", 8.0), ("GOOGL", 12.0), ("AMZN", 10.0), ("META", 4.0))
+PERIODS = ("1mo", "3mo", "6mo", "1y", "2y", "5y")
+
+# Every cached function takes hashable arguments (tuples, not lists) so
+# st.cache_data can key on them. Results are shared by all sessions and
+# reused across reruns until their TTL runs out.
+
+
+@st.cache_data(ttl=MARKET_TTL, show_spinner=False)
+def market_data(tickers: Tuple[str, ...], period: str = "1y") -> pd.DataFrame:
+    """Daily closes for every ticker from one yf.download call (dates x tickers)."""
+    import yfinance as yf
+    closes = yf.download(list(tickers), period=period, auto_adjust=True, progress=False)['Close']
+    closes = closes.to_frame(tickers[0]) if isinstance(closes, pd.Series) else closes
+    return closes.reindex(columns=list(tickers))
+
+
+@st.cache_data(ttl=ANALYTICS_TTL, show_spinner=False)
+def asset_analytics(tickers: Tuple[str, ...], period: str = "1y") -> pd.DataFrame:
+    """One row per ticker: latest close and indicators, period return, volatility, drawdown and Sharpe."""
+    from indicators import latest_indicators
+
+    closes = market_data(tickers, period)
+    returns = closes.pct_change(fill_method=None)
+    first = closes.apply(lambda s: s.dropna().iloc[0] if s.notna().any() else np.nan)
+    last = closes.ffill().iloc[-1] if len(closes) else pd.Series(np.nan, index=closes.columns)
+    vol = returns.std() * np.sqrt(TRADING_DAYS)
+    out = pd.DataFrame({
+        'close': last,
+        'day_change': returns.ffill().iloc[-1] if len(returns) else np.nan,
+        'period_return': last / first - 1,
+        'volatility': vol,
+        'max_drawdown': (closes / closes.cummax() - 1).min(),
+        'sharpe': returns.mean() * TRADING_DAYS / vol,
+    })
+    indicators = latest_indicators(closes).drop(columns='close', errors='ignore')
+    out = out.join(indicators)
+    out.index.name = 'ticker'
+    return out
+
+
+@st.cache_data(ttl=ANALYTICS_TTL, show_spinner=False)
+def portfolio_analytics(holdings: Tuple[Tuple[str, float], ...], period: str = "1y") -> Dict:
+    """
+    Value history, drawdown, current weights and summary numbers of a
+    buy-and-hold portfolio given as ((ticker, shares), ...).
+    """
+    tickers = tuple(t for t, _ in holdings)
+    shares = pd.Series(dict(holdings), dtype=float)
+    closes = market_data(tickers, period).ffill()
+    positions = closes[list(tickers)] * shares
+    value = positions.sum(axis=1, min_count=1).dropna()
+    returns = value.pct_change().dropna()
+    drawdown = value / value.cummax() - 1
+    latest = positions.ffill().iloc[-1] if len(positions) else pd.Series(np.nan, index=list(tickers))
+    vol = returns.std() * np.sqrt(TRADING_DAYS)
+    return {
+        'value': value.rename('value'),
+        'drawdown': drawdown.rename('drawdown'),
+        'positions': pd.DataFrame({'shares': shares, 'value': latest, 'weight': latest / latest.sum()}),
+        'summary': {
+            'value': float(value.iloc[-1]) if len(value) else np.nan,
+            'total_return': float(value.iloc[-1] / value.iloc[0] - 1) if len(value) else np.nan,
+            'volatility': float(vol),
+            'max_drawdown': float(drawdown.min()) if len(drawdown) else np.nan,
+            'sharpe': float(returns.mean() * TRADING_DAYS / vol) if vol else np.nan,
+        },
+    }
+
+
+@st.cache_data(ttl=PERSONA_TTL, show_spinner=False)
+def persona_scores(names: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    """persona_engine.score_personas for the named personas (all by default)."""
+    from persona_engine import PERSONAS, score_personas
+    return score_personas([p for p in PERSONAS if names is None or p.name in names])
+
+
+# -- background prefetch ---------------------------------------------------------
+
+@st.cache_resource
+def _prefetcher() -> Tuple[ThreadPoolExecutor, Dict, threading.Lock]:
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='dashboard-prefetch'), {}, threading.Lock()
+
+
+def prefetch(fn, *args, every: float = MARKET_TTL) -> Future:
+    """
+    Compute fn(*args) into its cache on a background thread.
+
+    Repeated calls (every rerun) are no-ops while the same call is running
+    or succeeded less than `every` seconds ago, so pages can ask freely. A
+    call that failed is resubmitted on the next ask.
+    """
+    pool, submitted, lock = _prefetcher()
+    key = (fn.__name__, args)
+    with lock:
+        entry = submitted.get(key)
+        if entry is not None:
+            started, future = entry
+            if not future.done() or (future.exception() is None and time.monotonic() - started < every):
+                return future
+        future = pool.submit(fn, *args)
+        submitted[key] = (time.monotonic(), future)
+        return future
+
+
+def peek(fn, *args, every: float = MARKET_TTL):
+    """
+    fn(*args) if its prefetch has finished, else None (and the prefetch is
+    started). A failed prefetch raises its error once; the next call retries.
+    """
+    _, submitted, lock = _prefetcher()
+    key = (fn.__name__, args)
+    with lock:
+        entry = submitted.get(key)
+        if entry is not None and entry[1].done() and entry[1].exception() is not None:
+            del submitted[key]
+            raise entry[1].exception()
+    future = prefetch(fn, *args, every=every)
+    if not future.done():
+        return None
+    if future.exception() is not None:
+        raise future.exception()
+    return fn(*args)
+
+
+def warm_up(period: str = "1y"):
+    """Prefetch what Home and Assets show first, so the first page view is a cache hit."""
+    prefetch(asset_analytics, WATCHLIST, period)
+    prefetch(portfolio_analytics, DEFAULT_HOLDINGS, period)
+    prefetch(persona_scores, None, every=PERSONA_TTL)
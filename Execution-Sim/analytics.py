@@ -1,6 +1,11 @@
-from typing import Iterable, Dict, List, Optional
+from itertools import chain
+from typing import Iterable, Dict, List, Optional, Sequence
 import math
 
+import numpy as np
+
+_ADD = 0  # replay.ADD
+
 def mean(x: Iterable[float]) -> float:
     x = list(x); 
     return sum(x)/len(x) if x else float("nan")
@@ -47,3 +52,175 @@ def stats_from_order_book(order_book: Dict[str, Dict[str, List[float]]],
             prices = list(lvls.get(side, []))
         out[sym] = price_stats(prices, sample=sample)
     return out
+
+
+# ---------------------------------------------------------------------------
+# Batched NumPy path: every symbol in one call
+# ---------------------------------------------------------------------------
+
+def grouped_stats(values: np.ndarray, groups: np.ndarray, n_groups: int,
+                  sample: bool=False) -> Dict[str, np.ndarray]:
+    """
+    count/mean/median/variance/stdev for each group id in [0, n_groups).
+    Sums are accumulated in input order, so results agree with the scalar
+    functions to rounding: the mean and variance may differ in the last
+    ulp or so (e.g. Python 3.12+ sum() is compensated, bincount is not).
+    """
+    values = np.asarray(values, dtype=float); groups = np.asarray(groups, dtype=np.intp)
+    n = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.bincount(groups, weights=values, minlength=n_groups)/n
+        ss = np.bincount(groups, weights=(values-mu[groups])**2, minlength=n_groups)
+        ddof = 1 if sample else 0
+        var = np.where(n > ddof, ss/np.maximum(n-ddof, 1), np.nan)
+        mu = np.where(n > 0, mu, np.nan)
+    # Median: sort within groups, then pick the middle one or two entries
+    sv = values[np.lexsort((values, groups))]
+    start = np.cumsum(n) - n
+    lo = np.clip(start + (n-1)//2, 0, max(len(sv)-1, 0)); hi = np.clip(start + n//2, 0, max(len(sv)-1, 0))
+    med = np.where(n > 0, (sv[lo]+sv[hi])/2.0, np.nan) if len(sv) else np.full(n_groups, np.nan)
+    return {"count": n, "mean": mu, "median": med, "variance": var, "stdev": np.sqrt(var)}
+
+def batch_stats(order_book: Dict[str, Dict[str, List[float]]],
+                side: Optional[str]=None,
+                sample: bool=False) -> Dict[str, Dict[str, float]]:
+    """
+    stats_from_order_book for all symbols in one vectorised pass; same keys
+    and counts/medians, mean and variance equal up to float rounding.
+    """
+    syms = list(order_book)
+    sides = ("bid", "ask") if side is None else (side,)
+    levels = [order_book[s].get(k, []) for s in syms for k in sides]
+    counts = np.fromiter((len(l) for l in levels), dtype=np.intp, count=len(levels))
+    values = np.fromiter(chain.from_iterable(levels), dtype=float, count=int(counts.sum()))
+    groups = np.repeat(np.repeat(np.arange(len(syms)), len(sides)), counts)
+    st = grouped_stats(values, groups, len(syms), sample=sample)
+    cols = {k: v.tolist() for k, v in st.items()}
+    return {sym: {k: cols[k][i] for k in cols} for i, sym in enumerate(syms)}
+
+
+# ---------------------------------------------------------------------------
+# Streaming path: O(1) update per book event
+# ---------------------------------------------------------------------------
+
+class P2Quantile:
+    """
+    P-square quantile estimator (Jain & Chlamtac, 1985): five markers, no
+    stored samples. Exact while n <= 5 (same interpolation as median() / numpy).
+    """
+    __slots__ = ("p", "n", "q", "pos", "want", "dn")
+
+    def __init__(self, p: float=0.5):
+        if not 0 < p < 1: raise ValueError("p must be in (0, 1)")
+        self.p = p; self.n = 0; self.q: List[float] = []
+        self.pos = [0, 1, 2, 3, 4]
+        self.want = [0.0, 2*p, 4*p, 2+2*p, 4.0]
+        self.dn = [0.0, p/2, p, (1+p)/2, 1.0]
+
+    def update(self, x: float):
+        self.n += 1
+        q = self.q
+        if self.n <= 5:
+            q.append(x); q.sort(); return
+        pos, want = self.pos, self.want
+        if x < q[0]: q[0] = x; k = 0
+        elif x >= q[4]: q[4] = x; k = 3
+        else:
+            k = 0
+            while x >= q[k+1]: k += 1
+        for i in range(k+1, 5): pos[i] += 1
+        for i in range(5): want[i] += self.dn[i]
+        for i in (1, 2, 3):
+            d = want[i] - pos[i]
+            if (d >= 1 and pos[i+1]-pos[i] > 1) or (d <= -1 and pos[i-1]-pos[i] < -1):
+                d = 1 if d > 0 else -1
+                # Piecewise-parabolic prediction, falling back to linear if it leaves the bracket
+                qp = q[i] + d/(pos[i+1]-pos[i-1]) * ((pos[i]-pos[i-1]+d)*(q[i+1]-q[i])/(pos[i+1]-pos[i])
+                                                      + (pos[i+1]-pos[i]-d)*(q[i]-q[i-1])/(pos[i]-pos[i-1]))
+                if not q[i-1] < qp < q[i+1]:
+                    qp = q[i] + d*(q[i+d]-q[i])/(pos[i+d]-pos[i])
+                q[i] = qp; pos[i] += d
+
+    def value(self) -> float:
+        n = self.n
+        if n == 0: return float("nan")
+        if n <= 5:
+            h = (n-1)*self.p; lo = int(math.floor(h)); hi = min(lo+1, n-1)
+            return self.q[lo] + (h-lo)*(self.q[hi]-self.q[lo])
+        return self.q[2]
+
+class StreamingStats:
+    """
+    Running count/mean/variance (Welford) plus P-square quantiles. Each
+    update() is O(1) and nothing is stored, so it can sit on a live book feed.
+    stats() returns the same keys as price_stats.
+    """
+
+    def __init__(self, quantiles: Sequence[float]=(0.5,), sample: bool=False):
+        self.sample = sample
+        self.n = 0; self._mean = 0.0; self._m2 = 0.0
+        self.estimators = {p: P2Quantile(p) for p in quantiles}
+        if 0.5 not in self.estimators: self.estimators[0.5] = P2Quantile(0.5)
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self._mean
+        self._mean += delta/self.n
+        self._m2 += delta*(x - self._mean)
+        for est in self.estimators.values(): est.update(x)
+
+    def extend(self, xs: Iterable[float]):
+        for x in xs: self.update(x)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.n else float("nan")
+
+    @property
+    def variance(self) -> float:
+        if self.n == 0 or (self.sample and self.n < 2): return float("nan")
+        return self._m2/(self.n-1 if self.sample else self.n)
+
+    @property
+    def stdev(self) -> float:
+        v = self.variance
+        return math.sqrt(v) if v==v else float("nan")
+
+    @property
+    def median(self) -> float:
+        return self.estimators[0.5].value()
+
+    def quantile(self, p: float) -> float:
+        return self.estimators[p].value()
+
+    def stats(self) -> Dict[str, float]:
+        return {"count": self.n, "mean": self.mean, "median": self.median,
+                "variance": self.variance, "stdev": self.stdev}
+
+class SubmittedPriceStats:
+    """
+    One StreamingStats per symbol over submitted limit prices. Call
+    update(symbol, price) per new order, or register it directly as a
+    replay.Replayer hook, which counts ADD events only.
+
+    These are stats of every price ever submitted, not of the orders
+    currently resting in the book: the streaming quantiles cannot forget a
+    value, so cancels and fills are not taken back out.
+    """
+
+    def __init__(self, quantiles: Sequence[float]=(0.5,), sample: bool=False):
+        self.quantiles = tuple(quantiles); self.sample = sample
+        self.by_symbol: Dict[str, StreamingStats] = {}
+
+    def update(self, symbol: str, price: float):
+        st = self.by_symbol.get(symbol)
+        if st is None:
+            st = self.by_symbol[symbol] = StreamingStats(self.quantiles, sample=self.sample)
+        st.update(price)
+
+    def __call__(self, event, replayer=None):
+        if event.type == _ADD:
+            self.update(event.symbol, event.price)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {sym: st.stats() for sym, st in self.by_symbol.items()}
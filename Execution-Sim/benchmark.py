@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+------------
+
+Throughput and latency benchmark for the execution simulator.
+
+A synthetic, seeded order flow (Poisson arrivals, configurable add / cancel /
+market mix over any number of symbols) is pushed through three layers:
+
+    engine   MatchingEngine limit adds, cancels and market orders
+    fills    the same flow with market orders as sweeps (FillReport, VWAP,
+             slippage) and an on_fill callback
+    algos    the flow as events on the ExecutionSimulator clock, with TWAP /
+             VWAP / POV parent orders working against it
+
+For each layer it reports messages/sec (untimed pass, best of --repeat) and
+p50/p99/p999 per-message latency (separate timed pass), plus memory per
+resting order. Results are printed as JSON, or written with --output, so runs
+can be compared across commits. The flow depends only on the seed; timings
+naturally depend on the machine.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --messages 500000 --symbols 50 --mix 0.6,0.3,0.1
+    python benchmark.py --seed 7 --output results.json --write-flow flow.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from execution_algos import ExecutionSimulator, ParentOrder
+from matching_engine import MatchingEngine, BUY, SELL
+from replay import ADD, CANCEL, TRADE, MESSAGE_DTYPE, SIDES, write_messages
+
+TICK = 0.01
+
+
+def generate_flow(n_messages: int, n_symbols: int = 10, mix: Sequence[float] = (0.6, 0.3, 0.1),
+                  rate: float = 100_000.0, cross_prob: float = 0.05, cancel_window: int = 1000,
+                  seed: int = 0) -> Tuple[np.ndarray, List[str]]:
+    """
+    Synthetic order flow as a replay.MESSAGE_DTYPE array plus its symbol table.
+
+    Arrivals are Poisson at `rate` messages/sec. mix gives the probabilities
+    of ADD, CANCEL and market (TRADE) messages. Limit prices sit a geometric
+    number of ticks behind a fixed per-symbol mid; cross_prob of them are
+    marketable instead. Cancels target one of the last cancel_window adds, so
+    some hit orders that are already gone, as in real flow.
+    """
+    rng = np.random.default_rng(seed)
+    p = np.asarray(mix, dtype=float)
+    p = p / p.sum()
+
+    ts = np.cumsum(rng.exponential(1e9 / rate, n_messages)).astype(np.int64)
+    typ = rng.choice(3, size=n_messages, p=p).astype(np.uint8)
+    typ[0] = ADD
+    sym = rng.integers(0, n_symbols, n_messages)
+    side = rng.integers(0, 2, n_messages).astype(np.uint8)
+    qty = (rng.integers(1, 10, n_messages) * 100).astype(np.uint32)
+
+    mids = 100.0 + 10.0 * np.arange(n_symbols)
+    ticks = rng.geometric(0.3, n_messages)
+    ticks = np.where(rng.random(n_messages) < cross_prob, -rng.integers(0, 3, n_messages), ticks)
+    direction = np.where(side == 0, -1.0, 1.0)    # BUY rests below mid, SELL above
+    price = np.round(mids[sym] + direction * ticks * TICK, 2)
+
+    is_add = typ == ADD
+    add_pos = np.flatnonzero(is_add)
+    order_id = np.zeros(n_messages, dtype=np.uint64)
+    order_id[add_pos] = np.arange(1, len(add_pos) + 1)
+
+    cancels = np.flatnonzero(typ == CANCEL)
+    adds_before = np.cumsum(is_add)[cancels]
+    back = rng.integers(0, np.minimum(cancel_window, adds_before))
+    target = adds_before - back                     # 1-based add number
+    order_id[cancels] = target
+    sym[cancels] = sym[add_pos[target - 1]]
+    side[cancels] = side[add_pos[target - 1]]
+
+    price[typ != ADD] = 0.0
+    qty[typ == CANCEL] = 0
+
+    flow = np.empty(n_messages, dtype=MESSAGE_DTYPE)
+    flow['ts'] = ts
+    flow['order_id'] = order_id
+    flow['price'] = price
+    flow['qty'] = qty
+    flow['symbol'] = sym
+    flow['type'] = typ
+    flow['side'] = side
+    return flow, [f"SYM{i:03d}" for i in range(n_symbols)]
+
+
+def _columns(flow: np.ndarray, symbols: Sequence[str]):
+    names = np.array(symbols, dtype=object)[flow['symbol']].tolist()
+    sides = np.array(SIDES, dtype=object)[flow['side']].tolist()
+    return list(zip(flow['type'].tolist(), names, sides, flow['price'].tolist(),
+                    flow['qty'].tolist(), flow['order_id'].tolist()))
+
+
+def _dispatcher(engine: MatchingEngine, sweep: bool) -> Callable:
+    submit_limit, cancel = engine.submit_limit, engine.cancel
+    market = engine.sweep if sweep else engine.submit_market
+
+    def dispatch(typ, symbol, side, price, qty, oid):
+        if typ == ADD:
+            submit_limit(symbol, side, price, qty, oid)
+        elif typ == CANCEL:
+            cancel(oid)
+        else:
+            market(symbol, side, qty)
+    return dispatch
+
+
+def _latency_summary(latencies_ns: np.ndarray) -> Dict[str, float]:
+    p50, p99, p999 = np.percentile(latencies_ns, [50, 99, 99.9])
+    return {'p50_ns': float(p50), 'p99_ns': float(p99), 'p999_ns': float(p999),
+            'max_ns': float(latencies_ns.max()), 'mean_ns': float(latencies_ns.mean())}
+
+
+def _engine_for(layer: str) -> Tuple[MatchingEngine, List[int]]:
+    fill_count = [0]
+    if layer == 'fills':
+        def on_fill(fill):
+            fill_count[0] += 1
+        return MatchingEngine(on_fill=on_fill), fill_count
+    return MatchingEngine(), fill_count
+
+
+def bench_book_layer(layer: str, messages: list, repeat: int = 3) -> Dict[str, object]:
+    """'engine' or 'fills': best-of-repeat throughput, then one timed pass for latency."""
+    sweep = layer == 'fills'
+    best = float('inf')
+    for _ in range(repeat):
+        engine, _ = _engine_for(layer)
+        dispatch = _dispatcher(engine, sweep)
+        gc.collect()
+        t0 = time.perf_counter()
+        for m in messages:
+            dispatch(*m)
+        best = min(best, time.perf_counter() - t0)
+
+    engine, fills = _engine_for(layer)
+    dispatch = _dispatcher(engine, sweep)
+    clock = time.perf_counter_ns
+    lat = np.empty(len(messages), dtype=np.int64)
+    gc.collect()
+    for i, m in enumerate(messages):
+        t = clock()
+        dispatch(*m)
+        lat[i] = clock() - t
+
+    return {'messages': len(messages), 'seconds': best, 'msgs_per_sec': len(messages) / best,
+            'latency': _latency_summary(lat),
+            'resting_orders': sum(len(b.orders) for b in engine.books.values()),
+            **({'fills': fills[0]} if sweep else {})}
+
+
+def bench_algos_layer(messages: list, flow: np.ndarray, symbols: Sequence[str],
+                      n_parents: int = 100, n_slices: int = 20, seed: int = 0,
+                      repeat: int = 3) -> Dict[str, object]:
+    """Flow and parent-order child slices as events on one ExecutionSimulator clock."""
+    times = (flow['ts'] / 1e9).tolist()
+    horizon = times[-1] if times else 0.0
+    rng = np.random.default_rng(seed + 1)
+    algos = ('TWAP', 'VWAP', 'POV')
+    parents = [(symbols[int(rng.integers(len(symbols)))], SIDES[int(rng.integers(2))],
+                int(rng.integers(10, 100)) * 100, algos[i % 3]) for i in range(n_parents)]
+    profile = [3, 2, 1, 1, 1, 2, 3]
+
+    def build(timed: Optional[np.ndarray]):
+        engine = MatchingEngine()
+        sim = ExecutionSimulator(engine)
+        dispatch = _dispatcher(engine, sweep=False)
+        if timed is None:
+            for at, m in zip(times, messages):
+                sim.schedule(at, dispatch, *m)
+        else:
+            clock = time.perf_counter_ns
+            slot = iter(range(len(timed)))
+
+            def timed_dispatch(*m):
+                t = clock()
+                dispatch(*m)
+                timed[next(slot)] = clock() - t
+            for at, m in zip(times, messages):
+                sim.schedule(at, timed_dispatch, *m)
+        for symbol, side, qty, algo in parents:
+            kwargs = {'n_slices': n_slices}
+            if algo != 'TWAP':
+                kwargs = {'volume_profile': profile if algo == 'VWAP' else [qty * 2] * len(profile)}
+            sim.submit(ParentOrder(symbol, side, qty, 0.0, horizon, algo=algo, **kwargs))
+        return sim
+
+    best, events = float('inf'), 0
+    for _ in range(repeat):
+        sim = build(None)
+        gc.collect()
+        t0 = time.perf_counter()
+        events = sim.run()
+        best = min(best, time.perf_counter() - t0)
+
+    lat = np.empty(len(messages), dtype=np.int64)
+    sim = build(lat)
+    gc.collect()
+    sim.run()
+    report = sim.shortfall_report()
+    filled = sum(r['ExecutedQty'] for r in report)
+    requested = sum(r['RequestedQty'] for r in report)
+
+    return {'messages': len(messages), 'events': events, 'seconds': best,
+            'msgs_per_sec': events / best, 'latency': _latency_summary(lat),
+            'parent_orders': n_parents, 'parent_fill_rate': filled / requested if requested else None}
+
+
+def bench_memory(n_orders: int = 100_000, n_symbols: int = 10, seed: int = 0) -> Dict[str, float]:
+    """Traced bytes per resting order for a book that never crosses."""
+    rng = np.random.default_rng(seed)
+    sym = rng.integers(0, n_symbols, n_orders).tolist()
+    side = rng.integers(0, 2, n_orders).tolist()
+    ticks = rng.integers(1, 200, n_orders).tolist()
+    qty = (rng.integers(1, 10, n_orders) * 100).tolist()
+    names = [f"SYM{i:03d}" for i in range(n_symbols)]
+
+    gc.collect()
+    tracemalloc.start()
+    engine = MatchingEngine()
+    for s in range(n_symbols):
+        engine.book(names[s])
+    base, _ = tracemalloc.get_traced_memory()
+    for s, sd, t, q in zip(sym, side, ticks, qty):
+        if sd == 0:
+            engine.submit_limit(names[s], BUY, round(100.0 - t * TICK, 2), q)
+        else:
+            engine.submit_limit(names[s], SELL, round(100.0 + t * TICK, 2), q)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resting = sum(len(b.orders) for b in engine.books.values())
+    return {'resting_orders': resting, 'bytes': used - base,
+            'bytes_per_resting_order': (used - base) / resting if resting else None}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=Path(__file__).resolve().parent, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(n_messages: int = 200_000, n_symbols: int = 10,
+                   mix: Sequence[float] = (0.6, 0.3, 0.1), rate: float = 100_000.0,
+                   seed: int = 0, repeat: int = 3, layers: Sequence[str] = ('engine', 'fills', 'algos'),
+                   n_parents: int = 100, memory_orders: int = 100_000,
+                   write_flow: Optional[Path] = None) -> Dict[str, object]:
+    flow, symbols = generate_flow(n_messages, n_symbols, mix, rate=rate, seed=seed)
+    if write_flow is not None:
+        write_messages(write_flow, flow, symbols)
+    messages = _columns(flow, symbols)
+    counts = np.bincount(flow['type'], minlength=3)
+
+    results: Dict[str, object] = {}
+    for layer in layers:
+        if layer == 'algos':
+            results[layer] = bench_algos_layer(messages, flow, symbols, n_parents=n_parents,
+                                               seed=seed, repeat=repeat)
+        else:
+            results[layer] = bench_book_layer(layer, messages, repeat=repeat)
+
+    return {
+        'config': {'messages': n_messages, 'symbols': n_symbols, 'mix': list(mix), 'rate': rate,
+                   'seed': seed, 'repeat': repeat, 'parent_orders': n_parents,
+                   'flow': {'add': int(counts[ADD]), 'cancel': int(counts[CANCEL]),
+                            'market': int(counts[TRADE])}},
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'platform': platform.platform(), 'git_commit': _git_commit()},
+        'results': results,
+        'memory': bench_memory(memory_orders, n_symbols, seed=seed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the matching engine, fills and execution-algo layers."
+    )
+    parser.add_argument("--messages", type=int, default=200_000, help="Messages in the synthetic flow.")
+    parser.add_argument("--symbols", type=int, default=10, help="Number of symbols.")
+    parser.add_argument(
+        "--mix",
+        default="0.6,0.3,0.1",
+        help="Comma-separated add,cancel,market probabilities.",
+    )
+    parser.add_argument("--rate", type=float, default=100_000.0, help="Poisson arrival rate (msgs/sec).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the order flow.")
+    parser.add_argument("--repeat", type=int, default=3, help="Throughput passes; the best is reported.")
+    parser.add_argument(
+        "--layers",
+        default="engine,fills,algos",
+        help="Comma-separated subset of engine,fills,algos.",
+    )
+    parser.add_argument("--parents", type=int, default=100, help="Parent orders in the algos layer.")
+    parser.add_argument("--memory-orders", type=int, default=100_000,
+                        help="Resting orders used for the memory measurement.")
+    parser.add_argument("--output", type=Path, help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--write-flow", type=Path,
+                        help="Also save the generated flow as a replay.py binary file.")
+    args = parser.parse_args()
+
+    mix = [float(x) for x in args.mix.split(",")]
+    if len(mix) != 3 or min(mix) < 0 or sum(mix) <= 0:
+        parser.error("--mix needs three non-negative probabilities")
+    layers = [x.strip() for x in args.layers.split(",") if x.strip()]
+    unknown = set(layers) - {'engine', 'fills', 'algos'}
+    if unknown:
+        parser.error(f"Unknown layers: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.messages, args.symbols, mix, rate=args.rate, seed=args.seed,
+                             repeat=args.repeat, layers=layers, n_parents=args.parents,
+                             memory_orders=args.memory_orders, write_flow=args.write_flow)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+        print(f"Saved results -> {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
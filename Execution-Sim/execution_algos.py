@@ -0,0 +1,232 @@
+import math
+from dataclasses import dataclass, field
+from heapq import heappush, heappop
+from itertools import count
+from typing import Callable, Dict, List, Optional, Sequence
+
+from matching_engine import MatchingEngine, FillReport, BUY
+
+# ---------------------------------------------------------------------------
+# Slicing schedules (same rounding as simulate_execution.ipynb)
+# ---------------------------------------------------------------------------
+
+def slice_twap(total_qty: int, n: int) -> List[int]:
+    """Split total_qty into n near-equal integer slices; earlier slices take the remainder."""
+    if n <= 0: return []
+    per = total_qty // n; rem = total_qty - per*n
+    return [per + (1 if i < rem else 0) for i in range(n)]
+
+def slice_vwap(total_qty: int, vols: Sequence[float]) -> List[int]:
+    """Split total_qty in proportion to a volume profile, largest-remainder rounding."""
+    if total_qty <= 0 or not vols: return [0]*len(vols)
+    tot = max(1, sum(max(0,v) for v in vols))
+    raw = [total_qty*(max(0,v)/tot) for v in vols]
+    flo = [int(math.floor(x)) for x in raw]
+    rem = total_qty - sum(flo)
+    order = sorted(range(len(vols)), key=lambda i: raw[i]-flo[i], reverse=True)
+    for i in range(rem):
+        flo[order[i % len(vols)]] += 1
+    return flo
+
+def slice_pov(total_qty: int, vols: Sequence[float], participation: float) -> List[int]:
+    """Percentage-of-volume: each slice trades participation * that interval's
+    market volume until total_qty is done. Any remainder is left unfilled."""
+    out = []; left = total_qty
+    for v in vols:
+        q = min(left, int(math.floor(participation*max(0,v))))
+        out.append(q); left -= q
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Event-driven scheduler on a virtual clock
+# ---------------------------------------------------------------------------
+
+class EventScheduler:
+    """
+    Heap of timed callbacks. run() jumps the virtual clock straight to each
+    event, so simulated hours pass as fast as the callbacks execute. Events
+    at the same time fire by priority (lower first), then in the order they
+    were scheduled.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._heap = []
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, at: float, fn: Callable, *args, priority: int = 1):
+        heappush(self._heap, (at, priority, next(self._seq), fn, args))
+
+    def run(self, until: Optional[float] = None) -> int:
+        """Process events up to and including `until`; returns the number processed."""
+        n = 0
+        heap = self._heap
+        while heap and (until is None or heap[0][0] <= until):
+            at, _, _, fn, args = heappop(heap)
+            self.now = at
+            fn(*args)
+            n += 1
+        if until is not None and until > self.now:
+            self.now = until
+        return n
+
+
+# ---------------------------------------------------------------------------
+# Parent orders and the execution simulator
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ParentOrder:
+    """
+    An order to be worked over [start, end] by one of 'TWAP', 'VWAP' or 'POV'.
+
+    VWAP slices by volume_profile; POV trades `participation` of the market
+    volume given in volume_profile for each interval. n_slices defaults to the
+    profile length (or 10 for TWAP without a profile).
+    """
+    symbol: str
+    side: str
+    qty: int
+    start: float
+    end: float
+    algo: str = 'TWAP'
+    n_slices: Optional[int] = None
+    volume_profile: Optional[Sequence[float]] = None
+    participation: float = 0.1
+    order_id: Optional[int] = None
+    arrival_price: Optional[float] = None
+    filled_qty: int = 0
+    notional: float = 0.0
+    children: List[FillReport] = field(default_factory=list)
+
+    def schedule(self) -> List[int]:
+        algo = self.algo.upper()
+        if algo == 'VWAP' and self.volume_profile:
+            return slice_vwap(self.qty, self.volume_profile)
+        if algo == 'POV':
+            if not self.volume_profile:
+                raise ValueError("POV orders need a volume_profile of market volume per interval")
+            return slice_pov(self.qty, self.volume_profile, self.participation)
+        n = self.n_slices or (len(self.volume_profile) if self.volume_profile else 10)
+        return slice_twap(self.qty, n)
+
+    @property
+    def avg_price(self) -> float:
+        return self.notional / self.filled_qty if self.filled_qty else float('nan')
+
+
+class ExecutionSimulator:
+    """
+    Works many parent orders concurrently against a MatchingEngine.
+
+    Each child slice is a scheduler event that sweeps the book at its
+    scheduled time. Other events (book refills, replayed market data) can be
+    put on the same clock with schedule().
+    """
+
+    def __init__(self, engine: MatchingEngine, scheduler: Optional[EventScheduler] = None):
+        self.engine = engine
+        self.clock = scheduler if scheduler is not None else EventScheduler()
+        self.parents: Dict[int, ParentOrder] = {}
+        self._ids = count(1)
+
+    def schedule(self, at: float, fn: Callable, *args, priority: int = 1):
+        self.clock.schedule(at, fn, *args, priority=priority)
+
+    def submit(self, parent: ParentOrder) -> int:
+        """
+        Queue a parent order; its arrival price is the mid when it starts,
+        taken before any event at that time runs, so parents starting
+        together all see the same untouched book.
+        """
+        if parent.order_id is None:
+            parent.order_id = next(self._ids)
+        self.parents[parent.order_id] = parent
+        slices = parent.schedule()
+        n = len(slices)
+        step = (parent.end - parent.start) / n if n else 0.0
+        self.clock.schedule(parent.start, self._arrive, parent, priority=0)
+        for i, q in enumerate(slices):
+            if q > 0:
+                self.clock.schedule(parent.start + i*step, self._child, parent, q)
+        return parent.order_id
+
+    def _arrive(self, parent: ParentOrder):
+        if parent.arrival_price is None:
+            parent.arrival_price = self.engine.book(parent.symbol).mid()
+
+    def _child(self, parent: ParentOrder, qty: int):
+        report = self.engine.sweep(parent.symbol, parent.side, qty)
+        parent.children.append(report)
+        if report.filled_qty:
+            parent.filled_qty += report.filled_qty
+            parent.notional += report.vwap * report.filled_qty
+
+    def run(self, until: Optional[float] = None) -> int:
+        return self.clock.run(until)
+
+    def shortfall_report(self) -> List[Dict[str, float]]:
+        """
+        Implementation shortfall per parent order versus its arrival mid.
+
+        execution_cost is what the filled shares paid over arrival;
+        opportunity_cost marks unfilled shares to the current mid. Both are
+        in dollars, positive meaning worse than arrival.
+        """
+        rows = []
+        for p in self.parents.values():
+            sign = 1.0 if p.side == BUY else -1.0
+            arrival = p.arrival_price
+            final_mid = self.engine.book(p.symbol).mid()
+            unfilled = p.qty - p.filled_qty
+            if arrival is None:
+                exec_cost = opp_cost = float('nan')
+            else:
+                exec_cost = sign*(p.notional - arrival*p.filled_qty)
+                opp_cost = sign*(final_mid - arrival)*unfilled if (unfilled and final_mid is not None) else 0.0
+            total = exec_cost + opp_cost
+            paper = arrival*p.qty if arrival else float('nan')
+            rows.append({
+                'OrderId': p.order_id,
+                'Ticker': p.symbol,
+                'Action': p.side,
+                'Algo': p.algo.upper(),
+                'RequestedQty': p.qty,
+                'ExecutedQty': p.filled_qty,
+                'ArrivalPrice': arrival,
+                'AvgFillPrice': p.avg_price,
+                'ExecutionCost': exec_cost,
+                'OpportunityCost': opp_cost,
+                'ShortfallBps': total/paper*1e4 if paper == paper and paper else float('nan'),
+            })
+        return rows
+
+
+if __name__ == "__main__":
+    from order_book_sim import order_book
+
+    engine = MatchingEngine.from_snapshot(order_book, level_qty=5000)
+    sim = ExecutionSimulator(engine)
+
+    # Refill the touch every minute so the book does not run dry
+    def refill(t):
+        for sym in order_book:
+            engine.submit_limit(sym, 'BUY', order_book[sym]['bid'][0], 2000)
+            engine.submit_limit(sym, 'SELL', order_book[sym]['ask'][0], 2000)
+        if t < 3600:
+            sim.schedule(t + 60, refill, t + 60)
+    sim.schedule(0, refill, 0)
+
+    profile = [3, 2, 1, 1, 1, 2, 3]
+    sim.submit(ParentOrder('AAPL', 'BUY', 9000, 0, 3600, algo='TWAP', n_slices=12))
+    sim.submit(ParentOrder('AAPL', 'BUY', 9000, 0, 3600, algo='VWAP', volume_profile=profile))
+    sim.submit(ParentOrder('MSFT', 'SELL', 5000, 0, 3600, algo='POV', participation=0.1,
+                           volume_profile=[8000]*7))
+    n = sim.run()
+    print(f"Processed {n} events")
+    for row in sim.shortfall_report():
+        print(row)
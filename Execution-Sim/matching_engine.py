@@ -0,0 +1,378 @@
+from collections import deque, namedtuple
+from dataclasses import dataclass, field
+from heapq import heappush, heappop, heapify
+from itertools import count
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BUY = 'BUY'
+SELL = 'SELL'
+
+# One execution between an incoming (taker) order and a resting (maker) order
+Fill = namedtuple('Fill', ['symbol', 'side', 'price', 'qty', 'maker_id', 'taker_id'])
+
+
+@dataclass
+class FillReport:
+    """
+    Result of walking the book with a market order.
+
+    levels holds one (price, qty) entry per price level consumed, best first.
+    slippage_bps is the cost versus the pre-trade mid, positive when the
+    order did worse than mid (bought above it or sold below it).
+    """
+    symbol: str
+    side: str
+    requested_qty: int
+    filled_qty: int
+    vwap: float
+    mid: Optional[float]
+    slippage_bps: float
+    levels: List[Tuple[float, int]] = field(default_factory=list)
+    fills: List[Fill] = field(default_factory=list)
+
+    @property
+    def unfilled_qty(self) -> int:
+        return self.requested_qty - self.filled_qty
+
+    @property
+    def slippage_cost(self) -> float:
+        """Dollar cost versus mid over the filled quantity."""
+        if self.mid is None or self.filled_qty == 0:
+            return float('nan')
+        sign = 1.0 if self.side == BUY else -1.0
+        return sign * (self.vwap - self.mid) * self.filled_qty
+
+
+def _slippage_bps(side: str, vwap, mid):
+    sign = 1.0 if side == BUY else -1.0
+    return sign * (vwap - mid) / mid * 1e4
+
+
+def estimate_fill_costs(prices: Sequence[float], qtys: Sequence[int], sizes: Sequence[float],
+                        side: str, mid: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Cost of many hypothetical market orders against one side of a book
+    snapshot in a single vectorised pass (pre-trade cost curve).
+
+    prices/qtys are the opposite side's levels from best outwards (as given
+    by OrderBook.depth). Each size is filled against the cumulative depth;
+    sizes beyond total depth fill only what is there. Returns arrays
+    filled_qty, vwap, worst_price, levels and slippage_bps (versus mid,
+    NaN without one).
+    """
+    prices = np.asarray(prices, dtype=float)
+    qtys = np.asarray(qtys, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    if len(prices) == 0:
+        nan = np.full(sizes.shape, np.nan)
+        return {'filled_qty': np.zeros(sizes.shape), 'vwap': nan, 'worst_price': nan,
+                'levels': np.zeros(sizes.shape, dtype=int), 'slippage_bps': nan}
+
+    cum_qty = np.cumsum(qtys)
+    cum_notional = np.cumsum(prices * qtys)
+    filled = np.minimum(sizes, cum_qty[-1])
+    # Level in which each order finishes: first level whose cumulative depth covers it
+    k = np.minimum(np.searchsorted(cum_qty, filled, side='left'), len(prices) - 1)
+    qty_before = np.where(k > 0, cum_qty[k - 1], 0.0)
+    notional_before = np.where(k > 0, cum_notional[k - 1], 0.0)
+    notional = notional_before + (filled - qty_before) * prices[k]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(filled > 0, notional / filled, np.nan)
+    slippage = _slippage_bps(side, vwap, mid) if mid is not None else np.full(sizes.shape, np.nan)
+    return {
+        'filled_qty': filled,
+        'vwap': vwap,
+        'worst_price': np.where(filled > 0, prices[k], np.nan),
+        'levels': np.where(filled > 0, k + 1, 0),
+        'slippage_bps': slippage,
+    }
+
+
+class Order:
+    __slots__ = ('id', 'side', 'price', 'qty')
+
+    def __init__(self, order_id, side: str, price: float, qty: int):
+        self.id = order_id
+        self.side = side
+        self.price = price
+        self.qty = qty
+
+
+class PriceLevel:
+    """FIFO queue of resting orders at one price. Cancelled orders are left in
+    the queue with qty 0 and skipped when the level is matched."""
+    __slots__ = ('price', 'orders', 'qty', 'count')
+
+    def __init__(self, price: float):
+        self.price = price
+        self.orders = deque()
+        self.qty = 0
+        self.count = 0
+
+    def compact(self):
+        self.orders = deque(o for o in self.orders if o.qty > 0)
+
+
+class _Side:
+    """
+    One side of the book: dict of price -> PriceLevel plus a heap of prices.
+
+    Heap keys are negated for bids so heap[0] is always the best price.
+    Levels are deleted from the dict when they empty and their heap entries
+    are discarded lazily when they reach the top, so best() is amortised O(1)
+    and adding a new level is O(log n).
+    """
+    __slots__ = ('sign', 'levels', 'heap')
+
+    def __init__(self, is_bid: bool):
+        self.sign = -1.0 if is_bid else 1.0
+        self.levels: Dict[float, PriceLevel] = {}
+        self.heap: List[float] = []
+
+    def best(self) -> Optional[PriceLevel]:
+        heap, levels = self.heap, self.levels
+        while heap:
+            level = levels.get(heap[0] * self.sign)
+            if level is not None:
+                return level
+            heappop(heap)
+        return None
+
+    def level_for(self, price: float) -> PriceLevel:
+        level = self.levels.get(price)
+        if level is None:
+            level = self.levels[price] = PriceLevel(price)
+            heappush(self.heap, price * self.sign)
+            if len(self.heap) > 2 * len(self.levels) + 64:
+                # Too many stale entries from churned levels; rebuild
+                self.heap = [p * self.sign for p in self.levels]
+                heapify(self.heap)
+        return level
+
+    def remove(self, level: PriceLevel):
+        del self.levels[level.price]
+
+    def depth(self, n_levels: Optional[int] = None) -> List[Tuple[float, int]]:
+        prices = sorted(self.levels, key=lambda p: p * self.sign)
+        if n_levels is not None:
+            prices = prices[:n_levels]
+        return [(p, self.levels[p].qty) for p in prices]
+
+
+class OrderBook:
+    """
+    Price-time priority limit order book for a single symbol.
+
+    - add_limit: O(1) at an existing price level, O(log n) for a new level
+    - cancel: O(1) via the order-id map
+    - best_bid / best_ask: amortised O(1)
+    """
+
+    def __init__(self, symbol: str, id_source=None, on_fill: Optional[Callable[[Fill], None]] = None):
+        self.symbol = symbol
+        self.bids = _Side(is_bid=True)
+        self.asks = _Side(is_bid=False)
+        self.orders: Dict[object, Order] = {}
+        self._ids = id_source if id_source is not None else count(1)
+        self.on_fill = on_fill
+
+    def __repr__(self):
+        return f"<OrderBook {self.symbol} | Bid: {self.best_bid()} | Ask: {self.best_ask()} | Orders: {len(self.orders)}>"
+
+    def best_bid(self) -> Optional[float]:
+        level = self.bids.best()
+        return level.price if level is not None else None
+
+    def best_ask(self) -> Optional[float]:
+        level = self.asks.best()
+        return level.price if level is not None else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2.0
+
+    def depth(self, side: str, n_levels: Optional[int] = None) -> List[Tuple[float, int]]:
+        """[(price, total qty)] from the best price outwards; side is 'bid' or 'ask'."""
+        return (self.bids if side == 'bid' else self.asks).depth(n_levels)
+
+    def _match(self, side: str, qty: int, limit: Optional[float], taker_id) -> Tuple[List[Fill], int]:
+        """Consume resting liquidity on the opposite side in price-time order."""
+        book = self.asks if side == BUY else self.bids
+        fills = []
+        orders = self.orders
+        while qty > 0:
+            level = book.best()
+            if level is None:
+                break
+            if limit is not None and (level.price > limit if side == BUY else level.price < limit):
+                break
+            queue = level.orders
+            while qty > 0 and queue:
+                maker = queue[0]
+                if maker.qty == 0:  # cancelled
+                    queue.popleft()
+                    continue
+                traded = maker.qty if maker.qty < qty else qty
+                maker.qty -= traded
+                level.qty -= traded
+                qty -= traded
+                fill = Fill(self.symbol, side, level.price, traded, maker.id, taker_id)
+                fills.append(fill)
+                if self.on_fill is not None:
+                    self.on_fill(fill)
+                if maker.qty == 0:
+                    queue.popleft()
+                    level.count -= 1
+                    del orders[maker.id]
+            if level.count == 0:
+                book.remove(level)
+        return fills, qty
+
+    def add_limit(self, side: str, price: float, qty: int, order_id=None) -> Tuple[object, List[Fill]]:
+        """
+        Submit a limit order. Any marketable quantity trades immediately; the
+        rest rests in the book. Returns (order_id, fills). A caller-supplied
+        order_id must not belong to an order still resting in the book;
+        generated ids skip any that do.
+        """
+        if order_id is None:
+            order_id = _unused_id(self._ids, self.orders)
+        elif order_id in self.orders:
+            raise ValueError(f"Order id {order_id!r} is already resting in the {self.symbol} book")
+        fills, remaining = self._match(side, qty, price, order_id)
+        if remaining > 0:
+            order = Order(order_id, side, price, remaining)
+            level = (self.bids if side == BUY else self.asks).level_for(price)
+            level.orders.append(order)
+            level.qty += remaining
+            level.count += 1
+            self.orders[order_id] = order
+        return order_id, fills
+
+    def add_market(self, side: str, qty: int, order_id=None) -> Tuple[List[Fill], int]:
+        """Submit a market order. Returns (fills, unfilled qty); nothing rests."""
+        if order_id is None:
+            order_id = next(self._ids)
+        return self._match(side, qty, None, order_id)
+
+    def sweep(self, side: str, qty: int, order_id=None) -> FillReport:
+        """
+        Market order that walks the book level by level, depleting it, and
+        reports per-level partial fills, VWAP and slippage versus the
+        pre-trade mid.
+        """
+        mid = self.mid()
+        fills, unfilled = self.add_market(side, qty, order_id)
+        levels: List[Tuple[float, int]] = []
+        notional = 0.0
+        for f in fills:
+            if levels and levels[-1][0] == f.price:
+                levels[-1] = (f.price, levels[-1][1] + f.qty)
+            else:
+                levels.append((f.price, f.qty))
+            notional += f.price * f.qty
+        filled = qty - unfilled
+        vwap = notional / filled if filled else float('nan')
+        slippage = _slippage_bps(side, vwap, mid) if mid is not None and filled else float('nan')
+        return FillReport(self.symbol, side, qty, filled, vwap, mid, slippage, levels, fills)
+
+    def cost_curve(self, side: str, sizes: Sequence[float]) -> Dict[str, np.ndarray]:
+        """estimate_fill_costs for market orders of the given sizes against the current book, without trading."""
+        depth = self.depth('ask' if side == BUY else 'bid')
+        prices = [p for p, _ in depth]
+        qtys = [q for _, q in depth]
+        return estimate_fill_costs(prices, qtys, sizes, side, self.mid())
+
+    def cancel(self, order_id) -> bool:
+        """Cancel a resting order. Returns False if it is unknown or already filled."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        book = self.bids if order.side == BUY else self.asks
+        level = book.levels[order.price]
+        level.qty -= order.qty
+        level.count -= 1
+        order.qty = 0
+        if level.count == 0:
+            book.remove(level)
+        elif len(level.orders) > 2 * level.count + 16:
+            level.compact()
+        return True
+
+
+def _unused_id(ids, live) -> int:
+    """Next id from `ids` that is not a key of `live`."""
+    order_id = next(ids)
+    while order_id in live:
+        order_id = next(ids)
+    return order_id
+
+
+class MatchingEngine:
+    """Multi-symbol front end: routes orders to per-symbol books and keeps a
+    global order-id -> book map so cancels need only the id."""
+
+    def __init__(self, on_fill: Optional[Callable[[Fill], None]] = None):
+        self.books: Dict[str, OrderBook] = {}
+        self._ids = count(1)
+        self._owner: Dict[object, OrderBook] = {}
+        self.on_fill = on_fill
+
+    def book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol, id_source=self._ids, on_fill=self.on_fill)
+        return book
+
+    def submit_limit(self, symbol: str, side: str, price: float, qty: int, order_id=None):
+        if order_id is None:
+            # Explicit ids share the number space, so skip any still resting in any book
+            order_id = _unused_id(self._ids, self._owner)
+        elif order_id in self._owner:
+            raise ValueError(f"Order id {order_id!r} is already resting in the {self._owner[order_id].symbol} book")
+        book = self.book(symbol)
+        order_id, fills = book.add_limit(side, price, qty, order_id)
+        if order_id in book.orders:
+            self._owner[order_id] = book
+        self._forget_filled(fills)
+        return order_id, fills
+
+    def submit_market(self, symbol: str, side: str, qty: int, order_id=None):
+        fills, unfilled = self.book(symbol).add_market(side, qty, order_id)
+        self._forget_filled(fills)
+        return fills, unfilled
+
+    def sweep(self, symbol: str, side: str, qty: int, order_id=None) -> FillReport:
+        report = self.book(symbol).sweep(side, qty, order_id)
+        self._forget_filled(report.fills)
+        return report
+
+    def cancel(self, order_id) -> bool:
+        book = self._owner.pop(order_id, None)
+        return book.cancel(order_id) if book is not None else False
+
+    def _forget_filled(self, fills: List[Fill]):
+        owner = self._owner
+        for f in fills:
+            book = owner.get(f.maker_id)
+            if book is not None and f.maker_id not in book.orders:
+                del owner[f.maker_id]
+
+    @classmethod
+    def from_snapshot(cls, order_book: Dict[str, Dict[str, List[float]]], level_qty: int = 1000,
+                      on_fill: Optional[Callable[[Fill], None]] = None) -> 'MatchingEngine':
+        """
+        Seed an engine from the simulator's {'AAPL': {'bid': [...], 'ask': [...]}}
+        format, resting level_qty shares at every listed price.
+        """
+        engine = cls(on_fill=on_fill)
+        for symbol, levels in order_book.items():
+            for price in levels.get('bid', []):
+                engine.submit_limit(symbol, BUY, price, level_qty)
+            for price in levels.get('ask', []):
+                engine.submit_limit(symbol, SELL, price, level_qty)
+        return engine
@@ -1,52 +1,80 @@
-import json
 import time
 from pathlib import Path
 
+from matching_engine import MatchingEngine, BUY, SELL
+from trade_log import TradeLogWriter
+
 # Simple dummy order book (given in spec)
 order_book = {
     'AAPL': {'bid': [174.9, 174.8, 174.7], 'ask': [175.1, 175.2, 175.3]},
     'MSFT': {'bid': [318.1, 318.0, 317.9], 'ask': [318.3, 318.4, 318.5]},
 }
 
+# Shares resting at each price of the dummy book when it seeds the engine
+DEFAULT_LEVEL_QTY = 1000
+
 executed_trades = []
 
+# Where _record sends fills: None keeps them in executed_trades, otherwise any
+# object with append(dict), e.g. a TradeLogWriter for long sessions
+trade_sink = None
+
+def set_trade_sink(sink):
+    global trade_sink
+    trade_sink = sink
+
+# The dict above is only the seed; the live book is held by the matching engine
+engine = MatchingEngine.from_snapshot(order_book, level_qty=DEFAULT_LEVEL_QTY)
+
 def best_bid(symbol):
-    return max(order_book[symbol]['bid'])
+    return engine.book(symbol).best_bid()
 
 def best_ask(symbol):
-    return min(order_book[symbol]['ask'])
+    return engine.book(symbol).best_ask()
+
+def _record(report):
+    """
+    Append one trade entry per price level the order consumed. arrival_price
+    is the mid before the order traded, which cost_models.fit_impact needs
+    (binary trade logs keep only the symbol/side/qty/price/ts columns).
+    """
+    ts = time.time()
+    sink = trade_sink if trade_sink is not None else executed_trades
+    for price, qty in report.levels:
+        sink.append({
+            'symbol': report.symbol,
+            'side': report.side,
+            'qty': qty,
+            'price': price,
+            'ts': ts,
+            'arrival_price': report.mid,
+        })
+    return report
 
 def market_buy(symbol, qty):
-    px = best_ask(symbol)
-    executed_trades.append({
-        'symbol': symbol,
-        'side': 'BUY',
-        'qty': qty,
-        'price': px,
-        'ts': time.time(),
-    })
+    """Walk the ask side for qty shares; returns a FillReport (VWAP, slippage vs mid, per-level fills)."""
+    return _record(engine.sweep(symbol, BUY, qty))
 
 def market_sell(symbol, qty):
-    px = best_bid(symbol)
-    executed_trades.append({
-        'symbol': symbol,
-        'side': 'SELL',
-        'qty': qty,
-        'price': px,
-        'ts': time.time(),
-    })
+    """Walk the bid side for qty shares; returns a FillReport."""
+    return _record(engine.sweep(symbol, SELL, qty))
 
-if __name__ == "__main__":
-    # Run a tiny demo
-    market_buy('AAPL', 100)
-    market_sell('MSFT', 50)
+def cost_curve(symbol, side, sizes):
+    """Pre-trade VWAP/slippage estimates for many order sizes against the current book."""
+    return engine.book(symbol).cost_curve(side, sizes)
 
+if __name__ == "__main__":
     # Always write relative to THIS file's folder
     base = Path(__file__).resolve().parent
-    out = base / "outputs" / "executed_trades.json"
-    out.parent.mkdir(parents=True, exist_ok=True)
-    with open(out, "w") as f:
-        json.dump(executed_trades, f, indent=2)
+    out = base / "outputs" / "executed_trades.jsonl"
+
+    # Fills are streamed to disk in batches instead of held until the end
+    with TradeLogWriter(out, append=False) as log:
+        set_trade_sink(log)
+        # Run a tiny demo
+        market_buy('AAPL', 100)
+        market_sell('MSFT', 50)
+    set_trade_sink(None)
 
-    print(f"Wrote {len(executed_trades)} trades")
-    print(f"Saved trades -> {out}")
\ No newline at end of file
+    print(f"Wrote {log.rows_written} trades")
+    print(f"Saved trades -> {out}")
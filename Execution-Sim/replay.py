@@ -0,0 +1,212 @@
+import csv
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from matching_engine import MatchingEngine, BUY, SELL
+
+# ---------------------------------------------------------------------------
+# File format
+#
+#   header   16 bytes  magic b'LOBR', version u2, n_symbols u2, reserved u8
+#   symbols  n_symbols x 16 bytes, ASCII, NUL padded
+#   records  fixed 32-byte little-endian rows (MESSAGE_DTYPE), sorted by ts
+# ---------------------------------------------------------------------------
+
+MAGIC = b'LOBR'
+VERSION = 1
+SYMBOL_WIDTH = 16
+
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('n_symbols', '<u2'), ('reserved', '<u8')])
+
+MESSAGE_DTYPE = np.dtype([
+    ('ts', '<i8'),        # nanoseconds
+    ('order_id', '<u8'),
+    ('price', '<f8'),
+    ('qty', '<u4'),
+    ('symbol', '<u2'),    # index into the file's symbol table
+    ('type', 'u1'),       # ADD / CANCEL / TRADE
+    ('side', 'u1'),       # 0 = BUY, 1 = SELL
+])
+
+ADD, CANCEL, TRADE = 0, 1, 2
+TYPE_CODES = {'ADD': ADD, 'CANCEL': CANCEL, 'TRADE': TRADE}
+SIDE_CODES = {BUY: 0, SELL: 1}
+SIDES = (BUY, SELL)
+
+Event = namedtuple('Event', ['ts', 'symbol', 'type', 'side', 'price', 'qty', 'order_id', 'result'])
+
+
+def write_messages(path: Union[str, Path], messages: np.ndarray, symbols: Sequence[str]):
+    """Write a MESSAGE_DTYPE array (sorted by ts here if needed) and its symbol table."""
+    if len(symbols) > np.iinfo(np.uint16).max:
+        raise ValueError("Too many symbols for one replay file")
+    messages = np.asarray(messages, dtype=MESSAGE_DTYPE)
+    if len(messages) > 1 and np.any(np.diff(messages['ts']) < 0):
+        messages = messages[np.argsort(messages['ts'], kind='stable')]
+    header = np.array([(MAGIC, VERSION, len(symbols), 0)], dtype=HEADER_DTYPE)
+    table = np.array([s.encode('ascii') for s in symbols], dtype=f'S{SYMBOL_WIDTH}')
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(table.tobytes())
+        f.write(messages.tobytes())
+
+
+def open_messages(path: Union[str, Path]) -> Tuple[List[str], np.ndarray]:
+    """Memory-map a replay file. Returns (symbols, records); no data is read until accessed."""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path} is not a replay file")
+    if header['version'][0] != VERSION:
+        raise ValueError(f"Unsupported replay file version {header['version'][0]}")
+    n_symbols = int(header['n_symbols'][0])
+    table = np.fromfile(path, dtype=f'S{SYMBOL_WIDTH}', count=n_symbols, offset=HEADER_DTYPE.itemsize)
+    symbols = [s.decode('ascii') for s in table]
+    offset = HEADER_DTYPE.itemsize + n_symbols * SYMBOL_WIDTH
+    if Path(path).stat().st_size == offset:
+        return symbols, np.empty(0, dtype=MESSAGE_DTYPE)
+    return symbols, np.memmap(path, dtype=MESSAGE_DTYPE, mode='r', offset=offset)
+
+
+def csv_to_binary(csv_path: Union[str, Path], out_path: Union[str, Path]) -> int:
+    """
+    Convert a CSV message log to the binary replay format.
+
+    Columns: ts (integer nanoseconds or an ISO timestamp), symbol, type
+    (ADD/CANCEL/TRADE), side (BUY/SELL), price, qty, order_id. CANCEL rows
+    only need ts, symbol, type and order_id. Returns the number of records.
+    """
+    symbols: Dict[str, int] = {}
+    ts, oid, price, qty, sym, typ, side = [], [], [], [], [], [], []
+    with open(csv_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            t = row['ts'].strip()
+            ts.append(int(t) if t.lstrip('-').isdigit() else int(np.datetime64(t, 'ns').astype(np.int64)))
+            s = row['symbol'].strip().upper()
+            sym.append(symbols.setdefault(s, len(symbols)))
+            typ.append(TYPE_CODES[row['type'].strip().upper()])
+            side.append(SIDE_CODES.get((row.get('side') or BUY).strip().upper(), 0))
+            price.append(float(row.get('price') or 0.0))
+            qty.append(int(float(row.get('qty') or 0)))
+            oid.append(int(row.get('order_id') or 0))
+
+    messages = np.empty(len(ts), dtype=MESSAGE_DTYPE)
+    messages['ts'] = ts
+    messages['order_id'] = oid
+    messages['price'] = price
+    messages['qty'] = qty
+    messages['symbol'] = sym
+    messages['type'] = typ
+    messages['side'] = side
+    write_messages(out_path, messages, list(symbols))
+    return len(messages)
+
+
+class Replayer:
+    """
+    Replays one or more binary message files into a MatchingEngine in
+    timestamp order across all files and symbols.
+
+    Records are decoded a chunk at a time with vectorised column reads, so
+    the per-message cost is the engine call. Hooks are called after each
+    message as hook(event, replayer) and can submit their own orders to
+    self.engine; building the Event tuple is skipped when there are no hooks.
+
+    Order ids from the files live in their own namespace: they are entered
+    into the engine as ('replay', file_index, order_id), so they can never
+    collide with the ids the engine hands out to hook orders, nor with each
+    other when several files (e.g. one per venue) reuse the same ids. Fills'
+    maker_id carries the tagged id; Event.order_id is the id as written in
+    the file.
+    """
+
+    def __init__(self, paths: Union[str, Path, Iterable[Union[str, Path]]],
+                 engine: Optional[MatchingEngine] = None, chunk_size: int = 65536):
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.engine = engine if engine is not None else MatchingEngine()
+        self.chunk_size = chunk_size
+        self.hooks: List[Callable[[Event, 'Replayer'], None]] = []
+        self.now = None
+        self.processed = 0
+
+        # One global symbol table; each file's codes are remapped into it
+        self.symbols: List[str] = []
+        index: Dict[str, int] = {}
+        self._files = []
+        for p in paths:
+            names, records = open_messages(p)
+            remap = np.array([index.setdefault(n, len(index)) for n in names] or [0], dtype=np.int64)
+            self._files.append((records, remap))
+        self.symbols = list(index)
+        self._stream = self._messages()
+
+    def add_hook(self, hook: Callable[[Event, 'Replayer'], None]):
+        self.hooks.append(hook)
+
+    def __len__(self):
+        return sum(len(r) for r, _ in self._files)
+
+    def _chunks(self):
+        """Yield column lists (ts, symbol, type, side, price, qty, order_id, file index) in global ts order."""
+        cols = ('ts', 'symbol', 'type', 'side', 'price', 'qty', 'order_id')
+        if len(self._files) == 1:
+            records, remap = self._files[0]
+            for start in range(0, len(records), self.chunk_size):
+                chunk = np.asarray(records[start:start + self.chunk_size])
+                out = {c: chunk[c] for c in cols}
+                out['symbol'] = remap[out['symbol']]
+                yield [out[c].tolist() for c in cols] + [[0] * len(chunk)]
+            return
+
+        # Several files: a stable argsort over all timestamps gives the merge order
+        ts = np.concatenate([np.asarray(r['ts']) for r, _ in self._files])
+        file_id = np.concatenate([np.full(len(r), i, dtype=np.int32) for i, (r, _) in enumerate(self._files)])
+        row = np.concatenate([np.arange(len(r)) for r, _ in self._files])
+        order = np.argsort(ts, kind='stable')
+        for start in range(0, len(order), self.chunk_size):
+            sel = order[start:start + self.chunk_size]
+            fid, rows = file_id[sel], row[sel]
+            chunk = np.empty(len(sel), dtype=MESSAGE_DTYPE)
+            symbol = np.empty(len(sel), dtype=np.int64)
+            for i, (records, remap) in enumerate(self._files):
+                mask = fid == i
+                if mask.any():
+                    part = records[rows[mask]]
+                    chunk[mask] = part
+                    symbol[mask] = remap[part['symbol']]
+            out = {c: chunk[c] for c in cols}
+            out['symbol'] = symbol
+            yield [out[c].tolist() for c in cols] + [fid.tolist()]
+
+    def _messages(self):
+        for columns in self._chunks():
+            yield from zip(*columns)
+
+    def run(self, max_events: Optional[int] = None) -> int:
+        """
+        Replay messages (all remaining, or at most max_events) and return the
+        number processed. Calling run() again continues where it stopped.
+        """
+        engine, names, hooks = self.engine, self.symbols, self.hooks
+        submit_limit, submit_market, cancel = engine.submit_limit, engine.submit_market, engine.cancel
+        n = 0
+        for ts, sym, typ, side, px, qty, oid, fid in self._stream:
+            if typ == ADD:
+                _, result = submit_limit(names[sym], SIDES[side], px, qty, ('replay', fid, oid))
+            elif typ == CANCEL:
+                result = cancel(('replay', fid, oid))
+            else:
+                result, _ = submit_market(names[sym], SIDES[side], qty)
+            n += 1
+            if hooks:
+                self.now = ts
+                event = Event(ts, names[sym], typ, SIDES[side], px, qty, oid, result)
+                for hook in hooks:
+                    hook(event, self)
+            if max_events is not None and n >= max_events:
+                break
+        self.processed += n
+        return n
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The simulator modules are scripts in Execution-Sim/, imported by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
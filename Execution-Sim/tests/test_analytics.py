@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from analytics import SubmittedPriceStats, batch_stats, stats_from_order_book
+from replay import ADD, CANCEL, MESSAGE_DTYPE, TRADE, Replayer, write_messages
+
+
+def test_submitted_price_stats_count_adds_only(tmp_path):
+    rows = [
+        (1, ADD, 100.0, 10, 1, 1),
+        (2, ADD, 102.0, 10, 2, 1),
+        (3, CANCEL, 100.0, 0, 1, 1),   # cancels may carry the order's price
+        (4, TRADE, 101.0, 5, 0, 0),    # a market buy against order 2
+        (5, ADD, 104.0, 10, 3, 1),
+    ]
+    messages = np.zeros(len(rows), dtype=MESSAGE_DTYPE)
+    for i, (ts, typ, price, qty, order_id, side) in enumerate(rows):
+        messages[i] = (ts, order_id, price, qty, 0, typ, side)
+    path = tmp_path / 'feed.bin'
+    write_messages(path, messages, ['TEST'])
+
+    stats = SubmittedPriceStats()
+    replayer = Replayer(path)
+    replayer.add_hook(stats)
+    replayer.run()
+    summary = stats.stats()['TEST']
+    assert summary['count'] == 3
+    assert summary['mean'] == pytest.approx(102.0)
+
+
+def _book(seed):
+    rng = np.random.default_rng(seed)
+    return {f'S{i}': {'bid': list(100 + rng.normal(0, 5, rng.integers(0, 40))),
+                      'ask': list(100.1 + rng.normal(0, 5, rng.integers(0, 40)))}
+            for i in range(20)}
+
+
+@pytest.mark.parametrize('side', [None, 'bid', 'ask'])
+@pytest.mark.parametrize('sample', [False, True])
+def test_batch_stats_match_scalar_stats(side, sample):
+    for seed in range(5):
+        book = _book(seed)
+        scalar = stats_from_order_book(book, side=side, sample=sample)
+        batch = batch_stats(book, side=side, sample=sample)
+        assert list(batch) == list(scalar)
+        for sym, expected in scalar.items():
+            got = batch[sym]
+            assert got['count'] == expected['count']
+            for key in ('mean', 'median', 'variance', 'stdev'):
+                assert got[key] == pytest.approx(expected[key], rel=1e-12, nan_ok=True)
@@ -0,0 +1,33 @@
+from execution_algos import EventScheduler, ExecutionSimulator, ParentOrder
+from matching_engine import BUY, SELL, MatchingEngine
+
+
+def _engine():
+    engine = MatchingEngine()
+    engine.submit_limit('TEST', BUY, 99.0, 1000)
+    engine.submit_limit('TEST', SELL, 101.0, 100)
+    engine.submit_limit('TEST', SELL, 102.0, 1000)
+    return engine
+
+
+def test_parents_starting_together_share_the_arrival_mid():
+    sim = ExecutionSimulator(_engine())
+    first = ParentOrder('TEST', BUY, 200, 0, 10, n_slices=2)
+    second = ParentOrder('TEST', BUY, 200, 0, 10, n_slices=2)
+    sim.submit(first)
+    sim.submit(second)
+    sim.run()
+    assert first.arrival_price == second.arrival_price == 100.0
+    report = {row['OrderId']: row for row in sim.shortfall_report()}
+    assert report[second.order_id]['ArrivalPrice'] == 100.0
+
+
+def test_scheduler_orders_by_time_then_priority_then_insertion():
+    clock = EventScheduler()
+    seen = []
+    clock.schedule(1, seen.append, 'b')
+    clock.schedule(1, seen.append, 'a', priority=0)
+    clock.schedule(0, seen.append, 'first')
+    clock.schedule(1, seen.append, 'c')
+    assert clock.run() == 4
+    assert seen == ['first', 'a', 'b', 'c']
@@ -0,0 +1,48 @@
+import pytest
+
+from matching_engine import BUY, SELL, MatchingEngine, OrderBook
+
+
+def test_duplicate_live_order_id_is_rejected():
+    book = OrderBook('TEST')
+    book.add_limit(BUY, 99.0, 10, order_id=7)
+    with pytest.raises(ValueError):
+        book.add_limit(BUY, 98.0, 5, order_id=7)
+    # The original order is untouched and still cancellable
+    assert book.orders[7].price == 99.0
+    assert book.cancel(7)
+    assert book.best_bid() is None
+
+
+def test_order_id_can_be_reused_once_filled():
+    book = OrderBook('TEST')
+    book.add_limit(SELL, 101.0, 5, order_id=1)
+    book.add_market(BUY, 5)
+    order_id, fills = book.add_limit(SELL, 102.0, 5, order_id=1)
+    assert order_id == 1 and not fills
+    assert book.orders[1].price == 102.0
+
+
+def test_engine_rejects_duplicate_id_across_symbols():
+    engine = MatchingEngine()
+    engine.submit_limit('AAA', BUY, 10.0, 100, order_id='x')
+    with pytest.raises(ValueError):
+        engine.submit_limit('BBB', BUY, 20.0, 100, order_id='x')
+    assert engine.cancel('x')
+    assert engine.book('AAA').best_bid() is None
+
+
+def test_auto_id_skips_explicit_live_id():
+    book = OrderBook('TEST')
+    book.add_limit(BUY, 99.0, 10, order_id=1)
+    order_id, _ = book.add_limit(BUY, 98.0, 5)
+    assert order_id == 2
+    assert book.cancel(1) and book.cancel(2)
+    assert book.best_bid() is None
+
+    engine = MatchingEngine()
+    engine.submit_limit('AAA', BUY, 10.0, 100, order_id=1)
+    order_id, _ = engine.submit_limit('BBB', BUY, 20.0, 100)
+    assert order_id == 2
+    assert engine.cancel(1) and engine.cancel(2)
+    assert engine.book('AAA').best_bid() is None and engine.book('BBB').best_bid() is None
@@ -0,0 +1,50 @@
+import numpy as np
+
+from matching_engine import BUY
+from replay import ADD, CANCEL, MESSAGE_DTYPE, Replayer, write_messages
+
+
+def _messages(rows):
+    messages = np.zeros(len(rows), dtype=MESSAGE_DTYPE)
+    for i, (ts, typ, price, qty, order_id) in enumerate(rows):
+        messages[i] = (ts, order_id, price, qty, 0, typ, 0)
+    return messages
+
+
+def test_replayed_ids_do_not_collide_with_hook_orders(tmp_path):
+    path = tmp_path / 'feed.bin'
+    write_messages(path, _messages([
+        (1, ADD, 100.0, 10, 1),
+        (2, ADD, 99.0, 10, 2),
+        (3, CANCEL, 0.0, 0, 1),
+        (4, CANCEL, 0.0, 0, 2),
+    ]), ['TEST'])
+    replayer = Replayer(path)
+    hook_orders = []
+
+    def hook(event, rp):
+        # The engine's own ids start at 1, the same numbers the file uses
+        if event.ts == 1:
+            hook_orders.append(rp.engine.submit_limit('TEST', BUY, 95.0, 5)[0])
+
+    replayer.add_hook(hook)
+    assert replayer.run() == 4
+    book = replayer.engine.book('TEST')
+    assert hook_orders == [1]
+    # Both replayed orders were cancelled; the strategy's order still rests
+    assert list(book.orders) == [1]
+    assert book.best_bid() == 95.0
+    assert replayer.engine.cancel(1)
+
+
+def test_files_with_overlapping_ids_replay_together(tmp_path):
+    # Two venues' feeds, both numbering their orders from 1
+    first, second = tmp_path / 'venue_a.bin', tmp_path / 'venue_b.bin'
+    write_messages(first, _messages([(1, ADD, 100.0, 10, 1), (3, CANCEL, 0.0, 0, 1)]), ['TEST'])
+    write_messages(second, _messages([(2, ADD, 99.0, 10, 1), (4, ADD, 98.0, 10, 2)]), ['TEST'])
+    replayer = Replayer([first, second], chunk_size=2)
+    assert replayer.run() == 4
+    book = replayer.engine.book('TEST')
+    # Venue A's order 1 was cancelled; venue B's orders 1 and 2 still rest
+    assert sorted(book.orders) == [('replay', 1, 1), ('replay', 1, 2)]
+    assert book.best_bid() == 99.0
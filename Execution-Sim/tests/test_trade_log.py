@@ -0,0 +1,26 @@
+import time
+
+from trade_log import TradeLogWriter, read_trades
+
+
+def _trade(i):
+    return {'symbol': 'TEST', 'side': 'BUY' if i % 2 else 'SELL', 'qty': i, 'price': 100.0 + i, 'ts': float(i)}
+
+
+def test_flush_writes_immediately(tmp_path):
+    path = tmp_path / 'trades.jsonl'
+    with TradeLogWriter(path, flush_rows=1000, flush_interval=5.0) as log:
+        for i in range(3):
+            log.append(_trade(i))
+        start = time.monotonic()
+        log.flush()
+        assert time.monotonic() - start < 1.0
+        assert [t['qty'] for t in read_trades(path)] == [0, 1, 2]
+
+
+def test_binary_round_trip(tmp_path):
+    path = tmp_path / 'trades.bin'
+    with TradeLogWriter(path, flush_rows=2) as log:
+        for i in range(5):
+            log.append(_trade(i))
+    assert list(read_trades(path)) == [_trade(i) for i in range(5)]
@@ -0,0 +1,197 @@
+import atexit
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Formats
+#
+#   jsonl   one executed_trades-style dict per line
+#   binary  8-byte header (magic b'TLOG', version u2, reserved u2) followed
+#           by fixed 40-byte TRADE_DTYPE rows
+# ---------------------------------------------------------------------------
+
+MAGIC = b'TLOG'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('reserved', '<u2')])
+
+TRADE_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('price', '<f8'),
+    ('qty', '<i8'),
+    ('symbol', 'S15'),
+    ('side', 'S1'),       # b'B' / b'S'
+])
+
+FIELDS = ('symbol', 'side', 'qty', 'price', 'ts')
+_SIDE_CODE = {'BUY': b'B', 'SELL': b'S'}
+_SIDE_NAME = {b'B': 'BUY', b'S': 'SELL'}
+
+
+def _infer_format(path: Path, fmt: Optional[str]) -> str:
+    if fmt is not None:
+        if fmt not in ('jsonl', 'binary'):
+            raise ValueError(f"Unknown trade log format {fmt!r}")
+        return fmt
+    return 'binary' if path.suffix in ('.bin', '.tlog') else 'jsonl'
+
+
+class TradeLogWriter:
+    """
+    Append-only trade log with a background writer thread.
+
+    append() only puts the record on an in-memory buffer; the writer thread
+    flushes it to disk when flush_rows records are waiting or every
+    flush_interval seconds, whichever comes first. If the writer falls
+    behind, append() blocks once max_pending records are buffered, so memory
+    stays bounded however long the session runs. close() (also registered
+    with atexit) flushes whatever is left.
+    """
+
+    def __init__(self, path: Union[str, Path], fmt: Optional[str] = None,
+                 flush_rows: int = 1000, flush_interval: float = 1.0,
+                 max_pending: Optional[int] = None, append: bool = True):
+        self.path = Path(path)
+        self.fmt = _infer_format(self.path, fmt)
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or 10 * self.flush_rows
+        self.rows_written = 0
+        self.error: Optional[BaseException] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        exists = append and self.path.exists() and self.path.stat().st_size > 0
+        self._file = open(self.path, 'ab' if append else 'wb')
+        if self.fmt == 'binary' and not exists:
+            self._file.write(np.array([(MAGIC, VERSION, 0)], dtype=HEADER_DTYPE).tobytes())
+
+        self._buffer: List[Dict] = []
+        self._flush_to = 0          # rows a flush() caller is waiting to see written
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='trade-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        """Records accepted so far (written or still buffered)."""
+        with self._cond:
+            return self.rows_written + len(self._buffer)
+
+    def append(self, record: Dict):
+        """Queue one trade dict with keys symbol, side, qty, price, ts."""
+        with self._cond:
+            if self._closed:
+                raise ValueError("Trade log is closed")
+            while len(self._buffer) >= self.max_pending and self.error is None:
+                self._cond.notify_all()
+                self._cond.wait()
+            if self.error is not None:
+                raise RuntimeError("Trade log writer failed") from self.error
+            self._buffer.append(record)
+            if len(self._buffer) >= self.flush_rows:
+                self._cond.notify_all()
+
+    def flush(self):
+        """Block until everything appended so far is on disk."""
+        with self._cond:
+            target = self.rows_written + len(self._buffer)
+            self._flush_to = max(self._flush_to, target)
+            self._cond.notify_all()
+            while self.rows_written < target and self.error is None and self._thread.is_alive():
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+        atexit.unregister(self.close)
+        if self.error is not None:
+            raise RuntimeError("Trade log writer failed") from self.error
+
+    # -- writer thread -------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while (not self._closed and len(self._buffer) < self.flush_rows
+                       and self._flush_to <= self.rows_written):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._buffer = self._buffer, []
+                done = self._closed
+            if batch:
+                try:
+                    self._write(batch)
+                except BaseException as e:
+                    with self._cond:
+                        self.error = e
+                        self._cond.notify_all()
+                    return
+            with self._cond:
+                self.rows_written += len(batch)
+                self._cond.notify_all()
+            if done and not self._buffer:
+                return
+
+    def _write(self, batch: List[Dict]):
+        if self.fmt == 'jsonl':
+            self._file.write(''.join(json.dumps(r) + '\n' for r in batch).encode())
+        else:
+            rows = np.empty(len(batch), dtype=TRADE_DTYPE)
+            rows['ts'] = [r['ts'] for r in batch]
+            rows['price'] = [r['price'] for r in batch]
+            rows['qty'] = [r['qty'] for r in batch]
+            rows['symbol'] = [r['symbol'].encode('ascii') for r in batch]
+            rows['side'] = [_SIDE_CODE[r['side']] for r in batch]
+            self._file.write(rows.tobytes())
+        self._file.flush()
+
+
+def read_trades(path: Union[str, Path], fmt: Optional[str] = None,
+                chunk_size: int = 65536) -> Iterator[Dict]:
+    """
+    Stream a trade log back one dict at a time; at most chunk_size records
+    (binary) or one line (jsonl) are held in memory.
+    """
+    path = Path(path)
+    fmt = _infer_format(path, fmt)
+    if fmt == 'jsonl':
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header['magic'][0] != MAGIC:
+        raise ValueError(f"{path} is not a binary trade log")
+    with open(path, 'rb') as f:
+        f.seek(HEADER_DTYPE.itemsize)
+        while True:
+            rows = np.fromfile(f, dtype=TRADE_DTYPE, count=chunk_size)
+            if len(rows) == 0:
+                return
+            for ts, price, qty, sym, side in zip(rows['ts'].tolist(), rows['price'].tolist(),
+                                                 rows['qty'].tolist(), rows['symbol'].tolist(),
+                                                 rows['side'].tolist()):
+                yield {'symbol': sym.decode('ascii'), 'side': _SIDE_NAME[side],
+                       'qty': qty, 'price': price, 'ts': ts}
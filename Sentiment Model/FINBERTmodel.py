@@ -1,70 +1,46 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
-import time
 import json
-from transformers import pipeline
+from finbert_service import FinBERTService
+from scrape_pipeline import SeleniumPages, SnapshotPages, run_pipeline
 
-# Initialize FinBERT
-finbert = pipeline("sentiment-analysis", model="yiyanghkust/finbert-tone")
+# Initialize FinBERT (batched, with repeated texts served from a cache)
+finbert = FinBERTService()
 
 def analyze_sentiment_finbert(text):
 
     #Analyzes sentiment using FinBERT.
 
-    try:
-        result = finbert(text)
-        return result[0]['label']
-    except Exception as e:
-        print(f"Error analyzing sentiment: {e}")
-        return "NEUTRAL"
+    return finbert.label(text)
 
-def scrape_twitter(ticker, max_tweets=500, output_file="tweets.json"):
-
-    #Scrapes Twitter for tweets matching the stock ticker and saves them in a JSON file.
-
-    #Set up Selenium
-    driver = webdriver.Chrome()
-    url = f"https://twitter.com/search?q={ticker}&f=live"
-    driver.get(url)
-
-    tweets = []
-    num_scrolls = max_tweets // 20 #20 per scroll assumed
+def analyze_sentiment_finbert_batch(texts):
 
-    #load more tweets
-    for scroll_count in range(num_scrolls):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
+    #Analyzes many texts in length-bucketed batches; errors come back as "NEUTRAL".
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        tweets_html = soup.find_all("article", {"role": "article"})
+    return finbert.labels(texts)
 
-        #Extract tweet info
-        for tweet_html in tweets_html:
-            try:
-                tweet_text = tweet_html.get_text(separator=" ").strip()
+def scrape_twitter(ticker, max_tweets=500, output_file="tweets.json", snapshots=None):
 
-                #Analyze sentiment
-                sentiment_label = analyze_sentiment_finbert(tweet_text)
-
-                #Append tweet data
-                tweets.append({
-                    "text": tweet_text,
-                    "sentiment": sentiment_label
-                })
-            except Exception as e:
-                print(f"Error extracting tweet: {e}")
-
-
-            if len(tweets) >= max_tweets:
-                break
+    #Scrapes Twitter for tweets matching the stock ticker and saves them in a JSON file.
+    #snapshots: saved page sources (a directory of .html files) to replay instead of a live browser
 
-        print(f"Scroll {scroll_count + 1}/{num_scrolls} completed. Scraped {len(tweets)} tweets so far.")
+    num_scrolls = max_tweets // 20 #20 per scroll assumed
 
-        if len(tweets) >= max_tweets:
-            break
+    #Scroll, parse only new articles and score them on separate stages
+    driver = None
+    if snapshots is not None:
+        pages = SnapshotPages(snapshots)
+    else:
+        #Set up Selenium
+        driver = webdriver.Chrome()
+        url = f"https://twitter.com/search?q={ticker}&f=live"
+        pages = SeleniumPages(driver, url, num_scrolls)
 
-    driver.quit()
+    try:
+        tweets = run_pipeline(pages, analyze_sentiment_finbert_batch, field="sentiment", max_tweets=max_tweets)
+    finally:
+        if driver is not None:
+            driver.quit()
 
     # Save tweets to a JSON file
     with open(output_file, "w", encoding="utf-8") as jsonfile:
@@ -1,10 +1,9 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
-import time
 import json
 from nltk.sentiment import SentimentIntensityAnalyzer
+from scrape_pipeline import SeleniumPages, SnapshotPages, run_pipeline
 
 # Initialize VADER Sentiment Analyzer
 sia = SentimentIntensityAnalyzer()
@@ -14,50 +13,31 @@ def analyze_sentiment_vader(text):
     sentiment = sia.polarity_scores(text)
     return sentiment["compound"]
 
-def scrape_twitter(ticker, max_tweets=500, output_file="tweets.json"):
+def analyze_sentiment_vader_batch(texts):
+    return [analyze_sentiment_vader(text) for text in texts]
 
-    #Selenium setup
-    driver = webdriver.Chrome()
-    url = f"https://twitter.com/search?q={ticker}&f=live"
-    driver.get(url)
+def scrape_twitter(ticker, max_tweets=500, output_file="tweets.json", snapshots=None):
 
-    tweets = []
-    num_scrolls = max_tweets // 20  #assuming 20 per scroll
+    #Scrapes Twitter for tweets matching the stock ticker and saves them in a JSON file.
+    #snapshots: saved page sources (a directory of .html files) to replay instead of a live browser
 
+    num_scrolls = max_tweets // 20 #20 per scroll assumed
 
-    for scroll_count in range(num_scrolls):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
+    #Scroll, parse only new articles and score them on separate stages
+    driver = None
+    if snapshots is not None:
+        pages = SnapshotPages(snapshots)
+    else:
+        #Set up Selenium
+        driver = webdriver.Chrome()
+        url = f"https://twitter.com/search?q={ticker}&f=live"
+        pages = SeleniumPages(driver, url, num_scrolls)
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        tweets_html = soup.find_all("article", {"role": "article"})
-
-        #getting data from the tweets
-        for tweet_html in tweets_html:
-            try:
-                tweet_text = tweet_html.get_text(separator=" ").strip()
-
-                #Analyzing sentiment
-                sentiment_score = analyze_sentiment_vader(tweet_text)
-
-                #adding the tweet to the json
-                tweets.append({
-                    "text": tweet_text,
-                    "sentiment_score": sentiment_score
-                })
-            except Exception as e:
-                print(f"Error extracting tweet: {e}")
-
-            if len(tweets) >= max_tweets:
-                break
-
-        print(f"Scroll {scroll_count + 1}/{num_scrolls} completed. Scraped {len(tweets)} tweets so far.")
-
-
-        if len(tweets) >= max_tweets:
-            break
-
-    driver.quit()
+    try:
+        tweets = run_pipeline(pages, analyze_sentiment_vader_batch, field="sentiment_score", max_tweets=max_tweets)
+    finally:
+        if driver is not None:
+            driver.quit()
 
     #sorted the tweets by their polarity score
     tweets = sorted(tweets, key=lambda x: x["sentiment_score"], reverse=True)
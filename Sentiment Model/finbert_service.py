@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_MODEL = "yiyanghkust/finbert-tone"
+MAX_LENGTH = 512            # BERT's context; longer texts are truncated
+FALLBACK = {'label': 'NEUTRAL', 'score': float('nan')}   # what analyze_sentiment_finbert returned on errors
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def _default_pipeline(model: str):
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=model, device=-1)
+
+
+class FinBERTService:
+    """
+    Batched, cached FinBERT sentiment scoring.
+
+    Texts are deduplicated and looked up in an LRU cache keyed by the text's
+    SHA-1, so repeats (the same tweet seen on every scroll) are free. The
+    misses are sorted by token length and cut into batches whose padded size
+    (batch length x longest text) stays under max_batch_tokens. Short tweets
+    then go through in large batches, long ones in small ones, and padding
+    is never wider than the batch needs.
+
+    predict() scores a list synchronously. submit() / apredict() queue texts
+    for a background worker, which collects them into one batch per
+    max_wait seconds or per max_batch_size texts, whichever comes first.
+    `pipe` is any callable with the transformers pipeline signature,
+    pipe(list_of_texts, batch_size=..., truncation=True) -> [{'label', 'score'}],
+    e.g. a small local stand-in for tests. By default the FinBERT pipeline is
+    loaded on first use, on CPU.
+    """
+
+    def __init__(self, pipe: Optional[Callable] = None, model: str = DEFAULT_MODEL,
+                 max_batch_size: int = 64, max_batch_tokens: int = 8192,
+                 max_wait: float = 0.01, cache_size: int = 100_000,
+                 length_fn: Optional[Callable[[Sequence[str]], List[int]]] = None):
+        self._pipe = pipe
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.length_fn = length_fn
+        self.stats = {'texts': 0, 'cache_hits': 0, 'scored': 0, 'batches': 0, 'errors': 0}
+
+        self._cache: 'OrderedDict[bytes, Dict]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+
+        self._queue: List[Tuple[str, Future]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return f"<FinBERTService {self.model} | cached: {len(self._cache)} | stats: {self.stats}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def pipe(self) -> Callable:
+        if self._pipe is None:
+            with self._model_lock:
+                if self._pipe is None:
+                    self._pipe = _default_pipeline(self.model)
+        return self._pipe
+
+    # -- cache -------------------------------------------------------------
+
+    def _cached(self, key: bytes) -> Optional[Dict]:
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _remember(self, key: bytes, result: Dict):
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # -- batching ----------------------------------------------------------
+
+    def _lengths(self, texts: Sequence[str]) -> List[int]:
+        if self.length_fn is not None:
+            return list(self.length_fn(texts))
+        tokenizer = getattr(self.pipe, 'tokenizer', None)
+        if tokenizer is not None:
+            ids = tokenizer(list(texts), truncation=True, max_length=MAX_LENGTH)['input_ids']
+            return [len(i) for i in ids]
+        # No tokenizer: word count + [CLS]/[SEP] is close enough for bucketing
+        return [min(len(t.split()) + 2, MAX_LENGTH) for t in texts]
+
+    def plan_batches(self, lengths: Sequence[int]) -> List[List[int]]:
+        """Indices grouped into length-sorted batches under the size and padded-token limits."""
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batches, batch = [], []
+        for i in order:
+            width = max(lengths[i], 1)     # sorted, so the newest text is the longest
+            if batch and (len(batch) >= self.max_batch_size or (len(batch) + 1) * width > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _run_batch(self, texts: List[str]) -> List[Dict]:
+        pipe = self.pipe
+        try:
+            with self._model_lock:
+                results = pipe(texts, batch_size=len(texts), truncation=True)
+            self.stats['batches'] += 1
+            return [{'label': r['label'], 'score': float(r['score'])} for r in results]
+        except Exception as e:
+            if len(texts) == 1:
+                print(f"Error analyzing sentiment: {e}")
+                self.stats['errors'] += 1
+                return [dict(FALLBACK)]
+        # One bad text shouldn't cost the whole batch
+        return [self._run_batch([t])[0] for t in texts]
+
+    def _score(self, keys: List[bytes], texts: List[str]) -> Dict[bytes, Dict]:
+        """key -> result for every text; only distinct cache misses reach the model."""
+        out, miss_keys, misses = {}, [], []
+        for key, text in dict(zip(keys, texts)).items():
+            cached = self._cached(key)
+            if cached is not None:
+                out[key] = cached
+            else:
+                miss_keys.append(key)
+                misses.append(text)
+        if misses:
+            lengths = self._lengths(misses)
+            for batch in self.plan_batches(lengths):
+                results = self._run_batch([misses[i] for i in batch])
+                for i, result in zip(batch, results):
+                    out[miss_keys[i]] = result
+                    if not math.isnan(result['score']):     # failures are retried next time
+                        self._remember(miss_keys[i], result)
+        self.stats['texts'] += len(texts)
+        self.stats['scored'] += len(misses)
+        self.stats['cache_hits'] += len(texts) - len(misses)
+        return out
+
+    # -- sync API ----------------------------------------------------------
+
+    def predict(self, texts: Iterable[str]) -> List[Dict]:
+        """{'label', 'score'} for every text, in order (fresh dicts, safe to modify)."""
+        texts = list(texts)
+        keys = [text_key(t) for t in texts]
+        results = self._score(keys, texts)
+        # Copies: the stored results are shared with the cache and with duplicates
+        return [dict(results[k]) for k in keys]
+
+    def labels(self, texts: Iterable[str]) -> List[str]:
+        return [r['label'] for r in self.predict(texts)]
+
+    def label(self, text: str) -> str:
+        return self.predict([text])[0]['label']
+
+    # -- queued / async API --------------------------------------------------
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the Future resolves to its {'label', 'score'}."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise ValueError("FinBERT service is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='finbert-worker', daemon=True)
+                self._thread.start()
+            self._queue.append((text, future))
+            if len(self._queue) >= self.max_batch_size:
+                self._cond.notify_all()
+        return future
+
+    async def apredict(self, texts: Iterable[str]) -> List[Dict]:
+        """predict() without blocking the event loop; texts join the worker's batches."""
+        futures = [asyncio.wrap_future(self.submit(t)) for t in texts]
+        return list(await asyncio.gather(*futures))
+
+    def close(self):
+        """Score whatever is queued, then stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.max_wait
+                while not self._closed and len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                work, self._queue = self._queue, []
+                done = self._closed
+            if work:
+                live = [(t, f) for t, f in work if f.set_running_or_notify_cancel()]
+                keys = [text_key(t) for t, _ in live]
+                try:
+                    results = self._score(keys, [t for t, _ in live])
+                    for key, (_, future) in zip(keys, live):
+                        future.set_result(dict(results[key]))
+                except Exception as e:
+                    for _, future in live:
+                        if not future.done():
+                            future.set_exception(e)
+            if done and not work:
+                return
+
+
+_default_service: Optional[FinBERTService] = None
+
+
+def default_service() -> FinBERTService:
+    """Process-wide FinBERT service (the model is loaded on first use)."""
+    global _default_service
+    if _default_service is None:
+        _default_service = FinBERTService()
+    return _default_service
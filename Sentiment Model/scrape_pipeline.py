@@ -0,0 +1,238 @@
+import hashlib
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup
+
+# Opening/closing <article> tags; fragments are cut out of the raw page
+# source so that only articles we have not seen yet reach BeautifulSoup.
+_ARTICLE_TAG = re.compile(r'<(/?)article\b[^>]*>', re.IGNORECASE)
+_ROLE_ARTICLE = re.compile(r'role\s*=\s*["\']article["\']', re.IGNORECASE)
+_STATUS_ID = re.compile(r'/status/(\d+)')
+
+_DONE = object()
+
+
+# -- stage 1: pages -------------------------------------------------------------
+
+class SeleniumPages:
+    """
+    Live pages: load `url`, then scroll `num_scrolls` times, yielding
+    driver.page_source after each scroll. With record_to set, every snapshot
+    is also saved as page_0001.html, ... for replay with SnapshotPages.
+    """
+
+    def __init__(self, driver, url: str, num_scrolls: int, pause: float = 3.0,
+                 record_to: Optional[Union[str, Path]] = None):
+        self.driver = driver
+        self.url = url
+        self.num_scrolls = num_scrolls
+        self.pause = pause
+        self.record_to = Path(record_to) if record_to is not None else None
+
+    def __len__(self):
+        return self.num_scrolls
+
+    def __iter__(self) -> Iterator[str]:
+        self.driver.get(self.url)
+        if self.record_to is not None:
+            self.record_to.mkdir(parents=True, exist_ok=True)
+        for scroll_count in range(self.num_scrolls):
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(self.pause)
+            html = self.driver.page_source
+            if self.record_to is not None:
+                (self.record_to / f"page_{scroll_count + 1:04d}.html").write_text(html, encoding='utf-8')
+            yield html
+
+
+class SnapshotPages:
+    """Saved page sources (files, or every *.html in a directory in name order) replayed offline."""
+
+    def __init__(self, paths: Union[str, Path, Sequence[Union[str, Path]]]):
+        if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+            paths = sorted(Path(paths).glob('*.html'))
+        elif isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.paths = [Path(p) for p in paths]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[str]:
+        for path in self.paths:
+            yield path.read_text(encoding='utf-8')
+
+
+# -- stage 2: incremental parsing ---------------------------------------------
+
+def article_fragments(html: str) -> Iterator[str]:
+    """Raw HTML of each outermost <article role="article"> element, found by tag scanning."""
+    depth, start, opening = 0, None, ''
+    for m in _ARTICLE_TAG.finditer(html):
+        if not m.group(1):
+            if depth == 0:
+                start, opening = m.start(), m.group(0)
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                if _ROLE_ARTICLE.search(opening):
+                    yield html[start:m.end()]
+                start = None
+
+
+def tweet_id(fragment: str) -> str:
+    """The tweet's status id (first /status/<id> link), or a hash of the article HTML."""
+    m = _STATUS_ID.search(fragment)
+    return m.group(1) if m else hashlib.sha1(fragment.encode('utf-8')).hexdigest()
+
+
+class ArticleParser:
+    """
+    Turns successive page sources into new tweets only.
+
+    Each page is scanned for article fragments. Fragments whose tweet id has
+    been seen are skipped before any HTML parsing, so a page costs a regex
+    scan plus BeautifulSoup on the newly appended articles, not a full
+    re-parse of everything loaded so far.
+    """
+
+    def __init__(self):
+        self.seen: set = set()
+        self.pages = 0
+        self.parsed = 0
+
+    def new_tweets(self, html: str) -> List[Dict[str, str]]:
+        self.pages += 1
+        out = []
+        for fragment in article_fragments(html):
+            tid = tweet_id(fragment)
+            if tid in self.seen:
+                continue
+            self.seen.add(tid)
+            self.parsed += 1
+            article = BeautifulSoup(fragment, "html.parser").find("article")
+            out.append({'id': tid, 'text': article.get_text(separator=" ").strip()})
+        return out
+
+
+# -- pipeline -------------------------------------------------------------------
+
+def run_pipeline(pages: Iterable[str], score_batch: Callable[[List[str]], List],
+                 field: str = "sentiment", max_tweets: int = 500, batch_size: int = 64,
+                 queue_size: int = 4, verbose: bool = True) -> List[Dict]:
+    """
+    Fetch -> parse -> score, each stage on its own thread, joined by bounded queues.
+
+    pages yields page sources (SeleniumPages live, SnapshotPages offline).
+    New tweets are scored in batches of up to batch_size with
+    score_batch(texts), which returns one score or label per text.
+    Fetching stops once max_tweets new tweets have been parsed. Returns
+    {"id", "text", field} records in the order the tweets appeared; the
+    status id also dates the tweet (see sentiment_signals.snowflake_time).
+    """
+    page_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    tweet_q: queue.Queue = queue.Queue(maxsize=queue_size * batch_size)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    parser = ArticleParser()
+    total = len(pages) if hasattr(pages, '__len__') else None
+
+    def put(q, item):
+        # Give up on a full queue once downstream has stopped consuming
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if errors:
+                    return False
+
+    def finish(q):
+        # The end marker must always arrive: make room for it by dropping
+        # queued items once any stage has failed, since they won't be used.
+        while True:
+            try:
+                q.put(_DONE, timeout=0.1)
+                return
+            except queue.Full:
+                if errors:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def fetch():
+        try:
+            for html in pages:
+                if stop.is_set() or not put(page_q, html):
+                    break
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            finish(page_q)
+
+    def parse():
+        count = 0
+        try:
+            while True:
+                html = page_q.get()
+                if html is _DONE:
+                    break
+                if count >= max_tweets:
+                    continue                   # drain so the fetcher can finish
+                for tweet in parser.new_tweets(html):
+                    if count >= max_tweets:
+                        break
+                    count += 1
+                    if not put(tweet_q, tweet):
+                        return
+                if verbose:
+                    progress = f"{parser.pages}/{total}" if total else f"{parser.pages}"
+                    print(f"Scroll {progress} completed. Scraped {count} tweets so far.")
+                if count >= max_tweets:
+                    stop.set()
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            finish(tweet_q)
+
+    threads = [threading.Thread(target=fetch, name='scrape-fetch', daemon=True),
+               threading.Thread(target=parse, name='scrape-parse', daemon=True)]
+    for t in threads:
+        t.start()
+
+    # Stage 3 runs here: score whatever has arrived, up to batch_size at a time
+    records: List[Dict] = []
+    finished = False
+    try:
+        while not finished:
+            batch = [tweet_q.get()]
+            while len(batch) < batch_size and batch[-1] is not _DONE:
+                try:
+                    batch.append(tweet_q.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _DONE:
+                batch.pop()
+                finished = True
+            if batch:
+                texts = [t['text'] for t in batch]
+                for tweet, score in zip(batch, score_batch(texts)):
+                    records.append({"id": tweet['id'], "text": tweet['text'], field: score})
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+        raise
+    finally:
+        for t in threads:
+            t.join()
+    if errors:
+        raise errors[0]
+    return records
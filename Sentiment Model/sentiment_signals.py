@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+sentiment_signals.py
+--------------------
+
+Turn scored tweets into per-ticker daily and intraday sentiment series.
+
+Each scored text (VADER sentiment_score, a FinBERT label, an SVC
+svc_score, ...) that has a timestamp goes into a daily bucket and an
+intraday bucket for its ticker. A tweet with no timestamp is dated by its
+status id. A bucket holds only running sums: count, score total, positive
+count and negative count. Ingesting a batch adds to the buckets it
+touches. The derived columns are recomputed only from the earliest
+touched bucket onward, since nothing before it can change:
+
+    volume, mean_score, pos_ratio, neg_ratio
+    rolling_volume, rolling_mean   (trailing `window`, volume weighted)
+    ewma                           (EWMA of mean_score over buckets)
+
+panel() lays a field out as a date-indexed frame in yf.download's
+(field, ticker) column layout, so it outer-merges on the index like the
+other frames in DataHandler.merge_all_data. The state can be saved and
+reloaded between runs.
+
+Usage:
+    python sentiment_signals.py signals.pkl AAPL_tweets.json TSLA_tweets.json
+    python sentiment_signals.py signals.pkl --export sentiment_daily.csv
+"""
+
+import argparse
+import bisect
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from vader_bulk import iter_records
+
+SCORE_FIELDS = ('sentiment_score', 'score', 'svc_score', 'sentiment', 'svc_sentiment')
+TIME_FIELDS = ('timestamp', 'created_at', 'datetime', 'date')
+LABEL_SCORES = {'positive': 1.0, 'negative': -1.0, 'neutral': 0.0}
+FIELDS = ('volume', 'mean_score', 'pos_ratio', 'neg_ratio', 'rolling_volume', 'rolling_mean', 'ewma')
+
+TWITTER_EPOCH_MS = 1288834974657
+_TICKER_FILE = re.compile(r'^([A-Za-z.\-^=]+)_tweets')
+
+
+def snowflake_time(tweet_id: Union[str, int]) -> Optional[pd.Timestamp]:
+    """UTC creation time encoded in a tweet's status id, or None for non-numeric ids."""
+    try:
+        ms = (int(tweet_id) >> 22) + TWITTER_EPOCH_MS
+    except (TypeError, ValueError):
+        return None
+    return pd.Timestamp(ms, unit='ms', tz='UTC')
+
+
+def _score(value) -> float:
+    if isinstance(value, str):
+        return LABEL_SCORES.get(value.strip().lower(), np.nan)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _Buckets:
+    """Time-ordered buckets of one ticker at one frequency, with lazily refreshed derived columns."""
+
+    __slots__ = ('keys', 'count', 'total', 'pos', 'neg', 'cum_count', 'cum_total',
+                 'roll_count', 'roll_total', 'ewma', 'dirty')
+
+    def __init__(self):
+        self.keys: List[int] = []          # bucket start, ns since epoch
+        self.count: List[int] = []
+        self.total: List[float] = []
+        self.pos: List[int] = []
+        self.neg: List[int] = []
+        self.cum_count: List[int] = []
+        self.cum_total: List[float] = []
+        self.roll_count: List[int] = []
+        self.roll_total: List[float] = []
+        self.ewma: List[float] = []
+        self.dirty: Optional[int] = None   # first index whose derived values are stale
+
+    def add(self, key: int, count: int, total: float, pos: int, neg: int):
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            self.count[i] += count
+            self.total[i] += total
+            self.pos[i] += pos
+            self.neg[i] += neg
+        else:
+            self.keys.insert(i, key)
+            for column, value in ((self.count, count), (self.total, total), (self.pos, pos), (self.neg, neg)):
+                column.insert(i, value)
+            for column in (self.cum_count, self.cum_total, self.roll_count, self.roll_total, self.ewma):
+                column.insert(i, 0)
+        self.dirty = i if self.dirty is None else min(self.dirty, i)
+
+    def refresh(self, window: int, alpha: float):
+        if self.dirty is None:
+            return
+        keys, cum_count, cum_total = self.keys, self.cum_count, self.cum_total
+        for i in range(self.dirty, len(keys)):
+            cum_count[i] = self.count[i] + (cum_count[i - 1] if i else 0)
+            cum_total[i] = self.total[i] + (cum_total[i - 1] if i else 0.0)
+            lo = bisect.bisect_right(keys, keys[i] - window, 0, i)     # first bucket inside the window
+            self.roll_count[i] = cum_count[i] - (cum_count[lo - 1] if lo else 0)
+            self.roll_total[i] = cum_total[i] - (cum_total[lo - 1] if lo else 0.0)
+            mean = self.total[i] / self.count[i]
+            self.ewma[i] = mean if i == 0 else alpha * mean + (1 - alpha) * self.ewma[i - 1]
+        self.dirty = None
+
+    def frame(self) -> pd.DataFrame:
+        count = np.asarray(self.count, dtype=float)
+        roll_count = np.asarray(self.roll_count, dtype=float)
+        return pd.DataFrame({
+            'volume': np.asarray(self.count, dtype=int),
+            'mean_score': np.asarray(self.total) / count,
+            'pos_ratio': np.asarray(self.pos) / count,
+            'neg_ratio': np.asarray(self.neg) / count,
+            'rolling_volume': np.asarray(self.roll_count, dtype=int),
+            'rolling_mean': np.asarray(self.roll_total) / roll_count,
+            'ewma': np.asarray(self.ewma, dtype=float),
+        }, index=pd.DatetimeIndex(np.asarray(self.keys, dtype='datetime64[ns]'), name='date'))
+
+
+class SentimentSignals:
+    """
+    Incremental per-ticker sentiment aggregates at daily and intraday resolution.
+
+    Timestamps are converted to `tz` (US market time by default) and then
+    made naive, so daily buckets line up with yfinance's trading dates.
+    A score above neutral_band counts as positive and one below
+    -neutral_band as negative (VADER's ±0.05 convention). Labels count as
+    +1 / -1 / 0. window and intraday_window are the trailing spans for
+    the rolling columns. ewm_span sets the EWMA's span, counted in
+    buckets.
+    """
+
+    def __init__(self, intraday_freq: str = '1h', window: str = '7D', intraday_window: str = '6h',
+                 ewm_span: int = 10, neutral_band: float = 0.05, tz: str = 'America/New_York'):
+        self.freqs = {'daily': pd.Timedelta('1D'), 'intraday': pd.Timedelta(intraday_freq)}
+        self.windows = {'daily': pd.Timedelta(window).value, 'intraday': pd.Timedelta(intraday_window).value}
+        self.alpha = 2.0 / (ewm_span + 1)
+        self.neutral_band = neutral_band
+        self.tz = tz
+        self._buckets: Dict[str, Dict[str, _Buckets]] = {'daily': {}, 'intraday': {}}
+        self._frames: Dict[tuple, pd.DataFrame] = {}
+        self.stats = {'ingested': 0, 'skipped': 0}
+
+    def __repr__(self):
+        return (f"<SentimentSignals | tickers: {len(self.tickers)} | "
+                f"days: {sum(len(b.keys) for b in self._buckets['daily'].values())} | stats: {self.stats}>")
+
+    @property
+    def tickers(self) -> List[str]:
+        return sorted(self._buckets['daily'])
+
+    # -- ingestion -----------------------------------------------------------
+
+    def _normalize(self, records, ticker: Optional[str], field: Optional[str]) -> pd.DataFrame:
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        if len(df) == 0:
+            return pd.DataFrame(columns=['ticker', 'time', 'score'])
+
+        if field is None:
+            field = next((f for f in SCORE_FIELDS if f in df.columns), None)
+            if field is None:
+                raise ValueError(f"No score column; expected one of {SCORE_FIELDS}")
+        values = df[field]
+        scores = (values if pd.api.types.is_numeric_dtype(values) else values.map(_score)).astype(float)
+
+        time_field = next((f for f in TIME_FIELDS if f in df.columns), None)
+        times = (pd.to_datetime(df[time_field], utc=True, errors='coerce') if time_field is not None
+                 else pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]'))
+        if 'id' in df.columns and times.isna().any():
+            missing = times.isna()
+            times[missing] = pd.to_datetime(df.loc[missing, 'id'].map(snowflake_time), utc=True)
+        times = times.dt.tz_convert(self.tz).dt.tz_localize(None)
+
+        tickers = df['ticker'] if ticker is None else pd.Series(ticker, index=df.index)
+        out = pd.DataFrame({'ticker': tickers.astype(str).str.upper(), 'time': times, 'score': scores})
+        return out.dropna()
+
+    def ingest(self, records, ticker: Optional[str] = None, field: Optional[str] = None) -> int:
+        """
+        Add scored texts: a DataFrame or iterable of dicts with a score field
+        (first of SCORE_FIELDS unless `field` is given), a timestamp (TIME_FIELDS)
+        or tweet 'id', and a 'ticker' column unless `ticker` is given.
+        Records with no usable score or time are skipped. Returns the number added.
+        """
+        df = self._normalize(records, ticker, field)
+        self.stats['skipped'] += (len(records) if hasattr(records, '__len__') else len(df)) - len(df)
+        if df.empty:
+            return 0
+        df['pos'] = df['score'] > self.neutral_band
+        df['neg'] = df['score'] < -self.neutral_band
+
+        for level, freq in self.freqs.items():
+            df['bucket'] = df['time'].dt.floor(freq)
+            sums = df.groupby(['ticker', 'bucket']).agg(count=('score', 'size'), total=('score', 'sum'),
+                                                       pos=('pos', 'sum'), neg=('neg', 'sum'))
+            store = self._buckets[level]
+            for (tkr, bucket), row in zip(sums.index, sums.itertuples(index=False)):
+                if tkr not in store:
+                    store[tkr] = _Buckets()
+                store[tkr].add(bucket.value, int(row.count), float(row.total), int(row.pos), int(row.neg))
+                self._frames.pop((level, tkr), None)
+        self.stats['ingested'] += len(df)
+        return len(df)
+
+    def ingest_file(self, path: Union[str, Path], ticker: Optional[str] = None,
+                    field: Optional[str] = None, chunk_size: int = 10_000) -> int:
+        """Stream a scraper output (.json array) or .jsonl file in; ticker defaults to the {TICKER}_tweets prefix."""
+        path = Path(path)
+        if ticker is None:
+            m = _TICKER_FILE.match(path.name)
+            if m is None:
+                raise ValueError(f"Can't tell the ticker from {path.name}; pass ticker=")
+            ticker = m.group(1)
+        added, chunk = 0, []
+        for record in iter_records(path):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                added += self.ingest(chunk, ticker, field)
+                chunk = []
+        if chunk:
+            added += self.ingest(chunk, ticker, field)
+        return added
+
+    # -- output --------------------------------------------------------------
+
+    def frame(self, ticker: str, level: str = 'daily') -> pd.DataFrame:
+        """One ticker's buckets with every field in FIELDS, indexed by bucket start."""
+        key = (level, ticker.upper())
+        if key not in self._frames:
+            buckets = self._buckets[level].get(ticker.upper())
+            if buckets is None:
+                return pd.DataFrame(columns=list(FIELDS), index=pd.DatetimeIndex([], name='date'))
+            buckets.refresh(self.windows[level], self.alpha)
+            self._frames[key] = buckets.frame()
+        return self._frames[key]
+
+    def daily(self, ticker: str) -> pd.DataFrame:
+        return self.frame(ticker, 'daily')
+
+    def intraday(self, ticker: str) -> pd.DataFrame:
+        return self.frame(ticker, 'intraday')
+
+    def panel(self, fields: Optional[Sequence[str]] = None, tickers: Optional[Iterable[str]] = None,
+              level: str = 'daily', flat: bool = False) -> pd.DataFrame:
+        """
+        Date-indexed panel with (field, ticker) columns, as yf.download lays them out.
+
+        flat=True joins the column levels into "field TICKER", which is how
+        DataHandler.get_df names its columns. Dates with no tweets for a
+        ticker are NaN; fill them as the merge needs, e.g. volume with 0.
+        """
+        fields = list(fields or FIELDS)
+        tickers = [t.upper() for t in (tickers if tickers is not None else self.tickers)]
+        frames = {t: self.frame(t, level)[fields] for t in tickers}
+        if not frames:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name='date'))
+        panel = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+        panel = panel.reindex(columns=pd.MultiIndex.from_product([fields, tickers]))
+        panel.index.name = 'date'
+        if flat:
+            panel.columns = [' '.join(col) for col in panel.columns]
+        return panel
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path: Union[str, Path]):
+        state = {k: v for k, v in self.__dict__.items() if k != '_frames'}
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'SentimentSignals':
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        signals = cls.__new__(cls)
+        signals.__dict__.update(state, _frames={})
+        return signals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aggregate scored tweets into per-ticker sentiment signals.")
+    parser.add_argument("state", type=Path, help="Signals state file; created if missing, updated in place.")
+    parser.add_argument("inputs", nargs="*", type=Path, help="Scored {TICKER}_tweets.json / .jsonl files to add.")
+    parser.add_argument("--ticker", help="Ticker for all inputs (default: from each file name).")
+    parser.add_argument("--field", help="Score field (default: first of %s)." % ', '.join(SCORE_FIELDS))
+    parser.add_argument("--export", type=Path, help="Write the daily panel (flat columns) to this CSV.")
+    args = parser.parse_args()
+
+    signals = SentimentSignals.load(args.state) if args.state.exists() else SentimentSignals()
+    for path in args.inputs:
+        added = signals.ingest_file(path, args.ticker, args.field)
+        print(f"Added {added} scored tweets from {path}")
+    signals.save(args.state)
+    if args.export:
+        signals.panel(flat=True).to_csv(args.export)
+        print(f"Daily panel for {len(signals.tickers)} tickers saved to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
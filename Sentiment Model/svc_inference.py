@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+svc_inference.py
+----------------
+
+Load the SA_model.ipynb sentiment SVC once per process and score text at volume.
+
+twitter_sa_svc_model.pkl holds only the fitted LinearSVC (500,000 TF-IDF
+features). The TfidfVectorizer it was trained with was never saved, so that
+file alone cannot score new text. To use it, pass the fitted vectorizer with
+--vectorizer, or retrain with `train` here, which saves the whole pipeline:
+preprocessing -> vectorizer -> LinearSVC.
+
+`train` uses the notebook's training set and split: every row of
+Project_Data.csv (targets 4 -> 1), 95% for training and 5% held out with
+random_state=26105111. The notebook fitted its SVC on that raw text;
+the cleaning cells only touched the 20k+20k `dataset` sample, which no
+model was trained on. `--raw` reproduces that exactly. By default the
+text is first cleaned the way those cells do it: lowercase, drop the
+stopword list, strip punctuation, the repeated-character, URL and number
+regexes, tokenize on \\b\\w+\\b, then lemmatize with WordNet. (The
+notebook's lemmatizer cell discarded its result; here it is applied.)
+Cleaning runs over a whole batch, so each distinct token is lemmatized once.
+The `--hashing` retrain swaps the TfidfVectorizer vocabulary (500k n-grams
+held in memory) for a HashingVectorizer with a fixed number of buckets
+followed by TF-IDF weighting, so memory stays flat however large the
+vocabulary gets.
+
+Usage:
+    python svc_inference.py train Project_Data.csv svc_pipeline.pkl [--hashing]
+    python svc_inference.py score tweets.jsonl scored.jsonl --model svc_pipeline.pkl --workers 4
+"""
+
+import argparse
+import re
+import string
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import joblib
+import numpy as np
+
+from vader_bulk import RecordWriter, iter_records
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / 'twitter_sa_svc_model.pkl'
+LABELS = {0: 'Negative', 1: 'Positive'}
+
+# SA_model.ipynb's stopword list
+STOPWORDS = frozenset([
+    'a', 'about', 'above', 'after', 'again', 'ain', 'all', 'am', 'an',
+    'and', 'any', 'are', 'as', 'at', 'be', 'because', 'been', 'before',
+    'being', 'below', 'between', 'both', 'by', 'can', 'd', 'did', 'do',
+    'does', 'doing', 'down', 'during', 'each', 'few', 'for', 'from',
+    'further', 'had', 'has', 'have', 'having', 'he', 'her', 'here',
+    'hers', 'herself', 'him', 'himself', 'his', 'how', 'i', 'if', 'in',
+    'into', 'is', 'it', 'its', 'itself', 'just', 'll', 'm', 'ma',
+    'me', 'more', 'most', 'my', 'myself', 'now', 'o', 'of', 'on', 'once',
+    'only', 'or', 'other', 'our', 'ours', 'ourselves', 'out', 'own', 're', 's', 'same', 'she', "shes",
+    'should', "shouldve", 'so', 'some', 'such',
+    't', 'than', 'that', "thatll", 'the', 'their', 'theirs', 'them',
+    'themselves', 'then', 'there', 'these', 'they', 'this', 'those',
+    'through', 'to', 'too', 'under', 'until', 'up', 've', 'very', 'was',
+    'we', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'whom',
+    'why', 'will', 'with', 'won', 'y', 'you', "youd", "youll", "youre",
+    "youve", 'your', 'yours', 'yourself', 'yourselves',
+])
+_PUNCTUATION = str.maketrans('', '', string.punctuation)
+# The notebook's cleaning regexes, kept exactly as written there
+# ('(.)1+' matches a character followed by literal 1s, '[^s]' anything but 's')
+_REPEATED = re.compile(r'(.)1+')
+_URL = re.compile('((www.[^s]+)|(https?://[^s]+))')
+_NUMBER = re.compile('[0-9]+')
+_TOKEN = re.compile(r'\b\w+\b')
+
+_lemmatizer = None
+
+
+def _lemmatize_all(tokens: Iterable[str]) -> Dict[str, str]:
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return {t: _lemmatizer.lemmatize(t) for t in tokens}
+
+
+def _clean(text: str) -> List[str]:
+    text = ' '.join(w for w in str(text).lower().split() if w not in STOPWORDS)
+    text = text.translate(_PUNCTUATION)
+    text = _REPEATED.sub(r'1', text)
+    text = _URL.sub(' ', text)
+    text = _NUMBER.sub('', text)
+    return _TOKEN.findall(text)
+
+
+def preprocess_batch(texts: Sequence[str], lemmatize: bool = True) -> List[str]:
+    """SA_model.ipynb's cleaning cells for a batch of texts, returned as space-joined tokens."""
+    token_lists = [_clean(t) for t in texts]
+    if lemmatize:
+        lemmas = _lemmatize_all({w for tokens in token_lists for w in tokens})
+        token_lists = [[lemmas[w] for w in tokens] for tokens in token_lists]
+    return [' '.join(tokens) for tokens in token_lists]
+
+
+def build_pipeline(hashing: bool = False, n_features: int = 2 ** 20, preprocess: bool = True,
+                   lemmatize: bool = True):
+    """
+    Unfitted preprocessing -> vectorizer -> LinearSVC pipeline with the
+    notebook's vectorizer settings. preprocess=False feeds raw text to the
+    vectorizer, as the notebook's SVC was trained.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import FunctionTransformer
+    from sklearn.svm import LinearSVC
+
+    steps = [FunctionTransformer(preprocess_batch, kw_args={'lemmatize': lemmatize})] if preprocess else []
+    if hashing:
+        steps += [HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm=None),
+                  TfidfTransformer()]
+    else:
+        steps.append(TfidfVectorizer(ngram_range=(1, 2), max_features=500000))
+    return make_pipeline(*steps, LinearSVC())
+
+
+def load_training_data(csv_path: Union[str, Path], per_class: Optional[int] = None):
+    """
+    (texts, labels) from Project_Data.csv with targets 4 -> 1: every row, the
+    notebook's `data` that its models were fitted on, or with per_class the
+    first per_class tweets of each label (its 20k+20k `dataset` sample).
+    """
+    import pandas as pd
+    df = pd.read_csv(csv_path, encoding="ISO-8859-1",
+                     names=['target', 'ids', 'date', 'flag', 'user', 'text'])
+    df['target'] = df['target'].replace(4, 1)
+    if per_class is not None:
+        df = pd.concat([df[df['target'] == 1].iloc[:per_class], df[df['target'] == 0].iloc[:per_class]])
+    return df['text'].tolist(), df['target'].to_numpy()
+
+
+def train(texts: Sequence[str], labels: Sequence[int], path: Optional[Union[str, Path]] = None,
+          test_size: float = 0.05, random_state: int = 26105111, **pipeline_kwargs):
+    """
+    Fit a full pipeline (see build_pipeline) on the notebook's train split and
+    optionally save it with joblib. Returns (model, accuracy on the held-out
+    test_size share); test_size=0 trains on everything (accuracy NaN).
+    """
+    texts, labels = list(texts), np.asarray(labels)
+    if test_size:
+        from sklearn.model_selection import train_test_split
+        texts, test_texts, labels, test_labels = train_test_split(
+            texts, labels, test_size=test_size, random_state=random_state)
+    model = build_pipeline(**pipeline_kwargs).fit(texts, labels)
+    accuracy = float(model.score(test_texts, test_labels)) if test_size else float('nan')
+    if path is not None:
+        joblib.dump(model, path)
+    return model, accuracy
+
+
+# -- loading ---------------------------------------------------------------------
+
+def load_model(path: Union[str, Path] = DEFAULT_MODEL_PATH,
+               vectorizer_path: Optional[Union[str, Path]] = None, preprocess: bool = False):
+    """
+    A text -> label pipeline from a saved model.
+
+    A saved pipeline is used as is. A bare classifier such as
+    twitter_sa_svc_model.pkl needs the vectorizer it was fitted with.
+    The notebook fitted that vectorizer on raw text, so preprocessing is off
+    unless preprocess=True. Arrays are memory-mapped, so worker processes
+    share the model's pages instead of each holding a copy.
+    """
+    model = joblib.load(path, mmap_mode='r')
+    if hasattr(model, 'steps'):
+        return model
+    if vectorizer_path is None:
+        raise ValueError(
+            f"{path} holds a bare {type(model).__name__} without the vectorizer it was trained with; "
+            "pass vectorizer_path or retrain a full pipeline with svc_inference.train")
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import FunctionTransformer
+    steps = [joblib.load(vectorizer_path), model]
+    if preprocess:
+        steps.insert(0, FunctionTransformer(preprocess_batch))
+    return make_pipeline(*steps)
+
+
+_models: Dict[tuple, object] = {}
+
+
+def get_model(path: Union[str, Path] = DEFAULT_MODEL_PATH,
+              vectorizer_path: Optional[Union[str, Path]] = None, preprocess: bool = False):
+    """load_model, once per process and arguments."""
+    key = (str(path), str(vectorizer_path), preprocess)
+    if key not in _models:
+        _models[key] = load_model(path, vectorizer_path, preprocess)
+    return _models[key]
+
+
+# -- scoring ---------------------------------------------------------------------
+
+def score_texts(model, texts: Sequence[str]) -> List[Dict]:
+    """{'svc_sentiment': 'Positive'/'Negative', 'svc_score': SVM margin} per text, one vectorized call."""
+    if not texts:
+        return []
+    margins = np.asarray(model.decision_function(list(texts)), dtype=float)
+    classes = model.classes_
+    labels = classes[(margins > 0).astype(int)]
+    return [{'svc_sentiment': LABELS.get(int(c), str(c)), 'svc_score': float(m)}
+            for c, m in zip(labels, margins)]
+
+
+_worker_model = None
+
+
+def _init_worker(model_args: tuple):
+    global _worker_model
+    _worker_model = get_model(*model_args)
+
+
+def _score_chunk(texts: List[str]) -> List[Dict]:
+    return score_texts(_worker_model, texts)
+
+
+def score_stream(texts: Iterable[str], model_args: tuple = (DEFAULT_MODEL_PATH,),
+                 chunk_size: int = 5000, workers: int = 0,
+                 max_inflight: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Scores for a stream of texts, in order, a chunk at a time.
+
+    model_args go to get_model (path, vectorizer_path, preprocess). With
+    workers > 0 chunks are spread over a process pool, each worker loading
+    the model once; at most max_inflight chunks are pending.
+    """
+    max_inflight = max_inflight or 2 * max(workers, 1)
+    pool = (ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_args,))
+            if workers else None)
+    if pool is None:
+        _init_worker(model_args)
+    pending: deque = deque()
+
+    def submit(chunk):
+        if pool is not None:
+            pending.append(pool.submit(_score_chunk, chunk))
+        else:
+            done: Future = Future()
+            done.set_result(_score_chunk(chunk))
+            pending.append(done)
+
+    try:
+        chunk: List[str] = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                submit(chunk)
+                chunk = []
+                if len(pending) >= max_inflight:
+                    yield from pending.popleft().result()
+        if chunk:
+            submit(chunk)
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def score_file(input_path: Union[str, Path], output_path: Union[str, Path],
+               text_field: str = 'text', **kwargs) -> int:
+    """Score a .jsonl / .json tweet file; each input record is written back with svc_sentiment and svc_score added."""
+    records = iter_records(input_path)
+    buffered: deque = deque()
+
+    def texts():
+        for record in records:
+            buffered.append(record)
+            yield record.get(text_field, '')
+
+    with RecordWriter(output_path) as out:
+        for scores in score_stream(texts(), **kwargs):
+            out.write({**buffered.popleft(), **scores})
+        return out.count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train or run the tweet sentiment SVC at volume.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    t = sub.add_parser("train", help="Retrain and save a full preprocessing + vectorizer + SVC pipeline "
+                                     "on the notebook's 95/5 split.")
+    t.add_argument("csv", type=Path, help="Sentiment140-style CSV (Project_Data.csv).")
+    t.add_argument("output", type=Path, help="Where to save the pipeline.")
+    t.add_argument("--hashing", action="store_true", help="HashingVectorizer instead of a fitted vocabulary.")
+    t.add_argument("--n-features", type=int, default=2 ** 20, help="Hash buckets with --hashing.")
+    t.add_argument("--raw", action="store_true", help="No cleaning, as the notebook's SVC was trained.")
+    t.add_argument("--per-class", type=int, help="Only the first N tweets per label (the notebook's "
+                                                 "`dataset` sample used 20000); default: every row.")
+
+    s = sub.add_parser("score", help="Score a .jsonl/.json tweet file in chunks.")
+    s.add_argument("input", type=Path)
+    s.add_argument("output", type=Path)
+    s.add_argument("--model", type=Path, default=DEFAULT_MODEL_PATH, help="Saved pipeline or bare classifier.")
+    s.add_argument("--vectorizer", type=Path, help="Fitted vectorizer for a bare classifier.")
+    s.add_argument("--preprocess", action="store_true",
+                   help="Apply the notebook preprocessing before a separately supplied vectorizer.")
+    s.add_argument("--workers", type=int, default=0, help="Worker processes (0: in-process).")
+    s.add_argument("--chunk-size", type=int, default=5000, help="Texts per vectorized batch.")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        # Run as a script, this module is __main__. Train through the importable
+        # module so the pickle references svc_inference.preprocess_batch and
+        # loads wherever svc_inference is imported.
+        import svc_inference
+        texts, labels = svc_inference.load_training_data(args.csv, args.per_class)
+        _, accuracy = svc_inference.train(texts, labels, args.output, hashing=args.hashing,
+                                          n_features=args.n_features, preprocess=not args.raw)
+        print(f"Trained on {len(texts)} tweets (held-out accuracy {accuracy:.3f}) and saved to {args.output}")
+    else:
+        n = score_file(args.input, args.output, model_args=(args.model, args.vectorizer, args.preprocess),
+                       chunk_size=args.chunk_size, workers=args.workers)
+        print(f"Scored {n} tweets and saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
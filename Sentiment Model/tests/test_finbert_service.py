@@ -0,0 +1,19 @@
+from finbert_service import FinBERTService
+
+
+def _pipe(texts, batch_size=None, truncation=True):
+    return [{'label': 'Positive' if 'up' in t else 'Negative', 'score': 0.9} for t in texts]
+
+
+def test_results_do_not_share_cached_dicts():
+    service = FinBERTService(pipe=_pipe)
+    first, duplicate = service.predict(['stocks up', 'stocks up'])
+    assert first is not duplicate
+    first['label'] = 'edited'
+    assert duplicate['label'] == 'Positive'
+    assert service.predict(['stocks up'])[0] == {'label': 'Positive', 'score': 0.9}
+
+    with service:
+        queued = service.submit('stocks up').result(timeout=5)
+    queued['score'] = 0.0
+    assert service.predict(['stocks up'])[0]['score'] == 0.9
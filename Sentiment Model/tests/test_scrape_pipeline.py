@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+import scrape_pipeline
+from scrape_pipeline import SnapshotPages, run_pipeline
+
+PAGE = ''.join(f'<article role="article"><a href="/u/status/{i}">x</a>tweet {i}</article>' for i in range(3))
+
+
+def _run_with_timeout(fn, timeout=10.0):
+    result = {}
+
+    def target():
+        try:
+            result['value'] = fn()
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "run_pipeline hung"
+    return result
+
+
+def test_fetch_error_is_raised_when_page_queue_is_full(tmp_path, monkeypatch):
+    pages = []
+    for i in range(6):
+        path = tmp_path / f'page_{i}.html'
+        path.write_text(PAGE, encoding='utf-8')
+        pages.append(path)
+    pages.append(tmp_path / 'missing.html')
+
+    new_tweets = scrape_pipeline.ArticleParser.new_tweets
+
+    def slow(self, html):
+        time.sleep(0.2)
+        return new_tweets(self, html)
+
+    monkeypatch.setattr(scrape_pipeline.ArticleParser, 'new_tweets', slow)
+    result = _run_with_timeout(lambda: run_pipeline(SnapshotPages(pages), lambda texts: [0.0] * len(texts),
+                                                    queue_size=1, verbose=False))
+    assert isinstance(result.get('error'), FileNotFoundError)
+
+
+def test_scoring_error_is_raised():
+    def fail(texts):
+        raise RuntimeError("model down")
+
+    result = _run_with_timeout(lambda: run_pipeline([PAGE] * 20, fail, batch_size=1, queue_size=1, verbose=False))
+    assert isinstance(result.get('error'), RuntimeError)
+
+
+def test_records_keep_order_and_dedupe():
+    records = run_pipeline([PAGE, PAGE], lambda texts: [len(t) for t in texts], field='n', verbose=False)
+    assert [r['id'] for r in records] == ['0', '1', '2']
+    assert all(r['n'] == len(r['text']) for r in records)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+vader_bulk.py
+-------------
+
+Re-score stored tweet archives with VADER on every core.
+
+Input is a VADERmodel.py / FINBERTmodel.py output file (a JSON array of
+records with a "text" field) or JSONL, read lazily. Texts are sent to a
+process pool in chunks, with one SentimentIntensityAnalyzer per worker.
+Identical texts are scored once, via a per-chunk dedupe plus a bounded LRU
+of recent texts. Results are written back as they complete, in input
+order, as {"text", "sentiment_score"} records, to .json (array) or .jsonl.
+Only max_inflight chunks are held at a time, so memory does not grow with
+the corpus.
+
+Usage:
+    python vader_bulk.py AAPL_tweets.json AAPL_rescored.jsonl
+    python vader_bulk.py archive.jsonl rescored.json --workers 8 --chunk-size 5000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+_READ_SIZE = 1 << 16
+
+
+def nltk_analyzer():
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+# -- lazy input ----------------------------------------------------------------
+
+def _iter_json_array(f) -> Iterator:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def more():
+        nonlocal buf, pos, eof
+        chunk = f.read(_READ_SIZE)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    more()
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos < len(buf):
+            break
+        if eof:
+            return
+        more()
+    if buf[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ','):
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Unterminated JSON array")
+            more()
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more()
+            continue
+        if end == len(buf) and not eof:
+            more()     # a scalar could continue past the buffer; re-read it whole
+            continue
+        yield obj
+        pos = end
+        if pos > _READ_SIZE:
+            buf, pos = buf[pos:], 0
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[Dict]:
+    """Records of a .jsonl file (one per line) or a .json array, streamed."""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+# -- streaming output ----------------------------------------------------------
+
+class RecordWriter:
+    """Write records one at a time as JSONL, or as a JSON array in VADERmodel.py's layout."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.jsonl = self.path.suffix == '.jsonl'
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+        if not self.jsonl:
+            self._file.write('[')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record: Dict):
+        if self.jsonl:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            body = json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    ')
+            self._file.write(('\n    ' if self.count == 0 else ',\n    ') + body)
+        self.count += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if not self.jsonl:
+            self._file.write('\n]' if self.count else ']')
+        self._file.close()
+
+
+# -- workers -------------------------------------------------------------------
+
+_analyzer = None
+
+
+def _init_worker(factory: Callable):
+    global _analyzer
+    _analyzer = factory()
+
+
+def _score_texts(texts: List[str]) -> List[float]:
+    return [_analyzer.polarity_scores(t)["compound"] for t in texts]
+
+
+def _key(text: str) -> bytes:
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+class _Chunk:
+    __slots__ = ('texts', 'keys', 'known', 'todo', 'borrowed', 'future')
+
+    def __init__(self, texts, keys, known, todo, borrowed, future):
+        self.texts, self.keys, self.known, self.todo = texts, keys, known, todo
+        self.borrowed, self.future = borrowed, future
+
+
+def score_corpus(texts: Iterable[str], workers: Optional[int] = None, chunk_size: int = 2000,
+                 max_inflight: Optional[int] = None, cache_size: int = 200_000,
+                 analyzer_factory: Callable = nltk_analyzer, stats: Optional[Dict] = None
+                 ) -> Iterator[Tuple[str, float]]:
+    """
+    (text, compound VADER score) for every text, in order, as a lazy stream.
+
+    workers=0 scores in this process (no pool). analyzer_factory must be a
+    picklable zero-argument callable returning an object with
+    polarity_scores(); each worker calls it once.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    max_inflight = max_inflight or 2 * max(workers, 1)
+    stats = stats if stats is not None else {}
+    stats.update(texts=0, unique_scored=0)
+    cache: 'OrderedDict[bytes, float]' = OrderedDict()
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(analyzer_factory,)) if workers else None
+    if pool is None:
+        _init_worker(analyzer_factory)
+    pending: deque = deque()
+    inflight: Dict[bytes, _Chunk] = {}     # text key -> earlier chunk already scoring it
+
+    def dispatch(batch: List[str]):
+        keys = [_key(t) for t in batch]
+        known, todo, borrowed = {}, {}, {}
+        for k, t in zip(keys, batch):
+            if k in known or k in todo or k in borrowed:
+                continue
+            if k in cache:
+                known[k] = cache[k]
+                cache.move_to_end(k)
+            elif k in inflight:
+                borrowed[k] = inflight[k]
+            else:
+                todo[k] = t
+        texts_todo = list(todo.values())
+        if pool is not None and texts_todo:
+            future = pool.submit(_score_texts, texts_todo)
+        else:
+            future = Future()
+            future.set_result(_score_texts(texts_todo))
+        chunk = _Chunk(batch, keys, known, list(todo), borrowed, future)
+        inflight.update(dict.fromkeys(todo, chunk))
+        pending.append(chunk)
+
+    def collect() -> Iterator[Tuple[str, float]]:
+        chunk = pending.popleft()
+        scores = chunk.future.result()
+        known = chunk.known
+        for k, s in zip(chunk.todo, scores):
+            known[k] = s
+            cache[k] = s
+            if inflight.get(k) is chunk:
+                del inflight[k]
+        for k, owner in chunk.borrowed.items():
+            known[k] = owner.known[k]     # owners are earlier in the queue, so already collected
+        chunk.borrowed = None
+        while len(cache) > cache_size:
+            cache.popitem(last=False)
+        stats['texts'] += len(chunk.texts)
+        stats['unique_scored'] += len(chunk.todo)
+        for t, k in zip(chunk.texts, chunk.keys):
+            yield t, known[k]
+
+    try:
+        batch: List[str] = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= chunk_size:
+                dispatch(batch)
+                batch = []
+                if len(pending) >= max_inflight:
+                    yield from collect()
+        if batch:
+            dispatch(batch)
+        while pending:
+            yield from collect()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def rescore_file(input_path: Union[str, Path], output_path: Union[str, Path],
+                 **kwargs) -> Dict:
+    """Stream input_path through score_corpus into output_path; returns counts and timing."""
+    start = time.perf_counter()
+    stats: Dict = {}
+
+    texts = (r.get("text", "") for r in iter_records(input_path))
+    with RecordWriter(output_path) as out:
+        for text, score in score_corpus(texts, stats=stats, **kwargs):
+            out.write({"text": text, "sentiment_score": score})
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score a stored tweet archive with VADER on all cores.")
+    parser.add_argument("input", type=Path, help="Tweets as a .json array or .jsonl.")
+    parser.add_argument("output", type=Path, help="Where to write {text, sentiment_score} records (.json or .jsonl).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores, 0: in-process).")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Texts per chunk sent to a worker.")
+    parser.add_argument("--cache-size", type=int, default=200_000, help="Recent distinct texts remembered for dedupe.")
+    args = parser.parse_args()
+
+    stats = rescore_file(args.input, args.output, workers=args.workers,
+                         chunk_size=args.chunk_size, cache_size=args.cache_size)
+    print(f"Scored {stats['texts']} tweets ({stats['unique_scored']} distinct) "
+          f"in {stats['seconds']:.1f}s and saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Seconds each field stays fresh. .info mixes price-based ratios (P/E, P/B)
+# with slow-moving fields, so it is refreshed daily; statements only change
+# when a company reports.
+DEFAULT_TTLS: Dict[str, float] = {
+    'info': 24 * 3600,
+    'financials': 30 * 24 * 3600,
+    'balance_sheet': 30 * 24 * 3600,
+    'cashflow': 30 * 24 * 3600,
+}
+
+DEFAULT_PATH = Path(os.environ.get('FUNDAMENTALS_CACHE',
+                                   Path.home() / '.cache' / 'roboinvesting' / 'fundamentals.sqlite'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+)
+"""
+
+_SQL_CHUNK = 500    # stay under SQLite's bound-parameter limit
+
+
+def _yfinance_fetcher(field: str) -> Callable[[str], Any]:
+    def fetch(ticker: str):
+        import yfinance as yf
+        return getattr(yf.Ticker(ticker), field)
+    return fetch
+
+
+class FundamentalsCache:
+    """
+    Local SQLite cache of per-ticker fundamentals (yfinance .info,
+    .financials, .balance_sheet, ...).
+
+    Each (ticker, field) row stores the pickled value and when it was
+    fetched; a row is fresh for ttl[field] seconds. get()/get_many() serve
+    fresh rows without touching the network, fetch misses (concurrently for
+    get_many) with the field's fetcher and store them in one transaction.
+    With stale_while_revalidate=True an expired row is returned immediately
+    and refreshed in the background instead. Fetchers default to yfinance and
+    can be replaced, e.g. for offline use.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl: Optional[Dict[str, float]] = None,
+                 fetchers: Optional[Dict[str, Callable[[str], Any]]] = None,
+                 stale_while_revalidate: bool = False, max_workers: int = 8):
+        self.path = Path(path)
+        self.ttl = {**DEFAULT_TTLS, **(ttl or {})}
+        self.fetchers = dict(fetchers or {})
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_workers = max_workers
+        self.network_calls = 0
+
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.RLock()
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self._refreshing: set = set()
+        self._pending: List = []
+
+    def __repr__(self):
+        return f"<FundamentalsCache {self.path} | rows: {len(self)}>"
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM fundamentals').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.wait()
+        self._background.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+    def fetcher(self, field: str) -> Callable[[str], Any]:
+        fetch = self.fetchers.get(field)
+        return fetch if fetch is not None else _yfinance_fetcher(field)
+
+    # -- raw storage -------------------------------------------------------
+
+    def _rows(self, tickers: List[str], field: str) -> Dict[str, tuple]:
+        out = {}
+        with self._lock:
+            for i in range(0, len(tickers), _SQL_CHUNK):
+                chunk = tickers[i:i + _SQL_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                for ticker, value, fetched_at in self._conn.execute(
+                        f'SELECT ticker, value, fetched_at FROM fundamentals '
+                        f'WHERE field = ? AND ticker IN ({marks})', [field, *chunk]):
+                    out[ticker] = (value, fetched_at)
+        return out
+
+    def put_many(self, field: str, values: Dict[str, Any], fetched_at: Optional[float] = None):
+        """Store many tickers' values for one field in a single transaction."""
+        now = time.time() if fetched_at is None else fetched_at
+        rows = [(t, field, pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL), now)
+                for t, v in values.items()]
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?)', rows)
+
+    def put(self, ticker: str, field: str, value: Any, fetched_at: Optional[float] = None):
+        self.put_many(field, {ticker: value}, fetched_at)
+
+    def invalidate(self, tickers: Optional[Iterable[str]] = None, field: Optional[str] = None):
+        """Drop rows for the given tickers and/or field (everything if both are None)."""
+        sql, args = 'DELETE FROM fundamentals WHERE 1=1', []
+        if field is not None:
+            sql += ' AND field = ?'; args.append(field)
+        with self._lock, self._conn:
+            if tickers is None:
+                self._conn.execute(sql, args)
+            else:
+                tickers = list(tickers)
+                for i in range(0, len(tickers), _SQL_CHUNK):
+                    chunk = tickers[i:i + _SQL_CHUNK]
+                    self._conn.execute(f"{sql} AND ticker IN ({','.join('?' * len(chunk))})", args + chunk)
+
+    # -- cached reads ------------------------------------------------------
+
+    def _fetch_many(self, tickers: List[str], field: str) -> Dict[str, Any]:
+        fetch = self.fetcher(field)
+        fetched, errors = {}, {}
+
+        def one(ticker):
+            try:
+                fetched[ticker] = fetch(ticker)
+            except Exception as e:
+                errors[ticker] = e
+
+        self.network_calls += len(tickers)
+        if len(tickers) == 1:
+            one(tickers[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as pool:
+                list(pool.map(one, tickers))
+        if fetched:
+            self.put_many(field, fetched)
+        for ticker, e in errors.items():
+            print(f"Error fetching {field} for {ticker}: {e}")
+        return fetched
+
+    def _revalidate(self, tickers: List[str], field: str):
+        with self._lock:
+            todo = [t for t in tickers if (t, field) not in self._refreshing]
+            self._refreshing.update((t, field) for t in todo)
+        if not todo:
+            return
+
+        def run():
+            try:
+                self._fetch_many(todo, field)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update((t, field) for t in todo)
+
+        self._pending.append(self._background.submit(run))
+
+    def get_many(self, tickers: Iterable[str], field: str = 'info',
+                 max_age: Optional[float] = None,
+                 stale_while_revalidate: Optional[bool] = None,
+                 fetch_missing: bool = True) -> Dict[str, Any]:
+        """
+        Values for many tickers: one SQL read for all of them, then one
+        concurrent fetch for the misses. Tickers whose fetch fails (and that
+        have no cached value) are left out of the result. With
+        fetch_missing=False only cached values are returned.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        ttl = self.ttl.get(field, DEFAULT_TTLS['info']) if max_age is None else max_age
+        swr = self.stale_while_revalidate if stale_while_revalidate is None else stale_while_revalidate
+        now = time.time()
+
+        out, stale, missing = {}, [], []
+        rows = self._rows(tickers, field)
+        for ticker in tickers:
+            row = rows.get(ticker)
+            if row is None:
+                missing.append(ticker)
+                continue
+            value, fetched_at = row
+            if now - fetched_at <= ttl:
+                out[ticker] = pickle.loads(value)
+            elif swr:
+                out[ticker] = pickle.loads(value)
+                stale.append(ticker)
+            else:
+                missing.append(ticker)
+
+        if stale:
+            self._revalidate(stale, field)
+        if missing and fetch_missing:
+            fetched = self._fetch_many(missing, field)
+            for ticker in missing:
+                if ticker in fetched:
+                    out[ticker] = fetched[ticker]
+                elif ticker in rows:
+                    # Fetch failed: an expired value beats none
+                    out[ticker] = pickle.loads(rows[ticker][0])
+        return {t: out[t] for t in tickers if t in out}
+
+    def get(self, ticker: str, field: str = 'info', max_age: Optional[float] = None,
+            stale_while_revalidate: Optional[bool] = None) -> Any:
+        """One ticker's value; raises KeyError if it is neither cached nor fetchable."""
+        got = self.get_many([ticker], field, max_age, stale_while_revalidate)
+        if ticker not in got:
+            raise KeyError(f"No {field} available for {ticker}")
+        return got[ticker]
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background revalidations have finished."""
+        pending, self._pending = self._pending, []
+        wait(pending, timeout=timeout)
+
+
+_default_cache: Optional[FundamentalsCache] = None
+
+
+def default_cache() -> FundamentalsCache:
+    """Process-wide cache at DEFAULT_PATH (override with $FUNDAMENTALS_CACHE)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FundamentalsCache()
+    return _default_cache
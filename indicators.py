@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Sequence, Union
+
+# Same parameters as stock_analysis.calculate_technical_indicators
+SMA_WINDOWS = (20, 50)
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+def _right_align(values: np.ndarray):
+    """
+    Move each column's NaNs to the top, keeping the order of its real bars.
+    Every ticker is then computed on its own bars only (as if its history
+    had been fetched on its own) and the last row is every ticker's latest bar.
+    Returns (aligned, order) with aligned[k, j] = values[order[k, j], j].
+    """
+    order = np.argsort(~np.isnan(values), axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Column-wise rolling mean over a right-aligned matrix; NaN until `window` bars exist."""
+    T = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if T < window:
+        return out
+    filled = np.where(np.isnan(x), 0.0, x)
+    csum = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(filled, axis=0)])
+    count = np.vstack([np.zeros((1, x.shape[1]), dtype=np.int64),
+                       np.cumsum(~np.isnan(x), axis=0)])
+    sums = csum[window:] - csum[:-window]
+    full = (count[window:] - count[:-window]) == window
+    out[window - 1:] = np.where(full, sums / window, np.nan)
+    return out
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    """ewm(span, adjust=False).mean() per column, started at each column's first bar."""
+    a = _alpha(span)
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        row = x[t]
+        state = np.where(np.isnan(state), row, a * row + (1 - a) * state)
+        out[t] = state
+    return out
+
+def compute_indicators(close: pd.DataFrame, sma_windows: Sequence[int] = SMA_WINDOWS
+                       ) -> Dict[str, pd.DataFrame]:
+    """
+    Full indicator series for a wide (dates x tickers) close matrix.
+
+    Returns {'sma_20': ..., 'sma_50': ..., 'rsi': ..., 'macd': ...,
+    'macd_signal': ...} as DataFrames shaped like `close`, with the same
+    definitions as calculate_technical_indicators. NaN closes are missing
+    bars: each ticker is computed over its own bars, and its outputs are NaN
+    on dates it has no bar.
+    """
+    values = close.to_numpy(dtype=float)
+    aligned, order = _right_align(values)
+    has_bar = ~np.isnan(aligned)
+
+    series = {f'sma_{w}': _rolling_mean(aligned, w) for w in sma_windows}
+
+    delta = np.vstack([np.full((1, aligned.shape[1]), np.nan), np.diff(aligned, axis=0)])
+    # delta.where(delta > 0, 0): a ticker's first bar counts as a zero move
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[~has_bar] = np.nan
+    loss[~has_bar] = np.nan
+    avg_gain = _rolling_mean(gain, RSI_WINDOW)
+    avg_loss = _rolling_mean(loss, RSI_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['rsi'] = 100 - 100 / (1 + avg_gain / avg_loss)
+
+    macd = _ewm(aligned, MACD_FAST) - _ewm(aligned, MACD_SLOW)
+    series['macd'] = macd
+    series['macd_signal'] = _ewm(macd, MACD_SIGNAL)
+
+    out = {}
+    for name, arr in series.items():
+        back = np.full(values.shape, np.nan)
+        np.put_along_axis(back, order, np.where(has_bar, arr, np.nan), axis=0)
+        out[name] = pd.DataFrame(back, index=close.index, columns=close.columns)
+    return out
+
+def latest_indicators(close: pd.DataFrame, sma_windows: Sequence[int] = SMA_WINDOWS) -> pd.DataFrame:
+    """One row per ticker: close and every indicator at that ticker's latest bar."""
+    return IndicatorEngine.from_history(close, sma_windows).latest()
+
+def ma_trend(close: pd.DataFrame, fast: int = 50, slow: int = 200) -> pd.Series:
+    """1 where the fast SMA is above the slow SMA at the latest bar, 0 if not, NaN without `slow` bars."""
+    latest = latest_indicators(close, sma_windows=(fast, slow))
+    trend = (latest[f'sma_{fast}'] > latest[f'sma_{slow}']).astype(float)
+    return trend.where(latest[f'sma_{slow}'].notna())
+
+
+class IndicatorEngine:
+    """
+    Incremental SMA / RSI / MACD state for a whole ticker universe.
+
+    from_history() seeds the state from a close matrix; update(row) then
+    advances every ticker by one bar in O(tickers): EMAs step once, rolling
+    windows keep ring buffers with running sums. Tickers with a NaN (or
+    absent) close in a row are left untouched. latest() gives the current
+    values with the same columns as latest_indicators().
+    """
+
+    RESYNC_EVERY = 256    # recompute running sums from the buffers to cap float drift
+
+    def __init__(self, tickers: Sequence[str], sma_windows: Sequence[int] = SMA_WINDOWS):
+        self.tickers = pd.Index(tickers)
+        self.sma_windows = tuple(sma_windows)
+        n = len(self.tickers)
+        self.depth = max(max(self.sma_windows), RSI_WINDOW)
+        self.closes = np.full((self.depth, n), np.nan)     # ring buffer of each ticker's last bars
+        self.gains = np.full((RSI_WINDOW, n), np.nan)
+        self.losses = np.full((RSI_WINDOW, n), np.nan)
+        self.count = np.zeros(n, dtype=np.int64)            # bars seen per ticker
+        self.last = np.full(n, np.nan)
+        self.sums = {w: np.zeros(n) for w in self.sma_windows}
+        self.gain_sum = np.zeros(n)
+        self.loss_sum = np.zeros(n)
+        self.ema_fast = np.full(n, np.nan)
+        self.ema_slow = np.full(n, np.nan)
+        self.signal = np.full(n, np.nan)
+        self._updates = 0
+
+    def __repr__(self):
+        return f"<IndicatorEngine | tickers: {len(self.tickers)} | windows: {self.sma_windows}>"
+
+    @classmethod
+    def from_history(cls, close: pd.DataFrame, sma_windows: Sequence[int] = SMA_WINDOWS) -> 'IndicatorEngine':
+        """Seed from a wide close matrix in one vectorised pass (no per-bar replay)."""
+        engine = cls(close.columns, sma_windows)
+        aligned, _ = _right_align(close.to_numpy(dtype=float))
+        T, n = aligned.shape
+        has_bar = ~np.isnan(aligned)
+        engine.count = has_bar.sum(axis=0).astype(np.int64)
+        if T == 0:
+            return engine
+
+        # Ring slot of bar k (0-based per ticker) is k % depth; fill the last `depth` bars
+        tail = aligned[-engine.depth:] if T >= engine.depth else np.vstack(
+            [np.full((engine.depth - T, n), np.nan), aligned])
+        first = engine.count - engine.depth           # bar number held by tail[0]
+        slots = (first[None, :] + np.arange(engine.depth)[:, None]) % engine.depth
+        np.put_along_axis(engine.closes, slots, tail, axis=0)
+
+        delta = np.vstack([np.full((1, n), np.nan), np.diff(aligned, axis=0)])
+        gain = np.where(has_bar, np.where(delta > 0, delta, 0.0), np.nan)
+        loss = np.where(has_bar, np.where(delta < 0, -delta, 0.0), np.nan)
+        pad = lambda x: x[-RSI_WINDOW:] if T >= RSI_WINDOW else np.vstack(
+            [np.full((RSI_WINDOW - T, n), np.nan), x])
+        rslots = (engine.count[None, :] - RSI_WINDOW + np.arange(RSI_WINDOW)[:, None]) % RSI_WINDOW
+        np.put_along_axis(engine.gains, rslots, pad(gain), axis=0)
+        np.put_along_axis(engine.losses, rslots, pad(loss), axis=0)
+
+        engine.last = aligned[-1].copy()
+        ema_fast, ema_slow = _ewm(aligned, MACD_FAST), _ewm(aligned, MACD_SLOW)
+        engine.ema_fast, engine.ema_slow = ema_fast[-1].copy(), ema_slow[-1].copy()
+        engine.signal = _ewm(ema_fast - ema_slow, MACD_SIGNAL)[-1].copy()
+        engine._resync()
+        return engine
+
+    def _resync(self):
+        for w in self.sma_windows:
+            self.sums[w] = np.nansum(self._window(self.closes, self.depth, w), axis=0)
+        self.gain_sum = np.nansum(self.gains, axis=0)
+        self.loss_sum = np.nansum(self.losses, axis=0)
+
+    def _window(self, ring: np.ndarray, size: int, w: int) -> np.ndarray:
+        """The last w entries of a ring buffer for every ticker."""
+        k = (self.count[None, :] - w + np.arange(w)[:, None]) % size
+        return np.take_along_axis(ring, k, axis=0)
+
+    def update(self, row: Union[pd.Series, Dict[str, float], np.ndarray]):
+        """Advance every ticker with a close in `row` by one bar."""
+        if isinstance(row, np.ndarray):
+            x = np.asarray(row, dtype=float)
+        else:
+            x = pd.Series(row, dtype=float).reindex(self.tickers).to_numpy()
+        idx = np.flatnonzero(~np.isnan(x))
+        if len(idx) == 0:
+            return
+        x = x[idx]
+        count = self.count[idx]
+
+        # SMAs: add the new close, drop the one falling out of each window
+        slot = count % self.depth
+        for w in self.sma_windows:
+            old = self.closes[(count - w) % self.depth, idx]
+            self.sums[w][idx] += x - np.where(count >= w, old, 0.0)
+        self.closes[slot, idx] = x
+
+        # RSI: a ticker's first bar is a zero move, as in the batch path
+        prev = self.last[idx]
+        delta = np.where(np.isnan(prev), 0.0, x - prev)
+        g, l = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        rslot = count % RSI_WINDOW
+        old_g = np.where(count >= RSI_WINDOW, self.gains[rslot, idx], 0.0)
+        old_l = np.where(count >= RSI_WINDOW, self.losses[rslot, idx], 0.0)
+        self.gain_sum[idx] += g - old_g
+        self.loss_sum[idx] += l - old_l
+        self.gains[rslot, idx] = g
+        self.losses[rslot, idx] = l
+
+        # MACD: one EMA step each
+        ef, es, sig = self.ema_fast[idx], self.ema_slow[idx], self.signal[idx]
+        ef = np.where(np.isnan(ef), x, _alpha(MACD_FAST) * x + (1 - _alpha(MACD_FAST)) * ef)
+        es = np.where(np.isnan(es), x, _alpha(MACD_SLOW) * x + (1 - _alpha(MACD_SLOW)) * es)
+        macd = ef - es
+        sig = np.where(np.isnan(sig), macd, _alpha(MACD_SIGNAL) * macd + (1 - _alpha(MACD_SIGNAL)) * sig)
+        self.ema_fast[idx], self.ema_slow[idx], self.signal[idx] = ef, es, sig
+
+        self.last[idx] = x
+        self.count[idx] = count + 1
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self._resync()
+
+    def latest(self) -> pd.DataFrame:
+        out = {'close': self.last}
+        for w in self.sma_windows:
+            out[f'sma_{w}'] = np.where(self.count >= w, self.sums[w] / w, np.nan)
+        full = self.count >= RSI_WINDOW
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = self.gain_sum / self.loss_sum
+            out['rsi'] = np.where(full, 100 - 100 / (1 + rs), np.nan)
+        out['macd'] = self.ema_fast - self.ema_slow
+        out['macd_signal'] = self.signal
+        return pd.DataFrame(out, index=self.tickers)
@@ -1,7 +1,17 @@
+import heapq
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Tuple
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+
+from fundamentals_cache import FundamentalsCache, default_cache
+from indicators import latest_indicators
 
 def get_stock_data(ticker: str, period: str = "1y") -> pd.DataFrame:
     """Fetch stock data using yfinance"""
@@ -43,19 +53,38 @@ def calculate_technical_indicators(df: pd.DataFrame) -> Dict[str, float]:
         'macd_signal': signal.iloc[-1]
     }
 
+def technical_indicators_bulk(histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, float]]:
+    """calculate_technical_indicators for many tickers in one vectorized pass
+
+    The Close columns are lined up into one dates x tickers matrix and run
+    through indicators.latest_indicators; each ticker still only sees its own
+    bars, so the values match the per-ticker function. Tickers without
+    history get {} as before.
+    """
+    closes = {t: df['Close'] for t, df in histories.items() if not df.empty}
+    out = {t: {} for t in histories}
+    if not closes:
+        return out
+    latest = latest_indicators(pd.DataFrame(closes))
+    keys = ['sma_20', 'sma_50', 'rsi', 'macd', 'macd_signal']
+    for ticker, row in zip(latest.index, latest[keys].to_dict('records')):
+        out[ticker] = row
+    return out
+
+def fundamentals_from_info(info: Dict) -> Dict[str, float]:
+    """Pick the scored fundamental fields out of a yfinance .info dict"""
+    return {
+        'pe_ratio': info.get('forwardPE', 0),
+        'price_to_book': info.get('priceToBook', 0),
+        'debt_to_equity': info.get('debtToEquity', 0),
+        'profit_margins': info.get('profitMargins', 0),
+        'return_on_equity': info.get('returnOnEquity', 0)
+    }
+
 def get_fundamental_metrics(ticker: str) -> Dict[str, float]:
-    """Get fundamental metrics for a stock"""
+    """Get fundamental metrics for a stock (from the local fundamentals cache when fresh)"""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        return {
-            'pe_ratio': info.get('forwardPE', 0),
-            'price_to_book': info.get('priceToBook', 0),
-            'debt_to_equity': info.get('debtToEquity', 0),
-            'profit_margins': info.get('profitMargins', 0),
-            'return_on_equity': info.get('returnOnEquity', 0)
-        }
+        return fundamentals_from_info(default_cache().get(ticker, 'info'))
     except Exception as e:
         print(f"Error fetching fundamental data for {ticker}: {e}")
         return {}
@@ -66,11 +95,29 @@ def calculate_stock_score(ticker: str) -> Tuple[float, Dict[str, float]]:
     df = get_stock_data(ticker)
     technical = calculate_technical_indicators(df)
     fundamental = get_fundamental_metrics(ticker)
-    
+    return score_stock(df, technical, fundamental)
+
+def score_stock(df: pd.DataFrame, technical: Dict[str, float],
+                fundamental: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+    """Score already-fetched price history and fundamentals (0-100)"""
     if not technical or not fundamental:
         return 0.0, {}
     
-    # Technical score (0-50 points)
+    technical_score = technical_points(df['Close'].iloc[-1], technical)
+    fundamental_score = fundamental_points(fundamental)
+    total_score = technical_score + fundamental_score
+    
+    return total_score, {
+        'technical_score': technical_score,
+        'fundamental_score': fundamental_score,
+        'technical_indicators': technical,
+        'fundamental_metrics': fundamental
+    }
+
+MAX_TECHNICAL_SCORE = 50
+
+def technical_points(close: float, technical: Dict[str, float]) -> int:
+    """Technical score (0-50 points)"""
     technical_score = 0
     
     # RSI scoring
@@ -84,10 +131,13 @@ def calculate_stock_score(ticker: str) -> Tuple[float, Dict[str, float]]:
         technical_score += 15
     
     # Moving average scoring
-    if df['Close'].iloc[-1] > technical['sma_20'] > technical['sma_50']:
+    if close > technical['sma_20'] > technical['sma_50']:
         technical_score += 15
     
-    # Fundamental score (0-50 points)
+    return technical_score
+
+def fundamental_points(fundamental: Dict[str, float]) -> int:
+    """Fundamental score (0-50 points)"""
     fundamental_score = 0
     
     # PE ratio scoring
@@ -108,17 +158,17 @@ def calculate_stock_score(ticker: str) -> Tuple[float, Dict[str, float]]:
     elif fundamental['return_on_equity'] > 0.1:
         fundamental_score += 10
     
-    total_score = technical_score + fundamental_score
-    
-    return total_score, {
-        'technical_score': technical_score,
-        'fundamental_score': fundamental_score,
-        'technical_indicators': technical,
-        'fundamental_metrics': fundamental
-    }
+    return fundamental_score
+
+def rank_stocks(tickers: List[str], concurrent: bool = False,
+                **kwargs) -> List[Tuple[str, float, Dict[str, float]]]:
+    """Rank a list of stocks based on their scores
 
-def rank_stocks(tickers: List[str]) -> List[Tuple[str, float, Dict[str, float]]]:
-    """Rank a list of stocks based on their scores"""
+    concurrent=True uses rank_stocks_concurrent (one bulk price download,
+    fundamentals fetched in parallel); kwargs are passed through to it.
+    """
+    if concurrent:
+        return rank_stocks_concurrent(tickers, **kwargs)
     stock_scores = []
     for ticker in tickers:
         score, details = calculate_stock_score(ticker)
@@ -127,6 +177,327 @@ def rank_stocks(tickers: List[str]) -> List[Tuple[str, float, Dict[str, float]]]
     # Sort by score in descending order
     return sorted(stock_scores, key=lambda x: x[1], reverse=True)
 
+# ---------------------------------------------------------------------------
+# Bulk / concurrent ranking
+# ---------------------------------------------------------------------------
+
+class YFinanceSource:
+    """Default data source: one yf.download for all histories, Ticker.info per
+    ticker through the fundamentals cache"""
+
+    def __init__(self, timeout: float = 10.0, cache: Optional[FundamentalsCache] = None):
+        self.timeout = timeout
+        self.cache = cache if cache is not None else default_cache()
+
+    def history(self, tickers: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        if not tickers:
+            return {}
+        data = yf.download(tickers, period=period, group_by='ticker', auto_adjust=True,
+                           threads=True, progress=False, timeout=self.timeout)
+        out = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    out[ticker] = pd.DataFrame()
+                    continue
+                df = data[ticker]
+            else:
+                df = data
+            # download() aligns every ticker on one date index; drop the padding
+            out[ticker] = df.dropna(how='all')
+        return out
+
+    def info(self, ticker: str) -> Dict:
+        return self.cache.get(ticker, 'info')
+
+    def cached_info(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Fresh cached .info dicts in one read, without any network calls"""
+        return self.cache.get_many(tickers, 'info', fetch_missing=False)
+
+class LocalDataSource:
+    """Offline stand-in for YFinanceSource, backed by dicts or a directory of files
+
+    from_directory expects <TICKER>.csv price histories (Date index, Close
+    column) and an optional fundamentals.json of {ticker: info dict}.
+    """
+
+    def __init__(self, histories: Dict[str, pd.DataFrame], infos: Optional[Dict[str, Dict]] = None):
+        self.histories = histories
+        self.infos = infos or {}
+
+    @classmethod
+    def from_directory(cls, path) -> 'LocalDataSource':
+        path = Path(path)
+        histories = {f.stem: pd.read_csv(f, index_col=0, parse_dates=True) for f in path.glob('*.csv')}
+        infos_path = path / 'fundamentals.json'
+        infos = json.loads(infos_path.read_text()) if infos_path.exists() else {}
+        return cls(histories, infos)
+
+    def history(self, tickers: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
+        return {t: self.histories.get(t, pd.DataFrame()) for t in tickers}
+
+    def info(self, ticker: str) -> Dict:
+        if ticker not in self.infos:
+            raise KeyError(f"No fundamentals for {ticker}")
+        return self.infos[ticker]
+
+def _fetch_info(source, ticker: str, retries: int, backoff: float) -> Dict[str, float]:
+    for attempt in range(retries + 1):
+        try:
+            return fundamentals_from_info(source.info(ticker))
+        except Exception as e:
+            if attempt == retries:
+                print(f"Error fetching fundamental data for {ticker}: {e}")
+                return {}
+            time.sleep(backoff * 2 ** attempt)
+    return {}
+
+def fetch_fundamentals(tickers: Iterable[str], source=None, max_workers: int = 16,
+                       retries: int = 2, backoff: float = 0.5,
+                       timeout: Optional[float] = 60.0) -> Dict[str, Dict[str, float]]:
+    """Fetch fundamental metrics for many tickers on a bounded thread pool
+
+    Sources with a cached_info(tickers) method (YFinanceSource) answer cache
+    hits in one bulk read first; only the rest go to the pool. Each ticker is
+    retried with exponential backoff; tickers still pending when `timeout`
+    seconds have passed are returned as {} (treated like a failed fetch by
+    score_stock).
+    """
+    source = source if source is not None else YFinanceSource()
+    tickers = list(dict.fromkeys(tickers))
+    cached_info = getattr(source, 'cached_info', None)
+    out = {t: fundamentals_from_info(i) for t, i in (cached_info(tickers) if cached_info else {}).items()}
+    todo = [t for t in tickers if t not in out]
+    if not todo:
+        return {t: out[t] for t in tickers}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(_fetch_info, source, t, retries, backoff): t for t in todo}
+        done, pending = wait(futures, timeout=timeout)
+        if pending:
+            for f in pending:
+                f.cancel()
+            print(f"Timed out fetching fundamental data for {len(pending)} tickers")
+        out.update({t: (f.result() if f in done else {}) for f, t in futures.items()})
+        return {t: out[t] for t in tickers}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def rank_stocks_concurrent(tickers: List[str], source=None, period: str = "1y",
+                           max_workers: int = 16, retries: int = 2, backoff: float = 0.5,
+                           timeout: Optional[float] = 60.0) -> List[Tuple[str, float, Dict[str, float]]]:
+    """Same rankings as rank_stocks, with all network I/O batched
+
+    Fundamentals are requested in the background while price histories for
+    the whole universe come from a single source.history() call; indicators
+    are computed for all tickers at once and scoring is then local. `source` is any object with history(tickers, period) and
+    info(ticker) - YFinanceSource by default, LocalDataSource for offline use.
+    """
+    source = source if source is not None else YFinanceSource()
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=1) as background:
+        fundamentals_future = background.submit(fetch_fundamentals, tickers, source, max_workers,
+                                                retries, backoff, timeout)
+        try:
+            histories = source.history(tickers, period)
+        except Exception as e:
+            print(f"Error fetching price data: {e}")
+            histories = {}
+        fundamentals = fundamentals_future.result()
+
+    technicals = technical_indicators_bulk({t: histories.get(t, pd.DataFrame()) for t in tickers})
+    stock_scores = []
+    for ticker in tickers:
+        df = histories.get(ticker, pd.DataFrame())
+        score, details = score_stock(df, technicals[ticker], fundamentals.get(ticker, {}))
+        stock_scores.append((ticker, score, details))
+    return sorted(stock_scores, key=lambda x: x[1], reverse=True)
+
+# ---------------------------------------------------------------------------
+# Streaming top-k screener
+# ---------------------------------------------------------------------------
+
+TECHNICAL_FIELDS = ['sma_20', 'sma_50', 'rsi', 'macd', 'macd_signal']
+FUNDAMENTAL_FIELDS = ['pe_ratio', 'price_to_book', 'debt_to_equity', 'profit_margins', 'return_on_equity']
+SCREEN_COLUMNS = ['score', 'technical_score', 'fundamental_score', 'close',
+                  *TECHNICAL_FIELDS, *FUNDAMENTAL_FIELDS]
+
+class TopKScreener:
+    """Keep the k best-scoring tickers of a stream without holding the rest
+
+    Candidates live in a min-heap of (score, -arrival, slot), so the root is
+    the current k-th best and ties go to the earlier ticker, as in the stable
+    sort of rank_stocks. Details sit in a preallocated (k x columns) float
+    array plus a ticker array, with a slot reused whenever an entry is
+    evicted, instead of one nested dict per ticker.
+
+    admit() runs before price history is fetched. It drops tickers that fail
+    the optional fundamental gates (max_pe, min_profit_margin, min_roe), and
+    tickers that could not enter the top k even with full technical points.
+    Tickers without fundamentals score 0, as in score_stock, and never need
+    a history.
+    """
+
+    def __init__(self, k: int = 20, max_pe: Optional[float] = None,
+                 min_profit_margin: Optional[float] = None, min_roe: Optional[float] = None):
+        self.k = k
+        self.max_pe = max_pe
+        self.min_profit_margin = min_profit_margin
+        self.min_roe = min_roe
+        self._heap: List[Tuple[float, int, int]] = []
+        self._tickers = np.empty(k, dtype=object)
+        self._values = np.full((k, len(SCREEN_COLUMNS)), np.nan)
+        self._arrival = 0
+        self._admitted: Dict[str, int] = {}    # arrival order of admitted, not yet scored tickers
+        self.stats = {'seen': 0, 'gated': 0, 'pruned': 0, 'scored': 0}
+
+    def __repr__(self):
+        return f"<TopKScreener | k: {self.k} | held: {len(self._heap)} | stats: {self.stats}>"
+
+    @property
+    def threshold(self) -> float:
+        """Score to beat to enter the top k (-inf until k tickers are held)"""
+        return self._heap[0][0] if len(self._heap) == self.k else -np.inf
+
+    def passes_gates(self, fundamental: Dict[str, float]) -> bool:
+        try:
+            if self.max_pe is not None and not 0 < fundamental['pe_ratio'] <= self.max_pe:
+                return False
+            if self.min_profit_margin is not None and not fundamental['profit_margins'] >= self.min_profit_margin:
+                return False
+            if self.min_roe is not None and not fundamental['return_on_equity'] >= self.min_roe:
+                return False
+        except TypeError:
+            # yfinance reports some fields as None
+            return False
+        return True
+
+    def admit(self, ticker: str, fundamental: Dict[str, float]) -> bool:
+        """True if the ticker is worth fetching price history for (then add() it)"""
+        self.stats['seen'] += 1
+        if not fundamental:
+            self.add(ticker, np.nan, {}, {})
+            return False
+        if not self.passes_gates(fundamental):
+            self.stats['gated'] += 1
+            return False
+        try:
+            best_case = fundamental_points(fundamental) + MAX_TECHNICAL_SCORE
+        except TypeError:
+            self.stats['gated'] += 1
+            return False
+        if best_case <= self.threshold:
+            self.stats['pruned'] += 1
+            return False
+        self._admitted[ticker] = self._arrival
+        self._arrival += 1
+        return True
+
+    def add(self, ticker: str, close: float, technical: Dict[str, float],
+            fundamental: Dict[str, float]) -> bool:
+        """Score one ticker and keep it if it is in the top k; returns whether it was kept"""
+        self.stats['scored'] += 1
+        if technical and fundamental:
+            tech, fund = technical_points(close, technical), fundamental_points(fundamental)
+        else:
+            tech = fund = np.nan
+        score = 0.0 if np.isnan(tech) else tech + fund
+        arrival = self._admitted.pop(ticker, None)
+        if arrival is None:
+            arrival = self._arrival
+            self._arrival += 1
+        key = (score, -arrival)
+
+        if len(self._heap) < self.k:
+            slot = len(self._heap)
+            heapq.heappush(self._heap, (*key, slot))
+        elif key > self._heap[0][:2]:
+            slot = heapq.heapreplace(self._heap, (*key, self._heap[0][2]))[2]
+        else:
+            return False
+        self._tickers[slot] = ticker
+        row = self._values[slot]
+        row[:4] = score, tech, fund, close
+        row[4:9] = [technical.get(f, np.nan) for f in TECHNICAL_FIELDS]
+        row[9:] = [fundamental.get(f, np.nan) for f in FUNDAMENTAL_FIELDS]
+        return True
+
+    def _score_history(self, ticker, fundamental, df):
+        if df is None or df.empty:
+            self.add(ticker, np.nan, {}, fundamental)
+        else:
+            self.add(ticker, df['Close'].iloc[-1], calculate_technical_indicators(df), fundamental)
+
+    def consume(self, items: Iterable[Tuple]) -> 'TopKScreener':
+        """Screen a stream of (ticker, fundamental metrics, history) items
+
+        history is a DataFrame or a zero-argument callable returning one; the
+        callable is only invoked for admitted tickers.
+        """
+        for ticker, fundamental, history in items:
+            if self.admit(ticker, fundamental):
+                df = history() if callable(history) else history
+                self._score_history(ticker, fundamental, df)
+        return self
+
+    async def aconsume(self, items: AsyncIterable[Tuple]) -> 'TopKScreener':
+        """consume() for an async iterator; history callables may be coroutine functions"""
+        async for ticker, fundamental, history in items:
+            if self.admit(ticker, fundamental):
+                df = history() if callable(history) else history
+                if inspect.isawaitable(df):
+                    df = await df
+                self._score_history(ticker, fundamental, df)
+        return self
+
+    def result(self) -> pd.DataFrame:
+        """Top k as one row per ticker (ticker + SCREEN_COLUMNS), best first"""
+        order = sorted(range(len(self._heap)), key=lambda i: self._heap[i][:2], reverse=True)
+        slots = [self._heap[i][2] for i in order]
+        out = pd.DataFrame(self._values[slots], columns=SCREEN_COLUMNS)
+        out.insert(0, 'ticker', self._tickers[slots])
+        return out
+
+def screen_stocks(tickers: Iterable[str], k: int = 20, source=None, period: str = "1y",
+                  chunk_size: int = 500, max_workers: int = 16, retries: int = 2,
+                  backoff: float = 0.5, timeout: Optional[float] = 60.0,
+                  **gates) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Top-k screen of a large universe, fetching data chunk by chunk
+
+    Fundamentals for the next chunk are fetched in the background while the
+    current one is screened. Only the tickers a TopKScreener admits get their
+    price history fetched, in one source.history() call per chunk. gates are
+    TopKScreener's max_pe / min_profit_margin / min_roe. Without gates the
+    top k equal rank_stocks(tickers)[:k]. Returns (result frame, stats).
+    """
+    source = source if source is not None else YFinanceSource()
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    screener = TopKScreener(k, **gates)
+    fetch = lambda chunk: fetch_fundamentals(chunk, source, max_workers, retries, backoff, timeout)
+
+    with ThreadPoolExecutor(max_workers=1) as background:
+        upcoming = background.submit(fetch, chunks[0]) if chunks else None
+        for i, chunk in enumerate(chunks):
+            fundamentals = upcoming.result()
+            if i + 1 < len(chunks):
+                upcoming = background.submit(fetch, chunks[i + 1])
+            admitted = [t for t in chunk if screener.admit(t, fundamentals.get(t, {}))]
+            if not admitted:
+                continue
+            try:
+                histories = source.history(admitted, period)
+            except Exception as e:
+                print(f"Error fetching price data: {e}")
+                histories = {}
+            histories = {t: histories.get(t, pd.DataFrame()) for t in admitted}
+            technicals = technical_indicators_bulk(histories)
+            for ticker in admitted:
+                df = histories[ticker]
+                close = df['Close'].iloc[-1] if not df.empty else np.nan
+                screener.add(ticker, close, technicals[ticker], fundamentals[ticker])
+    return screener.result(), dict(screener.stats)
+
 if __name__ == "__main__":
     # Test with some S&P 500 companies
     test_tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "META"]